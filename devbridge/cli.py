@@ -7,42 +7,39 @@ Main CLI entry point
 import os
 import sys
 import typer
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
 import click
 from pathlib import Path
-from rich.prompt import Prompt, Confirm
 import shutil
-from devbridge.utils.cli_utils import resolve_repo_path
-import subprocess
-import tempfile
+from devbridge.utils.cli_utils import URL_PREFIXES, resolve_repo_path, q_version_output
 import re
-import git
-import textwrap
-import json
-from rich.table import Table
 
 from devbridge import __version__ as APP_VERSION # Import the version from __init__.py
-from devbridge.utils.config import load_config, Config
-from devbridge.config import save_config, get_default_config_path, APP_NAME, CONFIG_FILE_NAME
-from devbridge.commands.index_cmd import index_command
-from devbridge.commands.find_cmd import find_command
-from devbridge.commands.transfer_cmd import transfer_command
-from devbridge.commands.document_cmd import document_command
-from devbridge.commands.analyze_cmd import analyze_command
-from devbridge.commands.chat_cmd import chat_command
-from devbridge.commands.init_cmd import init_command
-from devbridge.commands.learn_cmd import learn_command_async
-import asyncio
+
+if TYPE_CHECKING:
+    from devbridge.utils.config import Config
+# Command modules (and heavy deps like git, asyncio, rich.table) are imported
+# inside each command body so an invocation only pays for the command it runs.
 
 # Initialize Typer app and console
 app = typer.Typer(
     help="DevBridge: AI-Powered Cross-Project Knowledge Bridge",
     add_completion=False,
+    no_args_is_help=True,
 )
-console = Console()
+console: Optional[Console] = None
+
+def _console() -> Console:
+    """Return the shared Console, creating it on first use."""
+    global console
+    if console is None:
+        if sys.stdout.isatty():
+            console = Console()
+        else:
+            # Piped output: no colour, no auto-highlighting, no wrap measurement.
+            console = Console(no_color=True, highlight=False, soft_wrap=True)
+    return console
 
 # Banner art for DevBridge
 BANNER = r"""
@@ -56,11 +53,17 @@ BANNER = r"""
 
 BANNER_STYLE = "cyan bold"
 
+# Only the interactive flows show the banner; scripted commands stay quiet.
+_BANNER_COMMANDS = ("demo", "init")
+
+# Matches the version token in `q --version` output, e.g. "q version 1.2.3".
+_Q_VERSION_RE = re.compile(r"q version (\S+)")
+
 # Global options via callback
 def version_callback(value: bool):
     """Display version information and exit"""
     if value:
-        console.print(f"[{BANNER_STYLE}]DevBridge[/] version: [bold]{APP_VERSION}[/]")
+        typer.echo(f"DevBridge version: {APP_VERSION}")
         raise typer.Exit()
 
 @app.callback()
@@ -69,29 +72,50 @@ def main(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output"),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress non-essential output"),
     config: Optional[str] = typer.Option(None, "--config", help="Path to config file"),
-    version: bool = typer.Option(False, "--version", callback=version_callback, help="Show version and exit"),
+    version: bool = typer.Option(False, "--version", callback=version_callback, is_eager=True, help="Show version and exit"),
     debug: bool = typer.Option(False, "--debug", help="Enable debug output for path resolution and other internals"),
+    no_config_cache: bool = typer.Option(False, "--no-config-cache", help="Always re-parse the config file instead of reusing a cached parse."),
 ):
     """
     DevBridge: AI-Powered Cross-Project Knowledge Bridge
     
     Transfer knowledge, code patterns, and best practices across different projects.
     """
-    loaded_config = load_config(config) if config else load_config()
+    # Config is loaded on first use via get_config(), so commands that never
+    # read it (check-q, --help) skip the file I/O and model parsing entirely.
     ctx.obj = {
         "verbose": verbose,
         "quiet": quiet,
-        "config": loaded_config,
+        "config": None,
+        "_config_path": config,
+        "_config_cache": not no_config_cache,
         "debug": debug,
-        "console": console
     }
-    
-    if not quiet and sys.stdout.isatty():
+    if ctx.invoked_subcommand is None:
+        return
+
+    if (
+        ctx.invoked_subcommand in _BANNER_COMMANDS
+        and not quiet
+        and not os.environ.get("DEVBRIDGE_NO_BANNER")
+        and sys.stdout.isatty()
+    ):
+        from rich.text import Text
+        console = _console()
         console.print(Text(BANNER, style=BANNER_STYLE))
         console.print(
             f"[bold]DevBridge[/] [dim]v{APP_VERSION}[/] - AI-Powered Cross-Project Knowledge Bridge\n"
         )
 
+def get_config(ctx: typer.Context) -> "Config":
+    """Return the config for this invocation, loading it on first access."""
+    if ctx.obj is None:
+        ctx.obj = {}
+    if ctx.obj.get("config") is None:
+        from devbridge.utils.config import load_config
+        ctx.obj["config"] = load_config(ctx.obj.get("_config_path"), use_cache=ctx.obj.get("_config_cache", True))
+    return ctx.obj["config"]
+
 # Register commands
 @app.command()
 def index(
@@ -106,15 +130,19 @@ def index(
     force: bool = typer.Option(
         False, "--force", "-f", help="Force re-indexing of all files, even if their content hash hasn't changed."
     ),
-    json_out: bool = typer.Option(False, "--json", help="Output results as JSON.")
+    jobs: int = typer.Option(8, "--jobs", "-j", min=1, help="Number of threads used to resolve repository arguments."),
+    refresh: bool = typer.Option(True, "--refresh/--no-refresh", help="Fast-forward remote URLs already in the workspace when their HEAD moved (one `git ls-remote` each). Use --no-refresh to skip the network check, e.g. offline."),
+    json_out: bool = typer.Option(False, "--json", help="Output results as JSON."),
+    pretty: bool = typer.Option(False, "--pretty", help="Indent JSON output for human reading (with --json).")
 ):
     """
     Index repositories to build the knowledge base.
     """
-    # Ensure ctx.obj is set
-    if not hasattr(ctx, "obj") or ctx.obj is None:
-        from devbridge.utils.config import Config
-        ctx.obj = {"config": Config(), "debug": False}
+    from rich.text import Text
+    from devbridge.commands.index_cmd import index_command
+
+    console = _console()
+    config = get_config(ctx)
     debug = ctx.obj.get("debug", False)
 
     if not repos:
@@ -123,21 +151,31 @@ def index(
         console.print("[dim]To index a remote repository, first add it using: devbridge repo add <URL>[/dim]")
         raise typer.Exit(code=1)
         
+    # Resolution is filesystem-bound, so look up many arguments concurrently.
+    # Remote URLs are still added one at a time below to keep output readable.
+    workers = min(jobs, len(repos))
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resolved_paths = list(executor.map(lambda r: resolve_repo_path(r, debug=debug, config=config), repos))
+    else:
+        resolved_paths = [resolve_repo_path(r, debug=debug, config=config) for r in repos]
+
     norm_repos = []
-    for r_name_or_path in repos:
-        resolved_path = resolve_repo_path(r_name_or_path, debug=debug, config=ctx.obj["config"])
+    for r_name_or_path, resolved_path in zip(repos, resolved_paths):
         if resolved_path:
             norm_repos.append(resolved_path)
         else:
-            if r_name_or_path.startswith("http://") or r_name_or_path.startswith("https://") or r_name_or_path.startswith("git@"):
-                console_instance = ctx.obj.get("console", console)
+            if r_name_or_path.startswith(URL_PREFIXES):
+                console_instance = ctx.obj.get("console") or console
                 console_instance.print(f"[dim]Argument '{r_name_or_path}' looks like a remote URL. Attempting to add it to workspace non-interactively.[/dim]")
                 try:
                     added_repo_path_str = add_repo_command_logic(
-                        ctx.obj["config"], 
+                        config, 
                         r_name_or_path, 
                         console_instance,
-                        interactive_overwrite=False
+                        interactive_overwrite=False,
+                        refresh=refresh
                     )
                     if added_repo_path_str:
                         console_instance.print(f"[green]Implicitly added/verified remote repository '{r_name_or_path}' at '{added_repo_path_str}'[/green]")
@@ -148,23 +186,52 @@ def index(
                     escaped_error = Text(str(e_add)).plain
                     console_instance.print(f"[red]Error attempting to automatically add URL '{r_name_or_path}': {escaped_error}. Skipping this entry.[/red]")
             else:
-                path_obj = Path(r_name_or_path)
-                if path_obj.exists() and path_obj.is_dir():
-                    norm_repos.append(str(path_obj.resolve()))
-                    console.print(f"[dim]Interpreted '{r_name_or_path}' as a direct local path for indexing.[/dim]")
-                else:
-                    console.print(f"[red]Error:[/] Repository or path '{r_name_or_path}' not found in workspace, as a valid local directory, or as a recognized URL format. Skipping.[/red]")
+                # resolve_repo_path already accepts existing absolute and CWD-relative directories
+                console.print(f"[red]Error:[/] Repository or path '{r_name_or_path}' not found in workspace, as a valid local directory, or as a recognized URL format. Skipping.")
     
     if not norm_repos:
         console.print("[red]No valid repositories found to index after checking input.[/]")
         raise typer.Exit(code=1)
+
+    # Overlapping arguments (e.g. `my_repo ./my_repo`, or a symlink to a repo)
+    # would otherwise be indexed twice.
+    seen_paths = set()
+    unique_repos = []
+    for repo_path in norm_repos:
+        real_path = os.path.realpath(repo_path)
+        if real_path in seen_paths:
+            console.print(f"[yellow]Skipping duplicate repository path '{repo_path}'.[/]")
+            continue
+        seen_paths.add(real_path)
+        unique_repos.append(repo_path)
+    norm_repos = unique_repos
         
     result = index_command(ctx, norm_repos, depth, list(exclude), force)
     if json_out:
-        typer.echo(json.dumps(result, indent=2, default=str))
+        _emit_json(result, pretty)
     else:
         return result
 
+def _emit_json(data, pretty: bool = False) -> None:
+    """Stream ``data`` to stdout as JSON (compact unless ``pretty``), via orjson when installed."""
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    if orjson is not None and hasattr(sys.stdout, "buffer"):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(data, default=str, option=option))
+        sys.stdout.buffer.flush()
+        return
+
+    import json
+    json.dump(data, sys.stdout, indent=2 if pretty else None, default=str)
+    sys.stdout.write("\n")
+
 @app.command()
 def find(
     ctx: typer.Context,
@@ -182,25 +249,51 @@ def find(
         None, "--type", "-t", help="Filter by code element type (e.g., `function_py`, `class_py`, `docstring`, `comment`, `todo`)."
     ),
     limit: int = typer.Option(5, "--limit", "-n", help="Limit number of results."),
-    json_out: bool = typer.Option(False, "--json", help="Output results as JSON.")
+    json_out: bool = typer.Option(False, "--json", help="Output results as JSON."),
+    pretty: bool = typer.Option(False, "--pretty", help="Indent JSON output for human reading (with --json).")
 ):
     """
     Search for code patterns and text across indexed repositories.
     """
+    from rich.table import Table
+    from rich.text import Text
+    from devbridge.commands.find_cmd import find_command
+
+    console = _console()
+    get_config(ctx)
     results = find_command(ctx, query, repo, language, framework, type, limit)
     
     if json_out:
         if results is None:
             error_output = {"error": "Error querying the database.", "details": "See server logs or run without --json for more info if debug is enabled."}
-            typer.echo(json.dumps(error_output, indent=2))
+            _emit_json(error_output, pretty)
         else:
-            typer.echo(json.dumps(results, indent=2, default=str))
+            _emit_json(results, pretty)
     else:
         if results is None:
             console.print("[red]Error querying the database.[/]")
             console.print("[dim] (Run with --debug for more details if the issue persists)[/]")
             return
 
+        rows = [
+            (
+                m.get("repo_name", "N/A"),
+                m.get("file_path", "N/A"),
+                str(m.get("line_num", "N/A")),
+                m.get("element_type", "N/A"),
+                m.get("element_name", "N/A"),
+                m.get("snippet", "N/A"),
+            )
+            for m in results
+        ]
+
+        if rows and not sys.stdout.isatty():
+            # Piped output: plain tab-separated rows, no table layout to compute.
+            write = sys.stdout.write
+            for row in rows:
+                write("\t".join(str(cell).replace("\t", " ").replace("\n", " ") for cell in row) + "\n")
+            return
+
         table = Table(title=f"Found {len(results)} results for '{query}'" + (f" (type: {type})" if type else ""))
         table.add_column("Repository", style="blue", no_wrap=False)
         table.add_column("File", style="cyan", no_wrap=False)
@@ -216,15 +309,11 @@ def find(
             else: # Should not happen if find_command returns [] on no match, but good for safety
                  table.add_row("[dim]No results or an unexpected issue occurred.[/]")
         else:
-            for match in results:
-                table.add_row(
-                    match.get("repo_name", "N/A"),
-                    match.get("file_path", "N/A"),
-                    str(match.get("line_num", "N/A")),
-                    match.get("element_type", "N/A"),
-                    match.get("element_name", "N/A"),
-                    match.get("snippet", "N/A")
-                )
+            # Plain Text cells skip markup parsing, so brackets in snippets
+            # (e.g. `items[0]`) are shown verbatim rather than read as tags.
+            add_row = table.add_row
+            for row in rows:
+                add_row(*(Text(str(cell)) for cell in row))
         console.print(table)
         # No return here, as we've printed the table.
         # Typer would try to print a None return if we did `return None`
@@ -253,6 +342,10 @@ def transfer(
     Adapt and transfer code patterns or solutions between projects using Amazon Q.
     Requires either a pattern ID (from a previous 'find' operation) or a natural language query.
     """
+    from devbridge.commands.transfer_cmd import transfer_command
+
+    console = _console()
+    get_config(ctx)
     if not pattern and not query:
         console.print("[red]Error:[/] You must specify either a pattern ID (using --pattern) or a query (using --query).")
         raise typer.Exit(1)
@@ -270,31 +363,47 @@ def document(
     """
     Generate documentation for a specific code file using Amazon Q.
     """
+    from devbridge.commands.document_cmd import document_command
+
+    get_config(ctx)
     return document_command(ctx, path, strategy, output_format)
 
 # New analyze command
 @app.command()
 def analyze(
     ctx: typer.Context,
-    path: str = typer.Argument(..., help="Path to the specific code *file* to analyze (e.g., `src/auth.py`, `components/payment.js`)."),
+    path: str = typer.Argument(..., help="Path to the specific code *file* to analyze (e.g., `src/auth.py`, `components/payment.js`), or a directory when using --glob."),
     checks: Optional[List[str]] = typer.Option(None, "--check", "-c", help="Specific checks to perform (e.g., `security`, `performance`, `style`). Can be used multiple times. Defaults to 'default' checks."),
     fix: bool = typer.Option(False, "--fix", help="Attempt to automatically apply fixes for identified issues."),
-    auto_approve: bool = typer.Option(False, "--auto-approve", help="Automatically approve all suggested fixes (use with caution).")
+    auto_approve: bool = typer.Option(False, "--auto-approve", help="Automatically approve all suggested fixes (use with caution)."),
+    glob: Optional[str] = typer.Option(None, "--glob", "-g", help="Treat PATH as a directory and analyze every file matching this pattern (e.g., `**/*.py`)."),
+    jobs: int = typer.Option(8, "--jobs", "-j", min=1, help="Maximum concurrent Amazon Q calls when using --glob.")
 ):
     """
     Analyze a specific code file for best practices and issues using Amazon Q.
     """
+    from devbridge.commands.analyze_cmd import analyze_command, analyze_paths_async
+
+    get_config(ctx)
     # Ensure checks is a list even if None, for the command logic
     active_checks = checks if checks else ["default"]
+    if glob:
+        return _run_async(analyze_paths_async(ctx, path, glob, active_checks, fix, parallelism=jobs))
     return analyze_command(ctx, path, active_checks, fix, auto_approve)
 
 # New check-q command
 @app.command("check-q")
-def check_q_command(ctx: typer.Context):
+def check_q_command(
+    ctx: typer.Context,
+    refresh: bool = typer.Option(False, "--refresh", help="Re-run `q --version` instead of using the cached result.")
+):
     """
     Verify Amazon Q CLI setup and connectivity.
     """
-    console = ctx.obj.get("console", Console()) # Get console from context
+    import subprocess
+    import textwrap
+
+    console = ctx.obj.get("console") or _console() # Get console from context
     q_path = shutil.which("q")
 
     if q_path:
@@ -302,28 +411,26 @@ def check_q_command(ctx: typer.Context):
         try:
             # Attempt to get version or a simple status check
             # Using a timeout to prevent hanging if q is unresponsive
-            result = subprocess.run(["q", "--version"], capture_output=True, text=True, check=False, timeout=10)
-            if result.returncode == 0:
-                version_info = result.stdout.strip()
-                # Try to extract a version number, be robust if format changes
-                version_match = re.search(r"q version (\S+)", version_info)
-                if version_match:
-                    version_str = version_match.group(1)
-                    console.print(f"[green]INFO:[/] Amazon Q CLI Version: [bold cyan]{version_str}[/]")
-                else:
-                    # if specific version string not found, print what we got
-                    console.print(f"[yellow]INFO:[/] Amazon Q CLI responded. Output (first line): {version_info.splitlines()[0] if version_info else 'No output'}")
-                console.print("[green]INFO:[/] Amazon Q CLI appears to be operational.")
+            version_info = q_version_output(q_path, timeout=10, use_cache=not refresh)
+            # Try to extract a version number, be robust if format changes
+            version_match = _Q_VERSION_RE.search(version_info)
+            if version_match:
+                version_str = version_match.group(1)
+                console.print(f"[green]INFO:[/] Amazon Q CLI Version: [bold cyan]{version_str}[/]")
             else:
-                # q command ran but returned an error
-                console.print(f"[yellow]WARNING:[/] Amazon Q CLI (`q`) found, but `q --version` failed.")
-                console.print(f"[dim]Return code: {result.returncode}[/]")
-                if result.stderr:
-                    console.print(f"[dim]Error output:\n{textwrap.indent(result.stderr.strip(), '  ')}[/]")
-                else:
-                    console.print(f"[dim]No error output from q, but it exited with code {result.returncode}. It might not be fully configured.")
-                console.print("[yellow]INFO:[/] Please ensure Amazon Q CLI is correctly configured (e.g., logged in).")
+                # if specific version string not found, print what we got
+                console.print(f"[yellow]INFO:[/] Amazon Q CLI responded. Output (first line): {version_info.splitlines()[0] if version_info else 'No output'}")
+            console.print("[green]INFO:[/] Amazon Q CLI appears to be operational.")
 
+        except subprocess.CalledProcessError as e_proc:
+            # q command ran but returned an error
+            console.print(f"[yellow]WARNING:[/] Amazon Q CLI (`q`) found, but `q --version` failed.")
+            console.print(f"[dim]Return code: {e_proc.returncode}[/]")
+            if e_proc.stderr:
+                console.print(f"[dim]Error output:\n{textwrap.indent(e_proc.stderr.strip(), '  ')}[/]")
+            else:
+                console.print(f"[dim]No error output from q, but it exited with code {e_proc.returncode}. It might not be fully configured.")
+            console.print("[yellow]INFO:[/] Please ensure Amazon Q CLI is correctly configured (e.g., logged in).")
         except subprocess.TimeoutExpired:
             console.print(f"[yellow]WARNING:[/] Amazon Q CLI (`q`) found, but `q --version` timed out after 10 seconds.")
             console.print("[yellow]INFO:[/] The Q CLI might be unresponsive or very slow to start.")
@@ -339,37 +446,121 @@ def check_q_command(ctx: typer.Context):
         console.print("[cyan underline]https://docs.aws.amazon.com/amazonq/latest/userguide/command-line-interface.html[/]") # Keep URL updated
         console.print("[yellow]INFO:[/] Some DevBridge features (transfer, document, analyze, chat) require it.")
 
+# Output modes accepted by learn / learn-batch.
+_LEARN_MODES = ("aggregate", "pages")
+
+# Event loop shared by every async run in this process; see _run_async().
+_event_loop = None
+
+def _run_async(coro):
+    """Run ``coro`` to completion on the process-wide loop (uvloop when installed)."""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        import atexit
+        try:
+            import uvloop
+            _event_loop = uvloop.new_event_loop()
+        except ImportError:
+            import asyncio
+            _event_loop = asyncio.new_event_loop()
+        atexit.register(_event_loop.close)
+    return _event_loop.run_until_complete(coro)
+
 # This is the simplified Typer command for learn
 @app.command("learn")
 def learn_sync_wrapper(
     ctx: typer.Context,
     repo_identifier: str = typer.Argument(..., help="Repository identifier (e.g., `https://github.com/user/repo`, `user/repo`, or a Deepwiki URL)."),
-    mode: str = typer.Option("aggregate", "--mode", help="Output mode: 'aggregate' to combine all content, 'pages' to show primary page.", click_type=click.Choice(['aggregate', 'pages'], case_sensitive=False)),
+    mode: str = typer.Option("aggregate", "--mode", help="Output mode: 'aggregate' to combine all content, 'pages' to show primary page.", click_type=click.Choice(_LEARN_MODES, case_sensitive=False)),
     max_depth: int = typer.Option(0, "--max-depth", help="Crawl depth. 0 for root page, 1 for root + 1 level of links, etc."),
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output from the learn command itself.")
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output from the learn command itself."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached pages and Markdown conversions and fetch/convert everything again."),
+    crawl_order: bool = typer.Option(False, "--crawl-order", help="In aggregate mode, order pages as their fetches completed instead of by URL (may differ between runs)."),
+    output_file: Optional[Path] = typer.Option(None, "--output", "-o", dir_okay=False, writable=True, help="Write the Markdown to this file instead of displaying it.")
 ):
     """
     (Sync Wrapper) Fetches documentation or information for a given repository identifier.
-    This wrapper calls the underlying async learn command using asyncio.run().
+    This wrapper calls the underlying async learn command on a shared event loop.
     REPO_IDENTIFIER can be a direct Deepwiki URL, a GitHub URL (e.g., https://github.com/user/repo),
     a slug (e.g., user/repo), or a specific topic for a known provider (e.g., an AWS service name).
     """
-    app_config: Config = ctx.obj.get("config", Config())
+    from devbridge.commands.learn_cmd import learn_command_async
+
+    app_config = get_config(ctx)
     effective_verbose = ctx.obj.get("verbose", False) or verbose
     repo_identifier_help = "Repository identifier (e.g., `https://github.com/user/repo`, `user/repo`, or a Deepwiki URL)."
 
-    # Directly run the original async command logic using asyncio.run()
-    return asyncio.run(learn_command_async(
+    # Run the original async command logic on the shared event loop
+    return _run_async(learn_command_async(
         repo_identifier=repo_identifier,
         mode=mode,
         max_depth=max_depth,
         verbose=effective_verbose,
+        output_file=output_file,
         user_agent=app_config.default_user_agent,
         respect_robots_txt=app_config.respect_robots_txt,
         crawl_retry_limit=app_config.crawl_retry_limit,
-        crawl_backoff_base_ms=app_config.crawl_backoff_base_ms
+        crawl_backoff_base_ms=app_config.crawl_backoff_base_ms,
+        no_cache=no_cache,
+        cache_max_mb=app_config.learn_cache_max_mb,
+        crawl_order=crawl_order
     ))
 
+@app.command("learn-batch")
+def learn_batch(
+    ctx: typer.Context,
+    identifiers_file: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True, help="File with one repository identifier per line (blank lines and `#` comments are ignored)."),
+    mode: str = typer.Option("aggregate", "--mode", help="Output mode: 'aggregate' to combine all content, 'pages' to show primary page.", click_type=click.Choice(_LEARN_MODES, case_sensitive=False)),
+    max_depth: int = typer.Option(0, "--max-depth", help="Crawl depth. 0 for root page, 1 for root + 1 level of links, etc."),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output from the learn command itself."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached pages and Markdown conversions and fetch/convert everything again."),
+    crawl_order: bool = typer.Option(False, "--crawl-order", help="In aggregate mode, order pages as their fetches completed instead of by URL (may differ between runs).")
+):
+    """
+    Run `learn` for every identifier listed in a file, sharing one event loop.
+    """
+    from devbridge.commands.learn_cmd import learn_command_async
+
+    app_config = get_config(ctx)
+    effective_verbose = ctx.obj.get("verbose", False) or verbose
+    identifiers = [
+        line.strip() for line in identifiers_file.read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not identifiers:
+        _console().print(f"[yellow]No identifiers found in '{identifiers_file}'.[/]")
+        raise typer.Exit(code=1)
+
+    async def _learn_all():
+        # Sequential on purpose: each learn run shows its own Rich status
+        # spinner, and Rich allows only one live display at a time.
+        for identifier in identifiers:
+            await learn_command_async(
+                repo_identifier=identifier,
+                mode=mode,
+                max_depth=max_depth,
+                verbose=effective_verbose,
+                user_agent=app_config.default_user_agent,
+                respect_robots_txt=app_config.respect_robots_txt,
+                crawl_retry_limit=app_config.crawl_retry_limit,
+                crawl_backoff_base_ms=app_config.crawl_backoff_base_ms,
+                no_cache=no_cache,
+                cache_max_mb=app_config.learn_cache_max_mb,
+                crawl_order=crawl_order
+            )
+
+    _run_async(_learn_all())
+
+@app.command("clear-cache")
+def clear_cache_command():
+    """
+    Delete the pages and Markdown conversions cached by `learn`.
+    """
+    from devbridge.utils import md_cache
+
+    md_cache.clear()
+    _console().print(f"Cleared learn cache at [cyan]{md_cache.CACHE_DIR}[/cyan].")
+
 @app.command("demo")
 def demo_command(ctx: typer.Context):
     """
@@ -377,8 +568,16 @@ def demo_command(ctx: typer.Context):
     This will temporarily clone a public repository, index it, perform a search,
     and show the learn command.
     """
-    console = ctx.obj.get("console", Console())
-    config = ctx.obj.get("config", Config()) # Get config from context
+    import tempfile
+    import git
+    from rich.panel import Panel
+    from rich.prompt import Confirm
+    from devbridge.commands.index_cmd import index_command
+    from devbridge.commands.find_cmd import find_command
+    from devbridge.commands.learn_cmd import learn_command_async
+
+    console = ctx.obj.get("console") or _console()
+    config = get_config(ctx)
     debug = ctx.obj.get("debug", False)
 
     console.print(Panel("[bold cyan]DevBridge Demo Mode[/]", expand=False, border_style="magenta"))
@@ -398,7 +597,7 @@ def demo_command(ctx: typer.Context):
         if Confirm.ask("Proceed with cloning the sample repository?", default=True):
             try:
                 console.print(f"[dim]Cloning '{sample_git_url}'...[/dim]")
-                git.Repo.clone_from(sample_git_url, temp_repo_path)
+                git.Repo.clone_from(sample_git_url, temp_repo_path, depth=1, single_branch=True)
                 console.print(f"[green]Successfully cloned '{sample_git_url}' to '{temp_repo_path}'.[/green]")
                 cloned_successfully = True
             except git.exc.GitCommandError as e_git:
@@ -463,7 +662,7 @@ def demo_command(ctx: typer.Context):
         if Confirm.ask("Proceed with learning (fetches public URL)?", default=True):
             try:
                 console.print(f"[dim]Executing: devbridge learn \"{demo_url}\" --mode aggregate --max-depth 0[/dim]")
-                asyncio.run(learn_command_async(
+                _run_async(learn_command_async(
                     repo_identifier=demo_url,
                     mode="aggregate",
                     max_depth=0,
@@ -491,7 +690,11 @@ def demo_command(ctx: typer.Context):
 @app.command(name="init") # Explicitly name it 'init'
 def init_cli_wrapper(ctx: typer.Context):
     """Onboard and configure DevBridge for first use."""
-    console = ctx.obj.get("console", Console())
+    from rich.prompt import Prompt, Confirm
+    from devbridge.commands import analyze_cmd, document_cmd, find_cmd, index_cmd
+
+    config = get_config(ctx)
+    console = ctx.obj.get("console") or _console()
     console.print("[bold cyan]\nWelcome to DevBridge![/]")
     console.print("[green]DevBridge[/] helps you transfer knowledge, code patterns, and best practices across all your projects.")
     console.print("\n[bold]Let's get you set up.[/]")
@@ -523,14 +726,12 @@ def init_cli_wrapper(ctx: typer.Context):
             if not repo_path:
                 console.print(f"[red]Could not find a valid directory for:[/] {repo_path_input}")
             else:
-                from devbridge.commands.index_cmd import index_command
-                index_command(ctx, [repo_path], 10, [], False)
+                index_cmd.index_command(ctx, [repo_path], 10, [], False)
                 console.print(f"[green]Indexing complete for:[/] {repo_path}")
                 # Prompt to search
                 if Confirm.ask("Would you like to search for a pattern now?", default=True):
                     query = Prompt.ask("Enter a search query (e.g. 'auth', 'error handling')", default="auth")
-                    from devbridge.commands.find_cmd import find_command
-                    results = find_command(ctx, query, None, None, None, None, 5)
+                    results = find_cmd.find_command(ctx, query, None, None, None, None, 5)
                     if not results:
                         console.print("[yellow]No results found.[/]")
                     else:
@@ -545,20 +746,15 @@ def init_cli_wrapper(ctx: typer.Context):
                 # If Q CLI present, prompt for doc/analyze
                 if shutil.which("q") and Confirm.ask("Would you like to try Amazon Q-powered documentation or analysis?", default=False):
                     path = Prompt.ask("Enter a file or folder to document/analyze", default=repo_path)
-                    from devbridge.commands.document_cmd import document_command
-                    from devbridge.commands.analyze_cmd import analyze_command
                     if Confirm.ask("Generate documentation?", default=True):
-                        document_command(ctx, path, "comprehensive", "markdown")
+                        document_cmd.document_command(ctx, path, "comprehensive", "markdown")
                     if Confirm.ask("Analyze code?", default=False):
-                        analyze_command(ctx, path, ["security"], False, False)
+                        analyze_cmd.analyze_command(ctx, path, ["security"], False, False)
         else:
             console.print("[yellow]Skipping indexing for now. You can run [bold]devbridge index <repo_name_or_path_or_url>[/] anytime.")
     else:
         console.print("[yellow]Skipping indexing for now. You can run [bold]devbridge index <repo_name_or_path_or_url>[/] anytime.")
-    # Save config (if needed)
-    from devbridge.utils.config import load_config
-    cfg = load_config(None)
-    console.print(f"[dim]Config loaded: {cfg}[/]")
+    console.print(f"[dim]Config loaded: {config}[/]")
     console.print("\n[bold green]You're all set![/]")
     console.print("- Use [bold]devbridge help[/] to see all commands and examples.")
     console.print("- Start searching with [bold]devbridge find 'pattern'[/].")
@@ -566,17 +762,139 @@ def init_cli_wrapper(ctx: typer.Context):
     console.print("- Generate docs or analyze code with [bold]devbridge document[/] and [bold]devbridge analyze[/].")
     console.print("\n[dim]Happy coding![/]")
 
+def _repo_basename(path_or_url: str, is_url: bool) -> str:
+    """Returns the workspace directory name for a repository URL or local path.
+
+    Plain string ops: `Path` would keep `owner:repo` for SCP-style `git@host:repo.git`
+    URLs and returns an empty name for `.`.
+    """
+    if not is_url:
+        return os.path.basename(os.path.abspath(path_or_url))
+    name = path_or_url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+    return name[:-4] if name.endswith(".git") else name
+
+# Buffer size for the read/write fallback of shutil's file copies.
+_COPY_BUFSIZE = 256 * 1024
+
+# Config applied to every workspace clone: index-pack on all cores, and give up
+# on transfers slower than 1 KB/s for 10s instead of stalling.
+_CLONE_CONFIG = (
+    ("pack.threads", "0"),
+    ("http.lowSpeedLimit", "1000"),
+    ("http.lowSpeedTime", "10"),
+)
+
+def _clone_env() -> dict:
+    """Environment for git clones: never prompt for credentials, plus `_CLONE_CONFIG`.
+
+    The config goes through GIT_CONFIG_COUNT rather than `-c`, which GitPython
+    rejects as an unsafe clone option, and it is not persisted in the clone.
+    """
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0", "GIT_CONFIG_COUNT": str(len(_CLONE_CONFIG))}
+    for i, (key, value) in enumerate(_CLONE_CONFIG):
+        env[f"GIT_CONFIG_KEY_{i}"] = key
+        env[f"GIT_CONFIG_VALUE_{i}"] = value
+    return env
+
+def _fast_rmtree(path: Path) -> None:
+    """Delete a directory tree, including git's read-only object files."""
+    if os.name == "nt":
+        # cmd's rmdir deletes in one native call instead of per-file from Python
+        import subprocess
+        result = subprocess.run(["cmd", "/c", "rmdir", "/s", "/q", str(path)], capture_output=True)
+        if result.returncode == 0 and not os.path.exists(path):
+            return
+
+    def _clear_readonly(func, failed_path, _exc):
+        import stat
+        os.chmod(failed_path, stat.S_IWRITE)
+        func(failed_path)
+
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=_clear_readonly)
+    else:
+        shutil.rmtree(path, onerror=_clear_readonly)
+
+def _unshallow_repo(repo_path: Path, console_instance: Console) -> None:
+    """Fetch the full history for a shallow clone; a no-op for complete clones."""
+    import git
+
+    if not (repo_path / ".git" / "shallow").exists():
+        return
+    console_instance.print(f"[dim]Fetching full history for shallow clone '{repo_path}'...[/dim]")
+    try:
+        git.Repo(repo_path).git.fetch("--unshallow")
+    except git.exc.GitCommandError as e_fetch:
+        console_instance.print(f"[yellow]Could not fetch full history for '{repo_path}': {e_fetch.stderr}[/yellow]")
+
+def _remote_head(url: str) -> Optional[str]:
+    """Return the commit the remote's HEAD points at (one ls-remote round-trip), or None."""
+    import subprocess
+
+    try:
+        result = subprocess.run(["git", "ls-remote", url, "HEAD"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout.split()[0]
+
+def _refresh_clone(repo_path: Path, url: str, console_instance: Console) -> None:
+    """Fast-forward an existing workspace clone to the remote HEAD, fetching only if it moved.
+
+    Local edits are never discarded: a dirty working tree, or local commits the remote
+    HEAD does not contain, leave the clone as is with a warning.
+    """
+    import git
+
+    try:
+        repo = git.Repo(repo_path)
+        local_head = repo.head.commit.hexsha
+    except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError, ValueError):
+        return
+    remote_head = _remote_head(url)
+    if remote_head is None or remote_head == local_head:
+        return
+    if repo.is_dirty(untracked_files=True):
+        console_instance.print(f"[yellow]Remote HEAD moved ({local_head[:8]} -> {remote_head[:8]}), but '{repo_path}' has local changes; not updating it.[/yellow]")
+        return
+    console_instance.print(f"[dim]Remote HEAD moved ({local_head[:8]} -> {remote_head[:8]}); fetching update...[/dim]")
+    try:
+        # No --depth: a shallow clone then fetches just the new commits on top of its tip,
+        # which a fast-forward needs (a depth-1 fetch would look like unrelated history).
+        repo.git.fetch("origin", "HEAD")
+        repo.git.merge("--ff-only", "FETCH_HEAD")
+    except git.exc.GitCommandError as e_fetch:
+        console_instance.print(f"[yellow]Could not fast-forward '{repo_path}', using it as is: {e_fetch.stderr}[/yellow]")
+
 # Helper function for repo add logic to be callable from index and repo add CLI command
-def add_repo_command_logic(config: Config, path_or_url: str, console_instance: Console, interactive_overwrite: bool = False) -> Optional[str]:
-    """Core logic to add a repository. Returns the local path string of the repo if successful."""
+def add_repo_command_logic(config: "Config", path_or_url: str, console_instance: Console, interactive_overwrite: bool = False, shallow: bool = True, sparse_paths: Optional[List[str]] = None, refresh: bool = True) -> Optional[str]:
+    """Core logic to add a repository. Returns the local path string of the repo if successful.
+
+    Remote repositories are cloned with only the tip commit unless ``shallow`` is
+    False, in which case the full history is fetched (blobs on demand) and an
+    existing shallow clone is deepened instead of re-cloned. ``sparse_paths``
+    limits the checkout of a remote clone to those directories. With ``refresh``,
+    a non-interactive call that finds the clone already in the workspace
+    fast-forwards it when the remote HEAD has moved.
+    """
+    import git
+    from rich.prompt import Confirm
+    from rich.text import Text
+
     ws_dir = Path(config.repo_workspace_dir)
     ws_dir.mkdir(parents=True, exist_ok=True)
     
     final_repo_path_str = None
-    is_url = path_or_url.startswith("http") or path_or_url.startswith("https") or path_or_url.startswith("git@")
+    is_url = path_or_url.startswith(URL_PREFIXES)
     
-    repo_name_candidate = Path(path_or_url).stem if is_url else Path(path_or_url).name
+    repo_name_candidate = _repo_basename(path_or_url, is_url)
     target_workspace_path = ws_dir / repo_name_candidate
+    # Resolved once; every branch below reports this same location.
+    resolved_workspace_path_str = str(target_workspace_path.resolve())
+    # Every branch that keeps an existing directory returns early, so after a
+    # successful removal the directory is known to be gone without a new stat.
+    was_removed = False
 
     try:
         if is_url:
@@ -585,27 +903,53 @@ def add_repo_command_logic(config: Config, path_or_url: str, console_instance: C
                     console_instance.print(f"[yellow]Warning:[/] Target directory '{target_workspace_path}' for URL '{path_or_url}' already exists.[/]")
                     if Confirm.ask(f"Do you want to remove the existing directory and re-clone '{path_or_url}'?", default=False):
                         try:
-                            shutil.rmtree(target_workspace_path)
+                            _fast_rmtree(target_workspace_path)
+                            was_removed = True
                             console_instance.print(f"[dim]Removed existing directory: {target_workspace_path}[/dim]")
                         except Exception as e_rm:
                             console_instance.print(f"[red]Error removing existing directory '{target_workspace_path}': {e_rm}[/]")
                             return None # Fail removal
                     else:
                         console_instance.print(f"[yellow]Aborted cloning. Repository '{repo_name_candidate}' not changed in workspace.[/]")
-                        return str(target_workspace_path.resolve()) # Return existing path as per user decision
+                        if not shallow:
+                            _unshallow_repo(target_workspace_path, console_instance)
+                        return resolved_workspace_path_str # Return existing path as per user decision
                 else: # Non-interactive, use existing
                     console_instance.print(f"[dim]Workspace directory '{target_workspace_path}' for URL '{path_or_url}' already exists. Using existing for non-interactive call.[/dim]")
-                    final_repo_path_str = str(target_workspace_path.resolve())
+                    if not shallow:
+                        _unshallow_repo(target_workspace_path, console_instance)
+                    if refresh:
+                        _refresh_clone(target_workspace_path, path_or_url, console_instance)
+                    final_repo_path_str = resolved_workspace_path_str
                     return final_repo_path_str
             
             # Proceed with cloning if path doesn't exist or was removed
-            if not target_workspace_path.exists(): # Re-check after potential removal
+            if was_removed or not target_workspace_path.exists(): # Re-check only if nothing was removed
                 console_instance.print(f"[dim]Cloning '{path_or_url}' into '{target_workspace_path}'...[/dim]")
-                cloned_repo = git.Repo.clone_from(path_or_url, target_workspace_path)
-                final_repo_path_str = str(Path(cloned_repo.working_tree_dir).resolve())
+                # A depth-1 checkout needs every tip blob anyway, so the blob
+                # filter only pays off when the whole history is fetched.
+                if sparse_paths:
+                    # Clone without a working tree, then check out only the requested directories.
+                    clone_options = ["--no-checkout", "--filter=blob:none"] + (["--depth=1"] if shallow else [])
+                    cloned_repo = git.Repo.clone_from(path_or_url, target_workspace_path, env=_clone_env(), multi_options=clone_options)
+                    cloned_repo.git.sparse_checkout("init", "--cone")
+                    cloned_repo.git.sparse_checkout("set", *sparse_paths)
+                    cloned_repo.git.checkout()
+                else:
+                    clone_options = ["--depth=1", "--single-branch"] if shallow else ["--filter=blob:none"]
+                    if not shallow and config.repo_cache_max_entries > 0:
+                        # Full clones borrow objects from a cached local mirror.
+                        from devbridge.utils.repo_cache import LRUClone
+                        try:
+                            mirror = LRUClone(config.repo_cache_dir, config.repo_cache_max_entries).get_or_fetch(path_or_url)
+                            clone_options = ["--reference", mirror, "--dissociate"]
+                        except git.exc.GitCommandError as e_mirror:
+                            console_instance.print(f"[dim]Clone cache unavailable, cloning directly: {e_mirror.stderr}[/dim]")
+                    git.Repo.clone_from(path_or_url, target_workspace_path, env=_clone_env(), multi_options=clone_options)
+                final_repo_path_str = resolved_workspace_path_str
                 console_instance.print(f"Cloned '{repo_name_candidate}' into workspace at '{final_repo_path_str}'.")
             else: # Existed and user chose not to remove (interactive) or it was a non-interactive call that found it
-                 final_repo_path_str = str(target_workspace_path.resolve())
+                 final_repo_path_str = resolved_workspace_path_str
 
         else: # Local path
             src = Path(path_or_url).resolve()
@@ -619,25 +963,32 @@ def add_repo_command_logic(config: Config, path_or_url: str, console_instance: C
                     console_instance.print(f"[yellow]Warning:[/] Target directory '{target_workspace_path}' for local copy '{src}' already exists.[/]")
                     if Confirm.ask(f"Do you want to remove the existing directory and re-copy from '{src}'?", default=False):
                         try:
-                            shutil.rmtree(target_workspace_path)
+                            _fast_rmtree(target_workspace_path)
+                            was_removed = True
                             console_instance.print(f"[dim]Removed existing directory: {target_workspace_path}[/dim]")
                         except Exception as e_rm_local:
                             console_instance.print(f"[red]Error removing existing directory '{target_workspace_path}': {e_rm_local}[/]")
                             return None # Fail removal
                     else:
                         console_instance.print(f"[yellow]Aborted copy. Repository '{src.name}' not changed in workspace.[/]")
-                        return str(target_workspace_path.resolve()) # Return existing path
+                        return resolved_workspace_path_str # Return existing path
                 else: # Non-interactive, use existing
                     console_instance.print(f"[dim]Workspace directory '{target_workspace_path}' for local path '{src}' already exists. Using existing for non-interactive call.[/dim]")
-                    final_repo_path_str = str(target_workspace_path.resolve())
+                    final_repo_path_str = resolved_workspace_path_str
                     return final_repo_path_str
 
-            if not target_workspace_path.exists(): # Re-check after potential removal
-                shutil.copytree(src, target_workspace_path)
-                final_repo_path_str = str(target_workspace_path.resolve())
+            if was_removed or not target_workspace_path.exists(): # Re-check only if nothing was removed
+                # copytree walks with os.scandir and reuses each entry's cached
+                # stat; keeping symlinks as links avoids following them at all.
+                # copy2 already uses sendfile/fcopyfile/CopyFileW where available;
+                # the larger buffer only matters for its read/write fallback.
+                if getattr(shutil, "COPY_BUFSIZE", 0) < _COPY_BUFSIZE:
+                    shutil.COPY_BUFSIZE = _COPY_BUFSIZE
+                shutil.copytree(src, target_workspace_path, symlinks=True)
+                final_repo_path_str = resolved_workspace_path_str
                 console_instance.print(f"Copied local repository '{src.name}' into workspace at '{final_repo_path_str}'.")
             else:
-                final_repo_path_str = str(target_workspace_path.resolve())
+                final_repo_path_str = resolved_workspace_path_str
 
         return final_repo_path_str
 
@@ -647,7 +998,7 @@ def add_repo_command_logic(config: Config, path_or_url: str, console_instance: C
             # Use Text concatenation for safety
             message_prefix = Text.from_markup(f"[yellow]Git clone failed for '{path_or_url}' as directory '{target_workspace_path}' already exists and is not empty. Using existing: ")
             console_instance.print(message_prefix + Text(escaped_stderr + "[/yellow]"))
-            return str(target_workspace_path.resolve())
+            return resolved_workspace_path_str
         else:
             # Use Text concatenation for safety
             message_prefix = Text.from_markup(f"[red]Git error while processing '{path_or_url}': ")
@@ -671,14 +1022,15 @@ def add_repo_command_logic(config: Config, path_or_url: str, console_instance: C
 @app.command("chat")
 def chat_cli_wrapper(ctx: typer.Context, 
                      repo_identifier: Optional[str] = typer.Option(None, "--repo", "-r", help="Optional repository context (name from workspace or local path)."),
-                     message: Optional[str] = typer.Option(None, "--message", "-m", help="An initial message to send to the chat.")):
+                     message: Optional[str] = typer.Option(None, "--message", "-m", help="An initial message to send to the chat."),
+                     persistent: bool = typer.Option(False, "--persistent", help="Keep one interactive `q chat` process for the whole session (experimental).")):
     """Start an interactive chat session with DevBridge AI (Amazon Q)."""
-    if not hasattr(ctx, "obj") or ctx.obj is None:
-        ctx.obj = {"config": Config(), "debug": False, "console": console}
-    else:
-        ctx.obj["console"] = console # Ensure console is in context
+    from devbridge.commands.chat_cmd import chat_command
+
+    get_config(ctx)
+    ctx.obj["console"] = _console() # Ensure console is in context
     # display_banner(ctx.obj["config"].app_name, ctx.obj["config"].app_version) # Banner is shown by main callback
-    chat_command(ctx, repo_identifier=repo_identifier, initial_message=message)
+    chat_command(ctx, repo_identifier=repo_identifier, initial_message=message, persistent=persistent)
 
 # Create a subcommand group for repository management
 repo_app = typer.Typer(name="repo", help="Manage local repositories in DevBridge workspace")
@@ -687,17 +1039,21 @@ app.add_typer(repo_app)
 @repo_app.command("add")
 def add_repo_cli_wrapper(
     ctx: typer.Context,
-    path_or_url: str = typer.Argument(..., help="Local directory path (e.g., `/path/to/my-project`) or a Git URL (e.g., `https://github.com/owner/repo.git`) to add/clone into the DevBridge workspace.")
+    path_or_url: str = typer.Argument(..., help="Local directory path (e.g., `/path/to/my-project`) or a Git URL (e.g., `https://github.com/owner/repo.git`) to add/clone into the DevBridge workspace."),
+    shallow: bool = typer.Option(True, "--shallow/--full-history", help="Clone only the latest commit (default), or fetch the full history."),
+    sparse: List[str] = typer.Option(
+        [], "--sparse", "-s", help="Only check out this directory of a remote repository (sparse checkout). Can be used multiple times."
+    )
 ):
     """Add a repository to the workspace by local path or Git URL.
     
     Handles interactive prompts if the target directory in the workspace already exists.
     Remote repositories are cloned into the workspace. Local paths are copied.
     """
-    cfg = ctx.obj["config"]
-    console_instance = ctx.obj.get("console", console)
+    cfg = get_config(ctx)
+    console_instance = ctx.obj.get("console") or _console()
     
-    added_path = add_repo_command_logic(cfg, path_or_url, console_instance, interactive_overwrite=True)
+    added_path = add_repo_command_logic(cfg, path_or_url, console_instance, interactive_overwrite=True, shallow=shallow, sparse_paths=list(sparse) or None)
     
     if not added_path:
         # Error messages are handled by add_repo_command_logic, 
@@ -708,26 +1064,28 @@ def add_repo_cli_wrapper(
 @repo_app.command("list")
 def list_repos(ctx: typer.Context):
     """List all repositories currently managed in the DevBridge workspace."""
-    cfg = ctx.obj["config"]
+    cfg = get_config(ctx)
     ws_dir = Path(cfg.repo_workspace_dir)
     if not ws_dir.exists():
         typer.echo("[yellow]No workspace directory found.")
         return
-    for d in ws_dir.iterdir():
-        if d.is_dir():
-            typer.echo(f"- {d.name}")
+    # DirEntry.is_dir() answers from the directory listing's d_type, so plain
+    # directories need no extra stat; symlinked repos are still followed.
+    with os.scandir(ws_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                typer.echo(f"- {entry.name}")
 
 @repo_app.command("remove")
 def remove_repo(ctx: typer.Context, name: str = typer.Argument(..., help="Name of the repository (as listed by `devbridge repo list`) to remove from the workspace.")):
     """Remove a repository and its files from the DevBridge workspace."""
-    cfg = ctx.obj["config"]
+    cfg = get_config(ctx)
     ws_dir = Path(cfg.repo_workspace_dir)
     target = ws_dir / name
     if not target.exists():
         typer.echo(f"[red]Repo not found: {target}")
         raise typer.Exit(1)
-    import shutil
-    shutil.rmtree(target)
+    _fast_rmtree(target)
     typer.echo(f"Removed repo '{name}' from workspace.")
 
 if __name__ == "__main__":
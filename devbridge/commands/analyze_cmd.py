@@ -1,20 +1,26 @@
 from rich.console import Console
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
 import subprocess
 from pathlib import Path
 import shlex
 from devbridge.utils.wsl_utils import windows_to_wsl_path
-import shutil
+from devbridge.utils.cli_utils import URL_PREFIXES, locate_target_path, stream_q_command, which_q
+import stat
 from rich.text import Text
 
 console = Console()
 
+def _analysis_prompt(wsl_target_path: str, checks: List[str], fix: bool) -> str:
+    checks_str = ", ".join(checks)
+    return f"Please read the file at the WSL path '{wsl_target_path}'. Then, analyze its content for the following checks: {checks_str}. If --fix is {fix}, also suggest fixes."
+
 def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve: bool):
     cfg = ctx.obj["config"]
     console.print(f"[cyan]Attempting to analyze path:[/] {path}")
 
     # Check if the input path looks like a URL
-    if path.startswith("http://") or path.startswith("https://"):
+    if path.startswith(URL_PREFIXES):
         console.print(f"[red]Error:[/] The path '{path}' looks like a URL.")
         console.print("[red]The 'analyze' command works on local file paths or directories only.[/]")
         console.print("[yellow]Hint:[/] If you want to analyze a remote repository, first add it to your workspace using:")
@@ -23,26 +29,22 @@ def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve:
         console.print(f"  [bold cyan]devbridge analyze {Path(path).stem}[/bold cyan]  (replace '{Path(path).stem}' with the actual local name)")
         return False # Indicate failure
 
-    # Determine the actual path to analyze
-    resolved_target_path = None
-    path_obj = Path(path)
-    workspace_path = Path(cfg.repo_workspace_dir) / path
+    # Determine the actual path to analyze (one stat per candidate location)
+    located = locate_target_path(path, cfg.repo_workspace_dir)
+    if located is None:
+        console.print(f"[red]Error:[/] Cannot find path '{path}'. It's not an absolute path, not in the workspace ('{cfg.repo_workspace_dir}'), and not found relative to the current directory.")
+        return False
 
-    if path_obj.is_absolute() and path_obj.exists():
-        resolved_target_path = path_obj
+    resolved_target_path, target_stat, source = located
+    if source == "absolute":
         console.print(f"[dim]Interpreting '{path}' as an absolute path.[/dim]")
-    elif workspace_path.exists():
-        resolved_target_path = workspace_path
+    elif source == "workspace":
         console.print(f"[dim]Found '{path}' in DevBridge workspace: {resolved_target_path}[/dim]")
-    elif path_obj.exists(): # Relative path from CWD
-        resolved_target_path = path_obj.resolve()
+    else: # Relative path from CWD
         console.print(f"[dim]Interpreting '{path}' as a relative path from CWD: {resolved_target_path}[/dim]")
-    else:
-        console.print(f"[red]Error:[/] Cannot find path '{path}'. It's not an absolute path, not in the workspace ('{cfg.repo_workspace_dir}'), and not found relative to the current directory.[/]")
-        return False
 
     # NEW: Check if the resolved path is a file or directory
-    if not resolved_target_path.is_file():
+    if not stat.S_ISREG(target_stat.st_mode):
         console.print(f"[red]Error:[/] The path '{resolved_target_path}' is a directory.")
         console.print("[red]The 'analyze' command currently operates on individual files.[/]")
         console.print(f"[yellow]Hint:[/] Please specify a specific file within the '{path}' project to analyze.")
@@ -54,13 +56,12 @@ def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve:
     # console.print("[yellow]Placeholder:[/] Would call Amazon Q to analyze the code against best practices or specific checks.")
     # Example of a potential Q call (now active)
     try:
-        abs_windows_path = str(resolved_target_path.resolve())
+        abs_windows_path = str(resolved_target_path)
         wsl_target_path = windows_to_wsl_path(abs_windows_path)
         console.print(f"[dim]Windows path resolved to: {abs_windows_path}[/dim]")
         console.print(f"[dim]WSL path for Q: {wsl_target_path}[/dim]")
 
-        checks_str = ", ".join(checks)
-        q_prompt = f"Please read the file at the WSL path '{wsl_target_path}'. Then, analyze its content for the following checks: {checks_str}. If --fix is {fix}, also suggest fixes."
+        q_prompt = _analysis_prompt(wsl_target_path, checks, fix)
         console.print(f"[dim]Amazon Q Prompt (raw): {q_prompt}[/dim]")
         
         escaped_q_prompt = shlex.quote(q_prompt)
@@ -68,7 +69,7 @@ def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve:
         # console.print(f"[dim]WSL Bash command: bash -ic {shlex.quote(q_chat_command_in_wsl)}[/dim]")
         
         # Since this script runs inside WSL, directly call q (assuming q is in PATH within WSL)
-        q_executable = shutil.which("q")
+        q_executable = which_q()
         if not q_executable:
             console.print("[red]Error:[/] Amazon Q CLI executable ('q') not found in WSL's PATH.[/]")
             console.print("[yellow]Hint:[/] Please ensure Amazon Q CLI is installed and its location is in your PATH inside WSL.")
@@ -84,12 +85,8 @@ def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve:
         direct_q_command = [q_executable, "chat", q_prompt]
         console.print(f"[dim]Direct Q command: {' '.join(direct_q_command)}[/dim]")
 
-        resp = subprocess.check_output(
-            direct_q_command,
-            text=True, timeout=180
-        )
         console.print("[green]Amazon Q Response (analysis):[/]")
-        console.print(resp)
+        stream_q_command(direct_q_command, console, timeout=180)
     except FileNotFoundError as e_fnf:
         console.print(Text.from_markup("[red]Amazon Q call failed (FileNotFoundError): [/red]"), Text(str(e_fnf)))
     except subprocess.CalledProcessError as e_proc:
@@ -103,4 +100,60 @@ def analyze_command(ctx, path: str, checks: List[str], fix: bool, auto_approve:
     except Exception as e:
         console.print(Text.from_markup("[red]General error during Amazon Q call: [/red]"), Text(str(e)))
     console.print("[green]Analyze command executed.[/]")
-    return True 
\ No newline at end of file
+    return True 
+
+async def _analyze_file(q_executable: str, file_path: Path, checks: List[str], fix: bool,
+                        semaphore: asyncio.Semaphore, timeout: int) -> Tuple[Path, Optional[int], str, str]:
+    """Runs one `q chat` analysis; returns (path, returncode or None on timeout, stdout, stderr)."""
+    q_prompt = _analysis_prompt(windows_to_wsl_path(str(file_path)), checks, fix)
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            q_executable, "chat", q_prompt,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return file_path, None, "", ""
+    return file_path, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+async def analyze_paths_async(ctx, path: str, pattern: str, checks: List[str], fix: bool, parallelism: int = 8) -> bool:
+    """Analyzes every file under `path` matching the glob `pattern`, running up to `parallelism` q processes at once."""
+    cfg = ctx.obj["config"]
+    located = locate_target_path(path, cfg.repo_workspace_dir)
+    if located is None or not stat.S_ISDIR(located[1].st_mode):
+        console.print(f"[red]Error:[/] '{path}' is not a directory (absolute, in the workspace, or relative to the current directory).")
+        return False
+    root = located[0]
+
+    files = sorted(p for p in root.glob(pattern) if p.is_file())
+    if not files:
+        console.print(f"[yellow]No files under '{root}' match '{pattern}'.[/]")
+        return False
+
+    q_executable = which_q()
+    if not q_executable:
+        console.print("[red]Error:[/] Amazon Q CLI executable ('q') not found in WSL's PATH.")
+        console.print("[yellow]Hint:[/] Please ensure Amazon Q CLI is installed and its location is in your PATH inside WSL.")
+        return False
+
+    console.print(f"[cyan]Analyzing {len(files)} file(s) under[/] {root} [cyan]with checks:[/] {', '.join(checks)}")
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+    results = await asyncio.gather(*(
+        _analyze_file(q_executable, f, checks, fix, semaphore, timeout=180) for f in files
+    ))
+
+    for file_path, returncode, stdout, stderr in results:
+        console.print(Text.from_markup("\n[green]Amazon Q Response (analysis) for[/green]"), Text(str(file_path.relative_to(root))))
+        if returncode is None:
+            console.print("[red]Amazon Q call timed out.[/]")
+        elif returncode != 0:
+            console.print(Text.from_markup(f"[red]Amazon Q call process error (exit code {returncode}):[/red]"))
+            if stderr:
+                console.print(Text.from_markup("[dim]Stderr: [/dim]"), Text(stderr))
+        else:
+            console.out(stdout, highlight=False)
+    console.print("[green]Analyze command executed.[/]")
+    return True
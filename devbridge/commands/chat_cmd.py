@@ -3,11 +3,16 @@
 import typer
 from rich.console import Console
 from rich.prompt import Prompt
+from rich.text import Text
+import asyncio
 import subprocess
-import shlex
-import shutil
+import queue
+import re
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Deque, Iterator, List, Optional, Tuple
 
 from devbridge.utils.config import Config
 from devbridge.utils.cli_utils import resolve_repo_path, get_q_executable, confirm_action # Assuming confirm_action and get_q_executable exist
@@ -15,18 +20,141 @@ from devbridge.utils.wsl_utils import windows_to_wsl_path
 
 console = Console()
 
+# Styled labels reused on every turn, parsed from markup once.
+_PROMPT_YOU = Text.from_markup("[magenta]You[/]")
+_PREFIX_Q = Text.from_markup("[blue]Amazon Q:[/]")
+_ERR_PREFIX = Text.from_markup("[red]General error during Amazon Q call:[/] ")
+
+# CSI/OSC escape sequences q uses to colour its output and prompt
+_ANSI_ESCAPE_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\))")
+
+class _QChatSession:
+    """A long-lived interactive `q chat` process that answers one prompt per turn.
+
+    A reply is considered complete when q prints its input prompt (a bare `>` line,
+    ignoring colour codes) or stays silent for `idle_timeout` seconds after producing output.
+    Reply lines that merely start with `>`, such as Markdown blockquotes, are kept.
+    """
+
+    PROMPT_RE = re.compile(r"> ?")
+
+    def __init__(self, q_exec: str, startup_timeout: float = 10.0, idle_timeout: float = 2.0):
+        self.idle_timeout = idle_timeout
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._proc = subprocess.Popen(
+            [q_exec, "chat"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, bufsize=1
+        )
+        threading.Thread(target=self._pump, daemon=True).start()
+        # Only use the session if q actually presents its interactive prompt
+        self.ready = self._read_until_prompt(startup_timeout, require_prompt=True) is not None
+
+    def _pump(self) -> None:
+        for line in self._proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None) # EOF
+
+    def _read_until_prompt(self, timeout: float, require_prompt: bool = False) -> Optional[str]:
+        """Collects output until the next prompt; returns None on EOF or timeout."""
+        collected: List[str] = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            wait = remaining if (require_prompt or not collected) else min(remaining, self.idle_timeout)
+            try:
+                line = self._lines.get(timeout=wait)
+            except queue.Empty:
+                if collected and not require_prompt:
+                    return "".join(collected) # Went quiet after answering
+                continue
+            if line is None:
+                return "".join(collected) if collected and not require_prompt else None
+            if self.PROMPT_RE.fullmatch(_ANSI_ESCAPE_RE.sub("", line).rstrip("\r\n")):
+                return "".join(collected)
+            collected.append(line)
+
+    def ask(self, prompt: str, timeout: float = 300) -> Optional[str]:
+        """Sends one prompt and returns q's reply, or None if the session broke or timed out."""
+        if self._proc.poll() is not None:
+            return None
+        try:
+            self._proc.stdin.write(prompt.replace("\n", " ") + "\n")
+            self._proc.stdin.flush()
+        except OSError:
+            return None
+        return self._read_until_prompt(timeout)
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+
+async def _stream_q_turn(command: List[str], timeout: float) -> Tuple[Optional[int], str, str]:
+    """Runs one `q chat` call, echoing stdout as it arrives.
+
+    Returns (returncode, stdout, stderr); returncode is None if the call timed out.
+    The process is killed on timeout or Ctrl-C.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout_lines: List[str] = []
+
+    async def _echo_stdout() -> None:
+        async for raw_line in proc.stdout:
+            line = raw_line.decode(errors="replace")
+            stdout_lines.append(line)
+            console.out(line, end="", highlight=False)
+
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    try:
+        await asyncio.wait_for(_echo_stdout(), timeout=timeout)
+        returncode = await proc.wait()
+    except asyncio.TimeoutError:
+        returncode = None
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    stderr = (await stderr_task).decode(errors="replace")
+    return returncode, "".join(stdout_lines), stderr
+
+def _iter_prompt_parts(wsl_repo_path_context: Optional[str], user_input: str) -> Iterator[str]:
+    """Yields the segments of one Q prompt, to be joined in a single pass."""
+    if wsl_repo_path_context:
+        yield f"Given the repository context at WSL path '{wsl_repo_path_context}', "
+    # Prior turns are kept in session_history but not yet sent to Q.
+    yield f"Please respond to the following: {user_input}"
+
 def chat_command(
     ctx: typer.Context,
     repo_identifier: Optional[str] = typer.Option(None, "--repo", "-r", help="Optional repository context (name from workspace or local path)."),
-    initial_message: Optional[str] = typer.Option(None, "--message", "-m", help="An initial message to send to the chat.")
+    initial_message: Optional[str] = typer.Option(None, "--message", "-m", help="An initial message to send to the chat."),
+    persistent: bool = False
 ):
-    """Starts an interactive chat session with Amazon Q, optionally within a specific repository context."""
+    """Starts an interactive chat session with Amazon Q, optionally within a specific repository context.
+
+    With `persistent`, one interactive `q chat` process serves every turn; if q does
+    not present an interactive prompt, each turn falls back to its own `q chat` call.
+    """
     cfg: Config = ctx.obj["config"]
     debug: bool = ctx.obj.get("debug", False)
     q_exec = get_q_executable(console)
     if not q_exec:
         return
 
+    q_session = None
+    if persistent:
+        q_session = _QChatSession(q_exec)
+        if not q_session.ready:
+            console.print("[dim]Interactive `q chat` prompt not detected; starting a new q process per message.[/dim]")
+            q_session.close()
+            q_session = None
+
     wsl_repo_path_context = None
     repo_context_message = ""
 
@@ -47,13 +175,14 @@ def chat_command(
         console.print(f"[italic green]{repo_context_message}[/italic green]")
     console.print("Type your questions or '/quit' to exit.")
 
-    session_history = [] # To maintain some context for Q, perhaps
+    # (user, q) pairs for the most recent turns; bounded so long sessions don't grow without limit
+    session_history: Deque[Tuple[str, str]] = deque(maxlen=cfg.chat_history_turns or 20)
 
     if initial_message:
         console.print(f"[magenta]You (initial):[/] {initial_message}")
         user_input = initial_message
     else:
-        user_input = Prompt.ask("[magenta]You[/]")
+        user_input = Prompt.ask(_PROMPT_YOU)
 
 
     while True:
@@ -62,28 +191,27 @@ def chat_command(
             break
 
         if not user_input.strip():
-            user_input = Prompt.ask("[magenta]You[/]")
+            user_input = Prompt.ask(_PROMPT_YOU)
             continue
 
         # Construct the prompt for Amazon Q
-        # For now, a simple prompt. Could be enhanced with history or specific instructions.
-        q_prompt_parts = []
-        if wsl_repo_path_context:
-            q_prompt_parts.append(f"Given the repository context at WSL path '{wsl_repo_path_context}',")
-        
-        # Simple history (last user message, last Q response) - can be expanded
-        # if session_history:
-        #     if len(session_history) > 0: # last Q
-        #        q_prompt_parts.append(f"Previously, I said: '{session_history[-1]['q']}'")
-        #     if len(session_history) > 1: # last User
-        #        q_prompt_parts.append(f"To which you asked: '{session_history[-2]['user']}'")
-
-        q_prompt_parts.append(f"Please respond to the following: {user_input}")
-        full_q_prompt = " ".join(q_prompt_parts)
+        full_q_prompt = "".join(_iter_prompt_parts(wsl_repo_path_context, user_input))
 
         if debug:
             console.print(f"[dim]Amazon Q Prompt (raw): {full_q_prompt}[/dim]")
 
+        if q_session is not None:
+            reply = q_session.ask(full_q_prompt, timeout=300)
+            if reply is not None:
+                console.print(_PREFIX_Q)
+                console.out(reply, highlight=False)
+                session_history.append((user_input, reply.strip()))
+                user_input = Prompt.ask(_PROMPT_YOU)
+                continue
+            console.print("[yellow]Persistent q session stopped responding; falling back to one q process per message.[/]")
+            q_session.close()
+            q_session = None
+
         try:
             # Direct Q call
             # No shlex.quote needed for list-based Popen/run
@@ -91,33 +219,18 @@ def chat_command(
             if debug:
                 console.print(f"[dim]Direct Q command: {' '.join(direct_q_command)}[/dim]")
 
-            # Using subprocess.Popen for interactive-like chat
-            # We want to stream the output as Q generates it.
-            # However, 'q chat' itself is interactive. We send one prompt and get one response.
-            # For a true streaming experience from Q's side, Q would need to support that.
-            # For now, check_output is fine for single turn.
-            
-            # If 'q chat' enters its own interactive loop, we might need to manage stdin/stdout more carefully
-            # For now, assume 'q chat <prompt>' gives a direct answer and exits.
-            process = subprocess.Popen(direct_q_command, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate(timeout=300) # Increased timeout
-
-            if process.returncode == 0:
-                console.print(f"[blue]Amazon Q:[/]")
-                # Filter out Q's interactive cruft if any, or known status lines.
-                # This is a heuristic.
-                lines = stdout.splitlines()
-                # Example filter:
-                # filtered_lines = [line for line in lines if not line.startswith(("To learn more about", "Welcome to", "╭──", "│", "╰──", "/help", "━━━━━━━━")) and "ctrl + j new lines" not in line]
-                # For now, let's just print it all and refine later if needed.
-                console.print(stdout)
-                session_history.append({"user": user_input, "q": stdout.strip()})
+            # 'q chat <prompt>' answers once and exits; its output is streamed as it arrives.
+            console.print(_PREFIX_Q)
+            returncode, stdout, stderr = asyncio.run(_stream_q_turn(direct_q_command, timeout=300))
+
+            if returncode is None:
+                raise subprocess.TimeoutExpired(direct_q_command, 300)
+            if returncode == 0:
+                session_history.append((user_input, stdout.strip()))
             else:
-                console.print(f"[red]Error from Amazon Q (Code: {process.returncode}):[/]")
-                if stdout:
-                    console.print(f"[dim]Stdout: {stdout}[/dim]")
+                console.print(f"[red]Error from Amazon Q (Code: {returncode}):[/]")
                 if stderr:
-                    console.print(f"[dim]Stderr: {stderr}[/dim]")
+                    console.print(Text.from_markup("[dim]Stderr: [/dim]"), Text(stderr))
                 # Don't add to history if error
         
         except subprocess.TimeoutExpired:
@@ -126,8 +239,10 @@ def chat_command(
             console.print(f"[red]Error:[/] Amazon Q CLI executable ('{q_exec}') not found or other components missing.[/]")
             break # Exit chat if Q is not found
         except Exception as e:
-            console.print(f"[red]General error during Amazon Q call: {e}[/]")
+            console.print(_ERR_PREFIX + Text(str(e)))
 
-        user_input = Prompt.ask("[magenta]You[/]")
+        user_input = Prompt.ask(_PROMPT_YOU)
 
+    if q_session is not None:
+        q_session.close()
     console.print("Chat session ended.") 
\ No newline at end of file
@@ -3,7 +3,8 @@ import subprocess
 from pathlib import Path
 import shlex # Added for shell argument quoting
 from devbridge.utils.wsl_utils import windows_to_wsl_path
-import shutil
+from devbridge.utils.cli_utils import URL_PREFIXES, locate_target_path, stream_q_command, which_q
+import stat
 from rich.text import Text # Added import
 
 console = Console()
@@ -13,7 +14,7 @@ def document_command(ctx, path: str, strategy: str, output_format: str):
     console.print(f"[cyan]Attempting to document path:[/] {path}")
 
     # Check if the input path looks like a URL
-    if path.startswith("http://") or path.startswith("https://"):
+    if path.startswith(URL_PREFIXES):
         console.print(f"[red]Error:[/] The path '{path}' looks like a URL.")
         console.print("[red]The 'document' command works on local file paths or directories only.[/]")
         console.print("[yellow]Hint:[/] If you want to document a remote repository, first add it to your workspace using:")
@@ -22,26 +23,22 @@ def document_command(ctx, path: str, strategy: str, output_format: str):
         console.print(f"  [bold cyan]devbridge document {Path(path).stem}[/bold cyan]  (replace '{Path(path).stem}' with the actual local name)")
         return False # Indicate failure
 
-    # Determine the actual path to document
-    resolved_target_path = None
-    path_obj = Path(path)
-    workspace_path = Path(cfg.repo_workspace_dir) / path
+    # Determine the actual path to document (one stat per candidate location)
+    located = locate_target_path(path, cfg.repo_workspace_dir)
+    if located is None:
+        console.print(f"[red]Error:[/] Cannot find path '{path}'. It's not an absolute path, not in the workspace ('{cfg.repo_workspace_dir}'), and not found relative to the current directory.")
+        return False
 
-    if path_obj.is_absolute() and path_obj.exists():
-        resolved_target_path = path_obj
+    resolved_target_path, target_stat, source = located
+    if source == "absolute":
         console.print(f"[dim]Interpreting '{path}' as an absolute path.[/dim]")
-    elif workspace_path.exists():
-        resolved_target_path = workspace_path
+    elif source == "workspace":
         console.print(f"[dim]Found '{path}' in DevBridge workspace: {resolved_target_path}[/dim]")
-    elif path_obj.exists(): # Relative path from CWD
-        resolved_target_path = path_obj.resolve()
+    else: # Relative path from CWD
         console.print(f"[dim]Interpreting '{path}' as a relative path from CWD: {resolved_target_path}[/dim]")
-    else:
-        console.print(f"[red]Error:[/] Cannot find path '{path}'. It's not an absolute path, not in the workspace ('{cfg.repo_workspace_dir}'), and not found relative to the current directory.[/]")
-        return False
 
     # NEW: Check if the resolved path is a file or directory
-    if not resolved_target_path.is_file():
+    if not stat.S_ISREG(target_stat.st_mode):
         console.print(f"[red]Error:[/] The path '{resolved_target_path}' is a directory.")
         console.print("[red]The 'document' command currently operates on individual files.[/]")
         console.print(f"[yellow]Hint:[/] Please specify a specific file within the '{path}' project to document.")
@@ -53,7 +50,7 @@ def document_command(ctx, path: str, strategy: str, output_format: str):
     # Example of a potential Q call (now active)
     try:
         # Resolve the input path to an absolute Windows path first
-        abs_windows_path = str(resolved_target_path.resolve()) # Use the determined resolved_target_path
+        abs_windows_path = str(resolved_target_path) # Already resolved by locate_target_path
         wsl_target_path = windows_to_wsl_path(abs_windows_path)
         console.print(f"[dim]Windows path resolved to: {abs_windows_path}[/dim]")
         console.print(f"[dim]WSL path for Q: {wsl_target_path}[/dim]")
@@ -66,7 +63,7 @@ def document_command(ctx, path: str, strategy: str, output_format: str):
         escaped_q_prompt = shlex.quote(q_prompt)
         
         # Since this script runs inside WSL, directly call q
-        q_executable = shutil.which("q")
+        q_executable = which_q()
         if not q_executable:
             console.print("[red]Error:[/] Amazon Q CLI executable ('q') not found in WSL's PATH.[/]")
             console.print("[yellow]Hint:[/] Please ensure Amazon Q CLI is installed and its location is in your PATH inside WSL.")
@@ -75,12 +72,8 @@ def document_command(ctx, path: str, strategy: str, output_format: str):
         direct_q_command = [q_executable, "chat", q_prompt] # Use the original, unescaped q_prompt
         console.print(f"[dim]Direct Q command: {' '.join(direct_q_command)}[/dim]")
 
-        resp = subprocess.check_output(
-            direct_q_command,
-            text=True, timeout=180 # Further increased timeout for WSL + bash -ic + Q
-        )
         console.print("[green]Amazon Q Response (documentation draft):[/]")
-        console.print(resp)
+        stream_q_command(direct_q_command, console, timeout=180)
     except FileNotFoundError as e_fnf:
         # This could be `wsl` not found, or `q` not found within WSL.
         console.print(Text.from_markup("[red]Amazon Q call failed (FileNotFoundError): [/red]"), Text(str(e_fnf)))
@@ -1,15 +1,65 @@
+import itertools
 import os
+import re
 from pathlib import Path
-from rich.table import Table
 from rich.console import Console
 from rich.text import Text
-from devbridge.utils.storage import _conn
+from devbridge.utils.storage import _conn, has_fts
 from typing import Optional
 
 console = Console()
 
 # MAX_SNIPPET_LENGTH = 100 # Max characters for a snippet - snippet is now directly from DB
 
+# The trigram index can only narrow a LIKE pattern with a run of 3+ literal characters;
+# shorter queries would scan the whole index, so they use the plain LIKE scan.
+_FTS_USABLE_QUERY_RE = re.compile(r"[^%_]{3}")
+
+_FIND_SELECT = """
+    SELECT 
+        r.name as repo_name,
+        f.relative_path as file_path,
+        f.language as file_lang,
+        ce.element_type,
+        ce.name as element_name,
+        ce.snippet,
+        ce.start_line
+    FROM code_elements ce
+    JOIN indexed_files f ON ce.file_id = f.id
+    JOIN repositories r ON f.repository_id = r.id
+"""
+
+_QUERY_CONDITIONS = {
+    "like": "(ce.name LIKE ? OR ce.snippet LIKE ?)",
+    # Trigram candidates, re-checked with the same LIKE so results match the plain scan exactly
+    "fts": """ce.id IN (
+        SELECT rowid FROM code_elements_fts WHERE name LIKE ?
+        UNION SELECT rowid FROM code_elements_fts WHERE snippet LIKE ?
+    ) AND (ce.name LIKE ? OR ce.snippet LIKE ?)""",
+}
+
+def _build_find_sql(query_mode: Optional[str], repo: bool, language: bool, element_type: bool) -> str:
+    """Assembles the find SQL for one combination of active filters."""
+    conditions = [_QUERY_CONDITIONS[query_mode]] if query_mode else []
+    if repo:
+        conditions.append("r.name LIKE ?") # Or r.path, depending on desired behavior
+    if language:
+        conditions.append("f.language = ?")
+    if element_type:
+        conditions.append("ce.element_type LIKE ?")
+    if not conditions:
+        # Unfiltered listing: walk code_elements in rowid order and stop at LIMIT, no sort step.
+        return _FIND_SELECT + " ORDER BY ce.id LIMIT ?"
+    sql = _FIND_SELECT + " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY r.name, f.relative_path, ce.start_line LIMIT ?" # Meaningful order
+
+# Every filter combination is built once at import, so repeated finds reuse identical SQL text
+# (and hit sqlite3's per-connection statement cache).
+_FIND_SQL = {
+    key: _build_find_sql(*key)
+    for key in itertools.product((None, "like", "fts"), (False, True), (False, True), (False, True))
+}
+
 def find_command(
     ctx,
     query: str,
@@ -20,116 +70,65 @@ def find_command(
     limit: int
 ):
     cfg = ctx.obj["config"]
-    found_matches = []
     
-    # Build the SQL query dynamically
-    sql_select_columns = """
-        SELECT 
-            r.name as repo_name,
-            f.relative_path as file_path,
-            f.language as file_lang,
-            ce.element_type,
-            ce.name as element_name,
-            ce.snippet,
-            ce.start_line
-    """
-    sql_from_clause = """
-        FROM code_elements ce
-        JOIN indexed_files f ON ce.file_id = f.id
-        JOIN repositories r ON f.repository_id = r.id
-    """
-    sql_where_conditions = []
-    params = []
-
-    # Query against element name and snippet
-    if query:
-        sql_where_conditions.append("(ce.name LIKE ? OR ce.snippet LIKE ?)")
-        params.extend([f"%{query}%", f"%{query}%"])
-
+    # Pick the prebuilt SQL for the active filters; params follow the same condition order.
+    query_params = [f"%{query}%", f"%{query}%"] if query else []
+    filter_params = []
     if repo_filter:
-        sql_where_conditions.append("r.name LIKE ?") # Or r.path, depending on desired behavior
-        params.append(f"%{repo_filter}%")
-    
+        filter_params.append(f"%{repo_filter}%")
     if language_filter:
-        sql_where_conditions.append("f.language = ?")
-        params.append(language_filter.lower())
-
+        filter_params.append(language_filter.lower())
     if type_filter:
-        sql_where_conditions.append("ce.element_type LIKE ?")
-        params.append(f"%{type_filter}%")
-        
+        filter_params.append(f"%{type_filter}%")
     # framework_filter is not used yet as DB doesn't store it.
+    filter_params.append(limit)
+    filter_key = (bool(repo_filter), bool(language_filter), bool(type_filter))
+    sql_query = _FIND_SQL[("like" if query else None,) + filter_key]
 
-    sql_query = sql_select_columns + sql_from_clause
-    if sql_where_conditions:
-        sql_query += " WHERE " + " AND ".join(sql_where_conditions)
-    
-    sql_query += " ORDER BY r.name, f.relative_path, ce.start_line" # Meaningful order
-    sql_query += " LIMIT ?"
-    params.append(limit)
+    # Results are built straight from the cursor, with their explainability, in one pass;
+    # the query is lowercased once.
+    query_lower = query.lower() if query else ""
+    explained_results = []
+
+    def collect(cursor):
+        for row in cursor:
+            # Each row is a tuple: (repo_name, file_path, file_lang, element_type, element_name, snippet, start_line)
+            element_name = row[4] if row[4] else "" # Handle None names
+            snippet = row[5][:200] + "..." if row[5] and len(row[5]) > 200 else row[5] # Truncate long snippets from DB
+            why = []
+            if query_lower in element_name.lower():
+                why.append("name matches query")
+            if query_lower in (snippet or "").lower():
+                why.append("code snippet matches query")
+            if not why:
+                why.append("fuzzy/other match")
+            explained_results.append({
+                "repo_name": row[0],
+                "file_path": row[1], # This is already relative to its repo
+                "lang": row[2],
+                "element_type": row[3],
+                "element_name": element_name,
+                "snippet": snippet,
+                "line_num": row[6],
+                "why_matched": ", ".join(why),
+            })
 
     if ctx.obj.get("debug", False):
         print(f"[DEBUG] Executing SQL query: {sql_query}")
-        print(f"[DEBUG] With params: {params}")
+        print(f"[DEBUG] With params: {query_params + filter_params}")
 
     with _conn(cfg.storage_path) as c:
         try:
-            cursor = c.execute(sql_query, tuple(params))
-            db_rows = cursor.fetchall()
+            if query and _FTS_USABLE_QUERY_RE.search(query) and has_fts(c):
+                collect(c.execute(_FIND_SQL[("fts",) + filter_key], query_params * 2 + filter_params))
+            else:
+                collect(c.execute(sql_query, query_params + filter_params))
             if ctx.obj.get("debug", False):
-                print(f"[DEBUG] Rows fetched: {db_rows}")
+                print(f"[DEBUG] Rows fetched: {len(explained_results)}")
         except Exception as e:
             if ctx.obj.get("debug", False):
                 console.print(f"[DEBUG] Database query error: {e}")
             return None
 
-    for row in db_rows:
-        # Each row is a tuple: (repo_name, file_path, file_lang, element_type, element_name, snippet, start_line)
-        found_matches.append({
-            "repo_name": row[0],
-            "file_path": row[1], # This is already relative to its repo
-            "lang": row[2],
-            "element_type": row[3],
-            "element_name": row[4] if row[4] else "", # Handle None names
-            "snippet": row[5][:200] + "..." if row[5] and len(row[5]) > 200 else row[5], # Truncate long snippets from DB
-            "line_num": row[6]
-        })
-
-    # After fetching results, add explainability
-    explained_results = []
-    for row in found_matches:
-        why = []
-        if query.lower() in (row.get("element_name") or "").lower():
-            why.append("name matches query")
-        if query.lower() in (row.get("snippet") or "").lower():
-            why.append("code snippet matches query")
-        if not why:
-            why.append("fuzzy/other match")
-        row["why_matched"] = ", ".join(why)
-        explained_results.append(row)
-
-    table = Table(title=f"Found {len(explained_results)} results for '{query}'" + (f" (type: {type_filter})" if type_filter else ""))
-    table.add_column("Repository", style="blue", no_wrap=False)
-    table.add_column("File", style="cyan", no_wrap=False)
-    table.add_column("L#", style="magenta", justify="right")
-    table.add_column("Type", style="yellow")
-    table.add_column("Name", style="green")
-    table.add_column("Snippet", max_width=80) # Ensure Rich handles wrapping
-
-    if not explained_results:
-        table.add_row("[dim]No matches found based on your criteria.[/]")
-    else:
-        for match in explained_results:
-            # Construct full display path for clarity if needed, or keep as repo + relative_path
-            # For now, repo_name and relative_path are separate columns
-            table.add_row(
-                match["repo_name"],
-                match["file_path"],
-                str(match["line_num"]),
-                match["element_type"],
-                match["element_name"],
-                match["snippet"]
-            )
-    
-    # console.print(table) # Table printing moved to cli.py
+    # The table is rendered by cli.py from these dicts; nothing is laid out here.
     return explained_results 
\ No newline at end of file
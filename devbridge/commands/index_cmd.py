@@ -4,63 +4,122 @@ import sys
 import hashlib # For file hashing
 from typing import List, Tuple, Optional # Added Tuple, Optional
 import re # For basic name extraction
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 from rich.console import Console
-from devbridge.utils.storage import init_db, _conn
+from devbridge.utils.storage import init_db, _conn, bulk_insert_elements
 # Assuming your Pydantic models might be used later for structuring data before DB interaction
 # from devbridge.models import Repository, IndexedFile, CodeElement # Example model imports
-from devbridge.utils.js_parser import extract_js_elements
+from devbridge.utils.js_parser import extract_js_elements_batch
+from devbridge.utils.py_parser import extract_py_elements, line_offsets, source_lines
+from devbridge.utils.ts_parser import TREE_SITTER_LANGUAGES, extract_ts_elements
 
 console = Console()
 
+# Extension -> language, built once at import rather than on every call.
+# Expanded list slightly
+_EXT_LANG_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".java": "java",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".h": "c_header",
+    ".hpp": "cpp_header",
+    ".cs": "csharp",
+    ".go": "go",
+    ".rb": "ruby",
+    ".php": "php",
+    ".rs": "rust",
+    ".kt": "kotlin",
+    ".swift": "swift",
+    ".md": "markdown",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".html": "html",
+    ".css": "css",
+}
+
+# JS/TS files sent to the Node parser per pipelined batch; bounds the sources held in memory.
+JS_BATCH_SIZE = 256
+
 def guess_lang(path_obj: Path) -> str: # Takes Path object
-    ext = path_obj.suffix.lower() # Ensure lowercase for matching
-    # Expanded list slightly
-    return {
-        ".py": "python",
-        ".js": "javascript",
-        ".ts": "typescript",
-        ".java": "java",
-        ".c": "c",
-        ".cpp": "cpp",
-        ".h": "c_header",
-        ".hpp": "cpp_header",
-        ".cs": "csharp",
-        ".go": "go",
-        ".rb": "ruby",
-        ".php": "php",
-        ".rs": "rust",
-        ".kt": "kotlin",
-        ".swift": "swift",
-        ".md": "markdown",
-        ".json": "json",
-        ".yaml": "yaml",
-        ".yml": "yaml",
-        ".html": "html",
-        ".css": "css",
-    }.get(ext, "text")
+    return _EXT_LANG_MAP.get(path_obj.suffix.lower(), "text") # Ensure lowercase for matching
 
 def calculate_file_hash(file_path: Path) -> str:
     """Calculates SHA256 hash of a file."""
-    sha256_hash = hashlib.sha256()
     try:
         with open(file_path, "rb") as f:
-            # Read and update hash string value in blocks of 4K
-            for byte_block in iter(lambda: f.read(4096), b""):
+            if hasattr(hashlib, "file_digest"): # Python 3.11+: the read/update loop runs in C
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            sha256_hash = hashlib.sha256()
+            # Read and update hash string value in blocks of 1 MiB
+            for byte_block in iter(lambda: f.read(1 << 20), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
     except IOError:
         # console.print(f"[yellow]Warning:[/] Could not read file {file_path} for hashing.")
         return "" # Return empty string on error to allow skipping
 
+# Whitespace then a typical function/class name (alphanumeric + underscore, not starting with number)
+_NAME_AFTER_KEYWORD_RE = re.compile(r"\s+([a-zA-Z_][a-zA-Z0-9_]*)")
+
 def extract_element_name(line: str, keyword: str) -> Optional[str]:
-    """Rudimentary extraction of function/class name from a line."""
-    # Regex to capture typical function/class names (alphanumeric + underscore, not starting with number)
-    match = re.search(rf"{keyword}\s+([a-zA-Z_][a-zA-Z0-9_]*)(\(|:)?", line)
+    """Rudimentary extraction of function/class name from a line starting with `keyword`."""
+    # Anchored match right after the keyword; no per-call pattern formatting or scanning.
+    if not line.startswith(keyword):
+        return None
+    match = _NAME_AFTER_KEYWORD_RE.match(line, len(keyword))
     return match.group(1) if match else None
 
-def index_repository(c, repo_path_str: str, depth: int, exclude: List[str], force: bool):
-    """Indexes a single repository."""
+def _scan_repo_files(abs_repo_path: Path, depth: int, exclude_re: Optional[re.Pattern]) -> List[Tuple[str, str, os.stat_result]]:
+    """Lists indexable files as (path, path relative to the repo, stat) tuples.
+
+    Walks with os.scandir so directory checks and stats come from the DirEntry,
+    without building a Path per entry. Hidden entries, paths matching `exclude_re`
+    and directories `depth` levels or more below the root are skipped.
+    """
+    root_str = str(abs_repo_path)
+    root_name = os.path.basename(root_str)
+    if (exclude_re and exclude_re.search(root_str.replace(os.sep, "/"))) or root_name.startswith('.'):
+        return []
+
+    prefix_len = len(root_str.rstrip(os.sep)) + 1
+    files: List[Tuple[str, str, os.stat_result]] = []
+    stack = [(root_str, 0)]
+    while stack:
+        current_dir, current_depth = stack.pop()
+        if current_depth >= depth:
+            continue
+        try:
+            entries = list(os.scandir(current_dir))
+        except OSError:
+            continue # Unreadable directory; os.walk skipped these silently too
+        for entry in entries:
+            name = entry.name
+            if name[0] == '.':
+                continue
+            try:
+                if entry.is_dir():
+                    # Symlinked directories are listed but, as with os.walk, not followed.
+                    if not entry.is_symlink() and not (exclude_re and exclude_re.search(entry.path.replace(os.sep, "/"))):
+                        stack.append((entry.path, current_depth + 1))
+                    continue
+                if exclude_re and exclude_re.search(name):
+                    continue
+                files.append((entry.path, entry.path[prefix_len:], entry.stat()))
+            except OSError:
+                continue # Broken symlink or entry removed mid-scan
+    return files
+
+def index_repository(c, repo_path_str: str, depth: int, exclude: List[str], force: bool, commit_each_file: bool = False, verbose: bool = False):
+    """Indexes a single repository.
+
+    With `commit_each_file`, every processed file is committed on its own so the write
+    lock is released while the next file is parsed; parallel workers use this.
+    """
     abs_repo_path = Path(repo_path_str).resolve()
     repo_name = abs_repo_path.name
 
@@ -83,162 +142,192 @@ def index_repository(c, repo_path_str: str, depth: int, exclude: List[str], forc
     # console.print(f"[cyan]Indexing repository:[/] {repo_name} (ID: {repo_id})")
     
     indexed_file_count = 0
-    for root, dirs, files in os.walk(abs_repo_path, topdown=True):
-        # Handle depth
-        current_depth = len(Path(root).relative_to(abs_repo_path).parts)
-        if current_depth >= depth:
-            dirs[:] = [] 
-            continue
+    # All exclude substrings as one alternation, so each path is scanned once.
+    exclude_re = re.compile("|".join(re.escape(p) for p in exclude)) if exclude else None
+    candidate_files = _scan_repo_files(abs_repo_path, depth, exclude_re)
 
-        # Handle excludes for directories
-        # If a directory itself is excluded, os.walk will not traverse it further if we modify dirs[:]
-        original_dirs_len = len(dirs)
-        dirs[:] = [d for d in dirs if not any(ex_pattern in Path(root, d).as_posix() for ex_pattern in exclude) and not d.startswith('.')]
-        # if len(dirs) < original_dirs_len:
-            # console.print(f"[dim]Pruned excluded or hidden subdirectories in {root}[/dim]")
+    # Rows already indexed for this repo: relative_path -> (id, file_hash, mtime_ns, size)
+    known_files = {
+        row[0]: row[1:]
+        for row in c.execute(
+            "SELECT relative_path, id, file_hash, mtime_ns, size FROM indexed_files WHERE repository_id = ?",
+            (repo_id,),
+        )
+    }
 
-        if any(ex_pattern in Path(root).as_posix() for ex_pattern in exclude) or Path(root).name.startswith('.'):
-            dirs[:] = [] # Don't traverse this excluded or hidden directory further
-            # console.print(f"[dim]Skipping excluded or hidden directory: {root}[/dim]")
+    # Only files whose mtime or size moved since the last run need their contents hashed.
+    changed_files = []
+    for file_path_str, relative_file_path_str, st in candidate_files:
+        file_row = known_files.get(relative_file_path_str)
+        if file_row and not force and file_row[2] == st.st_mtime_ns and file_row[3] == st.st_size:
             continue
-            
-        for f_name in files:
-            if f_name.startswith('.'):
-                # console.print(f"[dim]Skipping hidden file: {f_name}[/dim]")
-                continue
-            if any(ex_pattern in f_name for ex_pattern in exclude):
-                # console.print(f"[dim]Skipping excluded file pattern: {f_name}[/dim]")
-                continue
+        changed_files.append((Path(file_path_str), relative_file_path_str, st, file_row))
 
-            file_path_obj = Path(root) / f_name
-            relative_file_path_str = str(file_path_obj.relative_to(abs_repo_path))
-            
-            lang = guess_lang(file_path_obj)
-            file_hash = calculate_file_hash(file_path_obj)
+    # Hash the rest up front; hashlib and file reads release the GIL, so threads overlap them.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        file_hashes = list(executor.map(calculate_file_hash, [entry[0] for entry in changed_files]))
 
-            if not file_hash:
-                if ctx.obj.get("verbose", False):
-                    console.print(f"[yellow]Skipping file due to hashing error or empty file:[/] {file_path_obj}")
-                continue
+    # JS/TS files for the Node parser: (file_id, path, source). They are sent to the worker as one
+    # pipelined batch of up to JS_BATCH_SIZE files instead of one round trip per file.
+    pending_js = []
+
+    def flush_js_batch():
+        sources = [source for _, _, source in pending_js]
+        for (js_file_id, js_path, _), js_elements in zip(pending_js, extract_js_elements_batch(sources)):
+            if not js_elements:
+                console.print(f"[yellow][DEBUG] No JS/TS elements found in {js_path}[/]")
+            for elem in js_elements:
+                console.print(f"[green][DEBUG] Inserting JS/TS element:[/] {elem}")
+            bulk_insert_elements(c, [
+                (js_file_id, elem['type'], elem['name'], elem['snippet'][:255], elem['start_line'], elem['end_line'])
+                for elem in js_elements
+            ])
+        pending_js.clear()
+        if commit_each_file:
+            c.commit()
+
+    for (file_path_obj, relative_file_path_str, st, file_row), file_hash in zip(changed_files, file_hashes):
+        lang = guess_lang(file_path_obj)
+
+        if not file_hash:
+            if verbose:
+                console.print(f"[yellow]Skipping file due to hashing error or empty file:[/] {file_path_obj}")
+            continue
+
+        file_id: Optional[int] = None
+        process_elements = True 
 
-            cursor = c.execute("SELECT id, file_hash FROM indexed_files WHERE repository_id = ? AND relative_path = ?",
-                               (repo_id, relative_file_path_str))
-            file_row = cursor.fetchone()
-            
-            file_id: Optional[int] = None
-            process_elements = True 
-
-            if file_row:
-                file_id = file_row[0]
-                if file_row[1] == file_hash and not force:
-                    # console.print(f"[dim]Unchanged file, skipping element processing: {relative_file_path_str}[/dim]")
-                    process_elements = False # File exists and hash matches, and not forcing
-                else:
-                    c.execute("""
-                        UPDATE indexed_files 
-                        SET language = ?, file_hash = ?, last_scanned_at = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    """, (lang, file_hash, file_id))
-                    c.execute("DELETE FROM code_elements WHERE file_id = ?", (file_id,))
-                    # console.print(f"[dim]Updated changed file: {relative_file_path_str}[/dim]")
+        if file_row:
+            file_id = file_row[0]
+            if file_row[1] == file_hash and not force:
+                # console.print(f"[dim]Unchanged file, skipping element processing: {relative_file_path_str}[/dim]")
+                process_elements = False # File exists and hash matches, and not forcing
+                # Touched but identical: record the new stat so the next run skips hashing it.
+                c.execute("UPDATE indexed_files SET mtime_ns = ?, size = ? WHERE id = ?",
+                          (st.st_mtime_ns, st.st_size, file_id))
             else:
-                cursor = c.execute("""
-                    INSERT INTO indexed_files (repository_id, relative_path, language, file_hash)
-                    VALUES (?, ?, ?, ?)
-                """, (repo_id, relative_file_path_str, lang, file_hash))
-                file_id = cursor.lastrowid
-                # console.print(f"[dim]Added new file: {relative_file_path_str}[/dim]")
-            
-            if not file_id:
-                # console.print(f"[red]Error:[/] Could not get or create file ID for {relative_file_path_str}")
-                continue
+                c.execute("""
+                    UPDATE indexed_files 
+                    SET language = ?, file_hash = ?, mtime_ns = ?, size = ?, last_scanned_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (lang, file_hash, st.st_mtime_ns, st.st_size, file_id))
+                c.execute("DELETE FROM code_elements WHERE file_id = ?", (file_id,))
+                # console.print(f"[dim]Updated changed file: {relative_file_path_str}[/dim]")
+        else:
+            cursor = c.execute("""
+                INSERT INTO indexed_files (repository_id, relative_path, language, file_hash, mtime_ns, size)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (repo_id, relative_file_path_str, lang, file_hash, st.st_mtime_ns, st.st_size))
+            file_id = cursor.lastrowid
+            # console.print(f"[dim]Added new file: {relative_file_path_str}[/dim]")
+        
+        if not file_id:
+            # console.print(f"[red]Error:[/] Could not get or create file ID for {relative_file_path_str}")
+            continue
 
-            if process_elements:
-                indexed_file_count +=1 # Count files whose elements are processed
-                try:
-                    with open(file_path_obj, 'r', encoding='utf-8', errors='ignore') as f_content:
-                        in_docstring = False
-                        docstring_start_line = None
-                        docstring_content = []
-                        lines = f_content.readlines()
-                        if lang in ["javascript", "typescript"]:
-                            # Use Node.js-based parser for JS/TS
-                            source_code = ''.join(lines)
-                            js_elements = extract_js_elements(source_code)
-                            if not js_elements:
-                                console.print(f"[yellow][DEBUG] No JS/TS elements found in {file_path_obj}[/]")
-                            for elem in js_elements:
-                                console.print(f"[green][DEBUG] Inserting JS/TS element:[/] {elem}")
-                                c.execute("""
-                                    INSERT INTO code_elements (file_id, element_type, name, snippet, start_line, end_line)
-                                    VALUES (?, ?, ?, ?, ?, ?)
-                                """, (file_id, elem['type'], elem['name'], elem['snippet'][:255], elem['start_line'], elem['end_line']))
-                        else:
-                            for line_num, line_text in enumerate(lines, 1):
-                                line_text_stripped = line_text.strip()
-                                if not line_text_stripped: # Skip empty lines
-                                    continue
-                                element_type: Optional[str] = None
-                                element_name: Optional[str] = None
-                                # --- Python-specific logic ---
-                                if lang == "python":
-                                    # Docstring detection (triple quotes)
-                                    if (line_text_stripped.startswith('"""') or line_text_stripped.startswith("'''") ):
-                                        if not in_docstring:
-                                            in_docstring = True
-                                            docstring_start_line = line_num
-                                            docstring_content = [line_text_stripped]
-                                            if (line_text_stripped.endswith('"""') and len(line_text_stripped) > 3) or (line_text_stripped.endswith("'''") and len(line_text_stripped) > 3):
-                                                # Single-line docstring
-                                                c.execute("""
-                                                    INSERT INTO code_elements (file_id, element_type, name, snippet, start_line, end_line)
-                                                    VALUES (?, ?, ?, ?, ?, ?)
-                                                """, (file_id, "docstring", None, line_text_stripped[:255], line_num, line_num))
-                                                in_docstring = False
-                                                docstring_content = []
-                                        else:
-                                            # End of multi-line docstring
-                                            docstring_content.append(line_text_stripped)
-                                            c.execute("""
-                                                INSERT INTO code_elements (file_id, element_type, name, snippet, start_line, end_line)
-                                                VALUES (?, ?, ?, ?, ?, ?)
-                                            """, (file_id, "docstring", None, '\n'.join(docstring_content)[:255], docstring_start_line, line_num))
+        if process_elements:
+            indexed_file_count +=1 # Count files whose elements are processed
+            try:
+                with open(file_path_obj, 'r', encoding='utf-8', errors='ignore') as f_content:
+                    in_docstring = False
+                    docstring_start_line = None
+                    source_offsets = None # Line offsets, computed on the first multi-line docstring
+                    lines = f_content.readlines()
+                    # Rows for this file, written with a single executemany below.
+                    elements_buffer = []
+                    parsed_elements = None
+                    if lang == "python":
+                        try:
+                            parsed_elements = extract_py_elements(''.join(lines), str(file_path_obj))
+                        except (SyntaxError, ValueError):
+                            pass # Unparseable source: fall back to the line scanner below
+                    elif lang in TREE_SITTER_LANGUAGES:
+                        # None unless tree_sitter_languages is installed; JS/TS then use the Node parser.
+                        parsed_elements = extract_ts_elements(''.join(lines), lang)
+                    if parsed_elements is not None:
+                        elements_buffer.extend(
+                            (file_id, elem['type'], elem['name'], elem['snippet'][:255], elem['start_line'], elem['end_line'])
+                            for elem in parsed_elements
+                        )
+                    elif lang in ["javascript", "typescript"]:
+                        # Use Node.js-based parser for JS/TS, batched (see flush_js_batch)
+                        pending_js.append((file_id, file_path_obj, ''.join(lines)))
+                    else:
+                        for line_num, line_text in enumerate(lines, 1):
+                            line_text_stripped = line_text.strip()
+                            if not line_text_stripped: # Skip empty lines
+                                continue
+                            element_type: Optional[str] = None
+                            element_name: Optional[str] = None
+                            # --- Python-specific logic ---
+                            if lang == "python":
+                                # Docstring detection (triple quotes)
+                                if (line_text_stripped.startswith('"""') or line_text_stripped.startswith("'''") ):
+                                    if not in_docstring:
+                                        in_docstring = True
+                                        docstring_start_line = line_num
+                                        if (line_text_stripped.endswith('"""') and len(line_text_stripped) > 3) or (line_text_stripped.endswith("'''") and len(line_text_stripped) > 3):
+                                            # Single-line docstring
+                                            elements_buffer.append((file_id, "docstring", None, line_text_stripped[:255], line_num, line_num))
                                             in_docstring = False
-                                            docstring_content = []
-                                        continue
-                                    elif in_docstring:
-                                        docstring_content.append(line_text_stripped)
-                                        continue
-                                    # Function and class detection
-                                    if line_text_stripped.startswith("def "):
-                                        element_type = "function_py"
-                                        element_name = extract_element_name(line_text_stripped, "def")
-                                    elif line_text_stripped.startswith("class "):
-                                        element_type = "class_py"
-                                        element_name = extract_element_name(line_text_stripped, "class")
-                                    # TODO detection
-                                    elif line_text_stripped.startswith("# TODO"):
-                                        element_type = "todo"
-                                        element_name = None
-                                    # Comment detection (not TODO)
-                                    elif line_text_stripped.startswith("#"):
-                                        element_type = "comment"
-                                        element_name = None
-                                # --- General TODO/comment detection for other languages ---
-                                elif line_text_stripped.lower().startswith("todo"):
+                                    else:
+                                        # End of multi-line docstring
+                                        # One slice of the original source instead of a list of stripped lines.
+                                        if source_offsets is None:
+                                            source_code = ''.join(lines)
+                                            source_offsets = line_offsets(source_code)
+                                        docstring = source_lines(source_code, source_offsets, docstring_start_line, line_num)
+                                        elements_buffer.append((file_id, "docstring", None, docstring[:255], docstring_start_line, line_num))
+                                        in_docstring = False
+                                    continue
+                                elif in_docstring:
+                                    continue
+                                # Function and class detection
+                                if line_text_stripped.startswith("def "):
+                                    element_type = "function_py"
+                                    element_name = extract_element_name(line_text_stripped, "def")
+                                elif line_text_stripped.startswith("class "):
+                                    element_type = "class_py"
+                                    element_name = extract_element_name(line_text_stripped, "class")
+                                # TODO detection
+                                elif line_text_stripped.startswith("# TODO"):
                                     element_type = "todo"
                                     element_name = None
-                                # Insert detected element
-                                if element_type:
-                                    c.execute("""
-                                        INSERT INTO code_elements (file_id, element_type, name, snippet, start_line, end_line)
-                                        VALUES (?, ?, ?, ?, ?, ?)
-                                    """, (file_id, element_type, element_name, line_text_stripped[:255], line_num, line_num)) # Truncate snippet
-                except Exception as e:
-                    if ctx.obj.get("verbose", False):
-                        console.print(f"[yellow]Warning:[/] Could not process file {file_path_obj} for elements: {e}")
+                                # Comment detection (not TODO)
+                                elif line_text_stripped.startswith("#"):
+                                    element_type = "comment"
+                                    element_name = None
+                            # --- General TODO/comment detection for other languages ---
+                            elif line_text_stripped.lower().startswith("todo"):
+                                element_type = "todo"
+                                element_name = None
+                            # Insert detected element
+                            if element_type:
+                                elements_buffer.append((file_id, element_type, element_name, line_text_stripped[:255], line_num, line_num)) # Truncate snippet
+                    if elements_buffer:
+                        bulk_insert_elements(c, elements_buffer)
+            except Exception as e:
+                if verbose:
+                    console.print(f"[yellow]Warning:[/] Could not process file {file_path_obj} for elements: {e}")
+            if commit_each_file:
+                c.commit()
+            if len(pending_js) >= JS_BATCH_SIZE:
+                flush_js_batch()
+    if pending_js:
+        flush_js_batch()
     return indexed_file_count
 
+def _index_one_repo(repo_path_str: str, depth: int, exclude: List[str], force: bool, storage_path: str, verbose: bool = False) -> int:
+    """Process-pool entry point: indexes one repository on the worker's own connection."""
+    with _conn(storage_path) as c:
+        try:
+            num_files = index_repository(c, repo_path_str, depth, exclude, force, commit_each_file=True, verbose=verbose)
+            c.commit()
+            return num_files
+        except Exception:
+            c.rollback()
+            raise
+
 def index_command(ctx, repos: List[str], depth:int, exclude:List[str], force:bool):
     cfg = ctx.obj["config"]
     print(f"[DEBUG] Using database file: {cfg.storage_path}")
@@ -258,23 +347,49 @@ def index_command(ctx, repos: List[str], depth:int, exclude:List[str], force:boo
     if force:
         console.print("[yellow]Force re-indexing enabled: All elements in changed/new files will be re-processed.[/]")
 
+    repo_paths = []
+    for repo_path_str in repos:
+        abs_repo_path = Path(repo_path_str).resolve()
+        if not abs_repo_path.is_dir():
+            console.print(f"[yellow]Warning:[/] Repository path not found or not a directory, skipping: {abs_repo_path}")
+            continue
+        repo_paths.append(abs_repo_path)
+
+    if len(repo_paths) > 1:
+        # One process per repository, each on its own WAL connection; per-file commits keep
+        # the write lock short, so a failure only rolls back that repository's current file.
+        with ProcessPoolExecutor(max_workers=min(len(repo_paths), os.cpu_count() or 1)) as executor:
+            futures = {
+                executor.submit(_index_one_repo, str(abs_repo_path), depth, exclude, force, cfg.storage_path, verbose): abs_repo_path
+                for abs_repo_path in repo_paths
+            }
+            for future in as_completed(futures):
+                abs_repo_path = futures[future]
+                try:
+                    num_files = future.result()
+                except Exception as e:
+                    console.print(f"[bold red]Error indexing {abs_repo_path.name}, its uncommitted changes were rolled back: {e}[/]")
+                    continue
+                total_indexed_files += num_files
+                repo_count += 1
+                if verbose:
+                    console.print(f"[cyan]Finished processing repository:[/] {abs_repo_path.name}. Indexed/Updated {num_files} files containing elements.")
+        repo_paths = []
+
     with _conn(cfg.storage_path) as c:
         try:
-            for repo_path_str in repos:
-                abs_repo_path = Path(repo_path_str).resolve()
-                if not abs_repo_path.is_dir():
-                    console.print(f"[yellow]Warning:[/] Repository path not found or not a directory, skipping: {abs_repo_path}")
-                    continue
-                
+            for abs_repo_path in repo_paths:
                 if verbose:
                     console.print(f"[cyan]Processing repository:[/] {abs_repo_path.name} (Path: {abs_repo_path})")
                 
-                num_files = index_repository(c, str(abs_repo_path), depth, exclude, force)
+                num_files = index_repository(c, str(abs_repo_path), depth, exclude, force, verbose=verbose)
                 total_indexed_files += num_files
                 repo_count +=1
                 if verbose:
                     console.print(f"[cyan]Finished processing repository:[/] {abs_repo_path.name}. Indexed/Updated {num_files} files containing elements.")
             c.commit()
+            # Refresh planner statistics so find picks the code_elements indexes.
+            c.execute("ANALYZE")
         except Exception as e:
             c.rollback()
             console.print(f"[bold red]Critical error during indexing, operation rolled back: {e}[/]")
@@ -4,12 +4,14 @@ It fetches documentation from a specified repository identifier (URL or slug),
 converts it to Markdown, and displays it.
 """
 import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 import click
-from rich.console import Console
+from rich.console import Console, Group
 from rich.markdown import Markdown
 import time # For simple timeout measurement if needed
 import requests
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pathlib import Path
 
 # Instead of requests, we'll use our new utilities
@@ -19,12 +21,55 @@ from pathlib import Path
 from devbridge.utils.deepwiki_helpers import normalize_repo_identifier, construct_deepwiki_url
 from devbridge.utils.http_crawler import crawl as crawl_pages, CrawlResult
 from devbridge.utils.html_to_markdown import html_to_markdown
+from devbridge.utils import md_cache
 
 # DEEPWIKI_MCP_URL = "http://localhost:3000/mcp" # REMOVE
 # REQUEST_TIMEOUT_SECONDS = 30 # REMOVE - timeout will be handled by crawler if necessary
 
 console = Console()
 
+# Below this many uncached pages, process startup costs more than converting serially.
+PARALLEL_CONVERT_MIN_PAGES = 4
+
+# Minimum seconds between crawl-progress updates of the status spinner.
+STATUS_UPDATE_INTERVAL_S = 0.1
+
+async def _iter_markdown(urls: List[str], html_contents: Dict[str, str], mode: str, no_cache: bool) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Yields (url, markdown) for each page in `urls` order, using the on-disk cache unless
+    `no_cache` is set. Cache misses are converted in a process pool when there are enough
+    of them, so the CPU-bound BeautifulSoup/markdownify work runs on several cores off the
+    event loop; each page is yielded as soon as it and the pages before it are ready.
+    """
+    # One hash of each page's HTML, shared by the contains/get/put lookups below
+    keys = {} if no_cache else {url: md_cache.key(html_contents[url], mode, url) for url in urls}
+    misses = [url for url in urls if no_cache or not md_cache.contains(keys[url])]
+    cpu_count = os.cpu_count() or 1
+    executor = None
+    pending = {}
+    if len(misses) >= PARALLEL_CONVERT_MIN_PAGES and cpu_count > 1:
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=min(len(misses), cpu_count))
+        pending = {url: loop.run_in_executor(executor, html_to_markdown, html_contents[url], mode, url) for url in misses}
+    try:
+        for url in urls:
+            html_doc = html_contents[url]
+            if url in pending:
+                md_content, converted = await pending.pop(url), True
+            else:
+                md_content = None if no_cache else md_cache.get(keys[url])
+                converted = md_content is None
+                if converted:
+                    md_content = html_to_markdown(html_doc, mode, url)
+            if converted and not no_cache:
+                md_cache.put(keys[url], md_content)
+            yield url, md_content
+    finally:
+        if executor is not None:
+            for future in pending.values():
+                future.cancel()
+            executor.shutdown()
+
 async def learn_command_async(
     repo_identifier: str, 
     mode: str = "aggregate", 
@@ -35,7 +80,10 @@ async def learn_command_async(
     user_agent: str = "DevBridgeBot/0.1", # Default user agent
     respect_robots_txt: bool = True,      # Default to respecting robots.txt
     crawl_retry_limit: int = 2,           # Default retry limit for crawler fetches
-    crawl_backoff_base_ms: int = 500    # Default backoff base for crawler fetches
+    crawl_backoff_base_ms: int = 500,   # Default backoff base for crawler fetches
+    no_cache: bool = False,             # Bypass the on-disk Markdown/page caches
+    cache_max_mb: int = 256,            # On-disk cache budget; least recently used entries are evicted past it
+    crawl_order: bool = False           # Aggregate pages in fetch-completion order instead of sorted by URL
 ) -> None:
     """
     Asynchronously fetches documentation from a repository identifier, processes it,
@@ -57,13 +105,16 @@ async def learn_command_async(
             return
 
         if verbose:
-            console.print(f"Target URL: {target_url}")
-            console.print(f"Crawl mode: {mode}, Max depth: {max_depth}")
-            console.print(f"[dim]Max depth: {max_depth}[/dim]")
-            console.print(f"[dim]User-Agent: {user_agent}[/dim]")
-            console.print(f"[dim]Respect robots.txt: {respect_robots_txt}[/dim]")
-            console.print(f"[dim]Crawl Retry Limit: {crawl_retry_limit}[/dim]")
-            console.print(f"[dim]Crawl Backoff Base (ms): {crawl_backoff_base_ms}[/dim]")
+            # One Group, one render pass
+            console.print(Group(
+                f"Target URL: {target_url}",
+                f"Crawl mode: {mode}, Max depth: {max_depth}",
+                f"[dim]Max depth: {max_depth}[/dim]",
+                f"[dim]User-Agent: {user_agent}[/dim]",
+                f"[dim]Respect robots.txt: {respect_robots_txt}[/dim]",
+                f"[dim]Crawl Retry Limit: {crawl_retry_limit}[/dim]",
+                f"[dim]Crawl Backoff Base (ms): {crawl_backoff_base_ms}[/dim]",
+            ))
 
         status.update(f"Fetching content from {target_url} (depth: {max_depth})...")
         
@@ -81,14 +132,27 @@ async def learn_command_async(
 
         try:
             # Define a progress callback for the crawler if verbose
+            abbreviated_urls: Dict[str, str] = {}
+            last_status_update = 0.0
             async def _progress_callback(data: dict):
+                nonlocal last_status_update
                 if verbose:
                     progress_type = data.get("type", "info")
-                    if progress_type == "progress":
+                    if progress_type == "batch": # The crawler delivers events in batches
+                        for event in data["events"]:
+                            await _progress_callback(event)
+                    elif progress_type == "progress":
+                        # The spinner cannot show more than ~10 updates/s, so skip the rest
+                        now = time.monotonic()
+                        if now - last_status_update < STATUS_UPDATE_INTERVAL_S:
+                            return
+                        last_status_update = now
                         # Shorten URL for status message if too long
-                        url_to_show = data.get('url', '')
-                        if len(url_to_show) > 50:
-                            url_to_show = url_to_show[:25] + "..." + url_to_show[-22:]
+                        url = data.get('url', '')
+                        url_to_show = abbreviated_urls.get(url)
+                        if url_to_show is None:
+                            url_to_show = url if len(url) <= 50 else url[:25] + "..." + url[-22:]
+                            abbreviated_urls[url] = url_to_show
                         status_msg = f"Crawling: {url_to_show} ({data.get('bytes',0)}B, {data.get('fetched_count',0)} fetched, {data.get('queue_size',0)} queued)"
                         status.update(status_msg)
                     elif progress_type == "error":
@@ -101,15 +165,22 @@ async def learn_command_async(
                 user_agent=user_agent, 
                 respect_robots_txt=respect_robots_txt,
                 retry_limit=crawl_retry_limit,
-                backoff_base_ms=crawl_backoff_base_ms
+                backoff_base_ms=crawl_backoff_base_ms,
+                cached_page=None if no_cache else md_cache.get_page,
+                verbose=verbose # Per-link skip events are only emitted for verbose runs
             )
+            for url, validators in crawl_result.validators.items():
+                if not no_cache and url not in crawl_result.not_modified:
+                    md_cache.put_page(url, validators, crawl_result.html_contents[url])
 
             if verbose:
-                console.print(f"Crawl finished in {crawl_result.elapsed_ms:.2f} ms. Fetched {len(crawl_result.html_contents)} pages, {crawl_result.total_bytes} bytes.")
+                summary_lines = [f"Crawl finished in {crawl_result.elapsed_ms:.2f} ms. Fetched {len(crawl_result.html_contents)} pages, {crawl_result.total_bytes} bytes."]
+                if crawl_result.not_modified:
+                    summary_lines.append(f"[dim]{len(crawl_result.not_modified)} pages unchanged since the last run (served from cache).[/dim]")
                 if crawl_result.errors:
-                    console.print("[yellow]Crawler encountered errors:")
-                    for err_url, err_msg in crawl_result.errors.items():
-                        console.print(f"  - {err_url}: {err_msg}")
+                    summary_lines.append("[yellow]Crawler encountered errors:")
+                    summary_lines.extend(f"  - {err_url}: {err_msg}" for err_url, err_msg in crawl_result.errors.items())
+                console.print(Group(*summary_lines))
             
             if not crawl_result.html_contents:
                 if not crawl_result.errors: # No content and no specific crawl errors
@@ -124,26 +195,33 @@ async def learn_command_async(
 
             status.update("Converting HTML to Markdown...")
             
-            final_markdown_parts = []
             if mode == "aggregate":
-                all_html_for_aggregate = []
-                # For aggregate mode, we need a defined order if possible.
-                # The deepwiki-mcp crawler might have a specific order based on links.
-                # Our current simple crawler stores in a dict (unordered).
-                # For now, just join them. A more sophisticated approach might sort by URL path.
-                sorted_urls = sorted(crawl_result.html_contents.keys())
-
-                for i, url in enumerate(sorted_urls):
-                    html_doc = crawl_result.html_contents[url]
-                    if verbose:
-                        console.print(f"Converting page: {url} to Markdown for aggregation...")
-                    # Add a title/separator for aggregated content
-                    # The h1 from the page will be the primary title. This adds context.
-                    if len(sorted_urls) > 1:
-                         final_markdown_parts.append(f"\n---\n*Source URL: {url}*\n\n")
-                    md_content = html_to_markdown(html_doc, mode="aggregate", base_url=url)
-                    final_markdown_parts.append(md_content)
-                final_markdown = "\n".join(final_markdown_parts)
+                # Pages are sorted by URL so the output is the same on every run. With crawl_order
+                # they follow html_contents, which fills as concurrent fetches complete: the root
+                # page is first, but the order of the rest can change between runs.
+                urls = list(crawl_result.html_contents) if crawl_order else sorted(crawl_result.html_contents)
+                if verbose:
+                    console.print(f"Converting {len(urls)} pages to Markdown for aggregation...")
+
+                # Each page is written out as soon as it is converted, so only one page of
+                # Markdown is held at a time instead of the whole aggregate.
+                out = output_file.open("w", encoding="utf-8") if output_file else None
+                try:
+                    async for url, md_content in _iter_markdown(urls, crawl_result.html_contents, "aggregate", no_cache):
+                        # Add a title/separator for aggregated content
+                        # The h1 from the page will be the primary title. This adds context.
+                        if len(urls) > 1:
+                            md_content = f"\n---\n*Source URL: {url}*\n\n\n{md_content}"
+                        if out:
+                            out.write(md_content if out.tell() == 0 else "\n" + md_content)
+                        else:
+                            console.print(Markdown(md_content))
+                finally:
+                    if out:
+                        out.close()
+                if output_file:
+                    console.print(f"Markdown written to [cyan]{output_file}[/cyan]")
+                return
             else: # mode == "pages" (or any other mode, treated as individual pages for now)
                 # Display first page found, or allow selection later?
                 # For now, let's display content of the root_url if available, else the first one.
@@ -155,13 +233,22 @@ async def learn_command_async(
                     html_doc = crawl_result.html_contents[page_to_display_url]
                     if verbose:
                         console.print(f"Converting page: {page_to_display_url} to Markdown (pages mode display)...")
-                    final_markdown = html_to_markdown(html_doc, mode="pages", base_url=page_to_display_url)
+                    md_key = None if no_cache else md_cache.key(html_doc, "pages", page_to_display_url)
+                    final_markdown = md_cache.get(md_key) if md_key else None
+                    if final_markdown is None:
+                        final_markdown = html_to_markdown(html_doc, mode="pages", base_url=page_to_display_url)
+                        if md_key:
+                            md_cache.put(md_key, final_markdown)
                     if len(crawl_result.html_contents) > 1 and verbose:
                         console.print(f"[dim]Note: {len(crawl_result.html_contents)} pages were fetched. Displaying content from {page_to_display_url}. Other pages not shown in this mode.[/dim]")
                 else:
                     console.print(f"[yellow]Target page {page_to_display_url} not found in fetched content.")
                     return
 
+            if output_file:
+                output_file.write_text(final_markdown, encoding="utf-8")
+                console.print(f"Markdown written to [cyan]{output_file}[/cyan]")
+                return
             status.update("Displaying content...")
             console.print(Markdown(final_markdown))
 
@@ -176,6 +263,8 @@ async def learn_command_async(
                 console.print(f"[dim]{traceback.format_exc()}[/dim]")
                 console.print("[dim]--- End Traceback ---[/dim]")
         finally:
+            if not no_cache:
+                md_cache.prune(cache_max_mb * 1024 * 1024)
             end_time = time.monotonic()
             if verbose:
                 console.print(f"Total execution time: {end_time - start_time:.2f} seconds")
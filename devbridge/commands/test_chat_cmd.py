@@ -0,0 +1,26 @@
+import sys
+
+from devbridge.commands.chat_cmd import _QChatSession
+
+_FAKE_Q = """\
+import sys
+print("\\x1b[32m>\\x1b[0m ", flush=True)
+for line in sys.stdin:
+    print("> quoted from the docs", flush=True)
+    print(">not a prompt either", flush=True)
+    print("done", flush=True)
+    print("\\x1b[1m> \\x1b[0m", flush=True)
+"""
+
+def test_session_keeps_reply_lines_starting_with_gt(tmp_path):
+    script = tmp_path / "fake_q.py"
+    script.write_text(_FAKE_Q)
+    q_exec = tmp_path / "q"
+    q_exec.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}"\n')
+    q_exec.chmod(0o755)
+    session = _QChatSession(str(q_exec), idle_timeout=30)
+    try:
+        assert session.ready
+        assert session.ask("hi", timeout=30) == "> quoted from the docs\n>not a prompt either\ndone\n"
+    finally:
+        session.close()
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from devbridge.commands.find_cmd import find_command
+from devbridge.utils.storage import _conn, init_db, bulk_insert_elements
+
+def _ctx(tmp_path, elements):
+    """A click-like ctx over a fresh database holding `elements` as (element_type, name) in one file."""
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    with _conn(db_path) as c:
+        repo_id = c.execute("INSERT INTO repositories (name, path) VALUES ('my-foo', '/tmp/my-foo')").lastrowid
+        file_id = c.execute(
+            "INSERT INTO indexed_files (repository_id, relative_path, language) VALUES (?, 'auth.js', 'javascript')",
+            (repo_id,),
+        ).lastrowid
+        bulk_insert_elements(c, [
+            (file_id, element_type, name, f"function {name}() {{}}", line, line)
+            for line, (element_type, name) in enumerate(elements, start=1)
+        ])
+    return SimpleNamespace(obj={"config": SimpleNamespace(storage_path=db_path)})
+
+def _names(results):
+    return sorted(r["element_name"] for r in results)
+
+def test_find_keeps_substring_matches_alongside_fts_hits(tmp_path):
+    ctx = _ctx(tmp_path, [
+        ("function_js_ts", "getAuth"),
+        ("function_js_ts", "UserAuth"),
+        ("function_js_ts", "authenticate"),
+    ])
+    assert _names(find_command(ctx, "auth", None, None, None, None, 10)) == ["UserAuth", "authenticate", "getAuth"]
+
+def test_find_index_returns_exactly_the_like_scan_rows(tmp_path):
+    ctx = _ctx(tmp_path, [("function_js_ts", f"getAuth{i}") for i in range(5)] + [
+        ("function_js_ts", "authenticate"),
+        ("function_js_ts", "api_key"),
+        ("function_js_ts", "apiXkey"),
+    ])
+    queries = [("auth", 3), ("auth", 10), ("authentication", 10), ("api_key", 10), ("Auth0", 10), ("th", 10)]
+    with_index = [find_command(ctx, q, None, None, None, None, n) for q, n in queries]
+    with _conn(ctx.obj["config"].storage_path) as c:
+        c.execute("DROP TABLE code_elements_fts") # Forces the plain LIKE scan
+    assert with_index == [find_command(ctx, q, None, None, None, None, n) for q, n in queries]
+    # Same LIKE semantics and ORDER BY as the scan: no stemming, "_" is a wildcard, sorted by line under LIMIT
+    assert _names(with_index[2]) == []
+    assert _names(with_index[3]) == ["apiXkey", "api_key"]
+    assert [r["element_name"] for r in with_index[0]] == ["getAuth0", "getAuth1", "getAuth2"]
+
+def _types(results):
+    return sorted(r["element_type"] for r in results)
+
+def test_find_repo_and_type_filters_match_substrings(tmp_path):
+    ctx = _ctx(tmp_path, [("docstring", "a"), ("todo", "b"), ("function_py", "c"), ("class_py", "d")])
+    assert _types(find_command(ctx, "", None, None, None, "do", 10)) == ["docstring", "todo"]
+    assert _types(find_command(ctx, "", None, None, None, "py", 10)) == ["class_py", "function_py"]
+    assert len(find_command(ctx, "", "foo", None, None, None, 10)) == 4 # repo is "my-foo"
+    assert len(find_command(ctx, "", "my", None, None, None, 10)) == 4
+    assert find_command(ctx, "", "bar", None, None, None, 10) == []
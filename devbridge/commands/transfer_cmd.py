@@ -1,26 +1,63 @@
-import shutil, subprocess, uuid, os
+import subprocess, uuid, os
 from rich.console import Console
 from pathlib import Path
 import shlex
+from devbridge.utils.cli_utils import URL_PREFIXES, fast_copy, get_q_executable, stream_q_command
 from devbridge.utils.wsl_utils import windows_to_wsl_path
 from rich.text import Text
 
 console = Console()
 
+# Directories that never hold files worth transferring but can be huge.
+_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv"})
+
+def _find_first_file(root_dir, pattern):
+    """First file whose name contains `pattern`, or None. Skips _SKIP_DIRS.
+
+    Walks with os.scandir in the same top-down order as os.walk (a directory's files
+    before its subdirectories), taking names and types from the DirEntry.
+    """
+    stack = [os.fspath(root_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue # Unreadable directory; os.walk skipped these silently too
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                if pattern in entry.name:
+                    return entry.path
+            elif entry.name not in _SKIP_DIRS and not entry.is_symlink():
+                subdirs.append(entry.path)
+        stack.extend(reversed(subdirs))
+    return None
+
+def _reject_url(name: str, flag: str) -> bool:
+    """Prints an error and returns True if `name` (the value of `flag`) is a URL rather than a local repo."""
+    if not name.startswith(URL_PREFIXES):
+        return False
+    console.print(f"[red]Error:[/] The {flag} path '{name}' looks like a URL.")
+    console.print("[red]The 'transfer' command works with local repository paths or names from the DevBridge workspace.[/]")
+    console.print("[yellow]Hint:[/] If you want to use a remote repository, first add it to your workspace using:")
+    console.print(f"  [bold cyan]devbridge repo add {name}[/bold cyan]")
+    console.print(f"Then, use its local name in the {flag} option.")
+    return True
+
 def transfer_command(ctx, from_repo_name, to_repo_name, pattern, query, adapt_level, interactive):
     cfg = ctx.obj["config"]
+    if _reject_url(from_repo_name, "--from") or _reject_url(to_repo_name, "--to"):
+        return False
 
     # Resolve from_repo_name
     resolved_from_repo_path = None
     from_path_obj = Path(from_repo_name)
     from_workspace_path = Path(cfg.repo_workspace_dir) / from_repo_name
-    if from_repo_name.startswith("http://") or from_repo_name.startswith("https://"):
-        console.print(f"[red]Error:[/] The --from path '{from_repo_name}' looks like a URL.")
-        console.print("[red]The 'transfer' command works with local repository paths or names from the DevBridge workspace.[/]")
-        console.print("[yellow]Hint:[/] If you want to use a remote repository, first add it to your workspace using:")
-        console.print(f"  [bold cyan]devbridge repo add {from_repo_name}[/bold cyan]")
-        console.print(f"Then, use its local name in the --from option.")
-        return False
     if from_path_obj.is_absolute() and from_path_obj.exists():
         resolved_from_repo_path = from_path_obj
     elif from_workspace_path.exists():
@@ -36,13 +73,6 @@ def transfer_command(ctx, from_repo_name, to_repo_name, pattern, query, adapt_le
     resolved_to_repo_path = None
     to_path_obj = Path(to_repo_name)
     to_workspace_path = Path(cfg.repo_workspace_dir) / to_repo_name
-    if to_repo_name.startswith("http://") or to_repo_name.startswith("https://"):
-        console.print(f"[red]Error:[/] The --to path '{to_repo_name}' looks like a URL.")
-        console.print("[red]The 'transfer' command works with local repository paths or names from the DevBridge workspace.[/]")
-        console.print("[yellow]Hint:[/] If you want to use a remote repository, first add it to your workspace using:")
-        console.print(f"  [bold cyan]devbridge repo add {to_repo_name}[/bold cyan]")
-        console.print(f"Then, use its local name in the --to option.")
-        return False
     if to_path_obj.is_absolute() and to_path_obj.exists():
         resolved_to_repo_path = to_path_obj
     elif to_workspace_path.exists():
@@ -65,14 +95,8 @@ def transfer_command(ctx, from_repo_name, to_repo_name, pattern, query, adapt_le
 
     target_file_to_copy = None
     if pattern: # Check if pattern is not None before using it
-        # Now use resolved_from_repo_path for os.walk
-        for root,_,files in os.walk(resolved_from_repo_path):
-            for f in files:
-                if pattern in f:
-                    target_file_to_copy = os.path.join(root,f); break
-            if target_file_to_copy:
-                break
-            
+        target_file_to_copy = _find_first_file(resolved_from_repo_path, pattern)
+
         if not target_file_to_copy: # This check is now part of the 'if pattern:' block
             console.print(f"[red]Pattern '{pattern}' not found in {resolved_from_repo_path}[/]"); return False # return False for consistency
     elif query:
@@ -91,7 +115,10 @@ def transfer_command(ctx, from_repo_name, to_repo_name, pattern, query, adapt_le
     
     try:
         os.makedirs(resolved_to_repo_path, exist_ok=True)
-        shutil.copy(target_file_to_copy, dest_path)
+        # Resolved once, now that the target directory exists; reused for the Q prompt below
+        from_abs = resolved_from_repo_path.resolve()
+        to_abs = resolved_to_repo_path.resolve()
+        fast_copy(target_file_to_copy, dest_path)
         console.print(f"[green]Copied[/] {target_file_to_copy} → {str(dest_path)}")
     except Exception as e:
         console.print(f"[red]Error copying file {target_file_to_copy} to {str(dest_path)}: {e}[/]")
@@ -100,33 +127,27 @@ def transfer_command(ctx, from_repo_name, to_repo_name, pattern, query, adapt_le
     # call Amazon Q for adaptation plan
     try:
         # For Q, we want the path to the newly copied file (destination)
-        abs_windows_dest_path = str(dest_path.resolve())
+        abs_windows_dest_path = str(to_abs / dest_file_name)
         wsl_target_file_path = windows_to_wsl_path(abs_windows_dest_path)
         console.print(f"[dim]Windows path for copied file: {abs_windows_dest_path}[/dim]")
         console.print(f"[dim]WSL path for Q (copied file): {wsl_target_file_path}[/dim]")
 
-        wsl_from_repo = windows_to_wsl_path(str(resolved_from_repo_path.resolve()))
-        wsl_to_repo = windows_to_wsl_path(str(resolved_to_repo_path.resolve()))
+        wsl_from_repo = windows_to_wsl_path(str(from_abs))
+        wsl_to_repo = windows_to_wsl_path(str(to_abs))
 
         q_prompt = f"The file '{dest_file_name}' (WSL path: '{wsl_target_file_path}') was copied from project '{wsl_from_repo}' to project '{wsl_to_repo}'. Please read this file. Then, generate a detailed adaptation plan. Consider imports, configurations, and compatibility with the target project. Adaptation level: {adapt_level} (1-5)."
         console.print(f"[dim]Amazon Q Prompt (raw): {q_prompt}[/dim]")
         
         # Since this script runs inside WSL, directly call q
-        q_executable = shutil.which("q")
+        q_executable = get_q_executable(console)
         if not q_executable:
-            console.print("[red]Error:[/] Amazon Q CLI executable ('q') not found in WSL's PATH.[/]")
-            console.print("[yellow]Hint:[/] Please ensure Amazon Q CLI is installed and its location is in your PATH inside WSL.")
             return False # Or handle error as appropriate for transfer command
 
         direct_q_command = [q_executable, "chat", q_prompt]
         console.print(f"[dim]Direct Q command: {' '.join(direct_q_command)}[/dim]")
 
-        resp = subprocess.check_output(
-            direct_q_command, 
-            text=True, timeout=180
-        )
         console.print("[green]Amazon Q Response (adaptation plan):[/]")
-        console.print("\n".join(resp.splitlines()[:20]))  # show first 20 lines
+        stream_q_command(direct_q_command, console, timeout=180, max_lines=20) # show first 20 lines
     except FileNotFoundError as e_fnf:
         console.print(Text.from_markup("[red]Amazon Q call failed (FileNotFoundError): [/red]"), Text(str(e_fnf)))
     except subprocess.CalledProcessError as e_proc:
@@ -0,0 +1,64 @@
+import io
+import subprocess
+
+from rich.console import Console
+
+from devbridge import cli
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+def _commit(repo, text):
+    (repo / "file.txt").write_text(text)
+    _git(repo, "add", "file.txt")
+    _git(repo, "commit", "-q", "-m", text)
+    return _git(repo, "rev-parse", "HEAD")
+
+def _upstream_and_clone(tmp_path):
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    _git(upstream, "init", "-q")
+    _commit(upstream, "one")
+    _commit(upstream, "two")
+    url = upstream.as_uri()
+    _git(tmp_path, "clone", "-q", "--depth=1", url, "clone")
+    return upstream, url, tmp_path / "clone"
+
+def _console():
+    return Console(file=io.StringIO(), width=1000)
+
+def test_refresh_clone_skips_fetch_when_remote_head_matches(tmp_path, monkeypatch):
+    _, url, clone = _upstream_and_clone(tmp_path)
+    local_head = _git(clone, "rev-parse", "HEAD")
+    monkeypatch.setattr(cli, "_remote_head", lambda _url: local_head)
+    console = _console()
+    cli._refresh_clone(clone, url, console)
+    assert console.file.getvalue() == ""
+    assert _git(clone, "rev-parse", "HEAD") == local_head
+
+def test_refresh_clone_fast_forwards_clean_shallow_clone(tmp_path):
+    upstream, url, clone = _upstream_and_clone(tmp_path)
+    new_head = _commit(upstream, "three")
+    cli._refresh_clone(clone, url, _console())
+    assert _git(clone, "rev-parse", "HEAD") == new_head
+
+def test_refresh_clone_keeps_dirty_tree(tmp_path):
+    upstream, url, clone = _upstream_and_clone(tmp_path)
+    local_head = _git(clone, "rev-parse", "HEAD")
+    _commit(upstream, "three")
+    (clone / "file.txt").write_text("local edit")
+    console = _console()
+    cli._refresh_clone(clone, url, console)
+    assert _git(clone, "rev-parse", "HEAD") == local_head
+    assert (clone / "file.txt").read_text() == "local edit"
+    assert "local changes" in console.file.getvalue()
+
+def test_refresh_clone_keeps_local_commits(tmp_path):
+    upstream, url, clone = _upstream_and_clone(tmp_path)
+    _commit(upstream, "three")
+    local_head = _commit(clone, "local commit")
+    cli._refresh_clone(clone, url, _console())
+    assert _git(clone, "rev-parse", "HEAD") == local_head
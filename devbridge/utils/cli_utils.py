@@ -1,10 +1,28 @@
-from devbridge.utils.config import Config
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
+import functools
+import json
+import os
 import shutil
-from rich.prompt import Confirm
 
-def resolve_repo_path(repo_identifier: str, debug: bool = False, config: Config = None) -> Optional[str]:
+# cli.py imports this module at startup, so subprocess
+# and rich.prompt are only imported by the helpers that need them.
+if TYPE_CHECKING:
+    from devbridge.utils.config import Config
+
+# Inputs starting with one of these are treated as remote repositories.
+URL_PREFIXES = ("http://", "https://", "git@")
+
+@functools.lru_cache(maxsize=256)
+def _resolve_absolute(path_str: str) -> str:
+    return str(Path(path_str).resolve())
+
+def resolve_path_str(path) -> str:
+    """Returns `path` fully resolved, memoised so repeated inputs skip the readlink walk."""
+    # Anchor relative paths on the CWD first so the cache key is absolute.
+    return _resolve_absolute(str(Path.cwd() / path))
+
+def resolve_repo_path(repo_identifier: str, debug: bool = False, config: "Config" = None) -> Optional[str]:
     """Resolves a repository identifier to an absolute path.
 
     Args:
@@ -24,15 +42,15 @@ def resolve_repo_path(repo_identifier: str, debug: bool = False, config: Config
     if path_obj.is_absolute() and path_obj.exists() and path_obj.is_dir():
         if debug:
             console.print(f"[debug] '{repo_identifier}' is an existing absolute path.")
-        return str(path_obj.resolve())
+        return resolve_path_str(path_obj)
 
     # 2. Check if it's a name in the DevBridge workspace
     if config:
         workspace_path = Path(config.repo_workspace_dir) / repo_identifier
         if workspace_path.exists() and workspace_path.is_dir():
             if debug:
-                console.print(f"[debug] Found '{repo_identifier}' in DevBridge workspace: {workspace_path.resolve()}")
-            return str(workspace_path.resolve())
+                console.print(f"[debug] Found '{repo_identifier}' in DevBridge workspace: {resolve_path_str(workspace_path)}")
+            return resolve_path_str(workspace_path)
     elif debug:
         console.print(f"[debug] Config not provided, skipping workspace check for '{repo_identifier}'.")
 
@@ -43,16 +61,92 @@ def resolve_repo_path(repo_identifier: str, debug: bool = False, config: Config
         cwd_relative_path = Path.cwd() / repo_identifier
         if cwd_relative_path.exists() and cwd_relative_path.is_dir():
             if debug:
-                console.print(f"[debug] Found '{repo_identifier}' as relative path in CWD: {cwd_relative_path.resolve()}")
-            return str(cwd_relative_path.resolve())
+                console.print(f"[debug] Found '{repo_identifier}' as relative path in CWD: {resolve_path_str(cwd_relative_path)}")
+            return resolve_path_str(cwd_relative_path)
 
     if debug:
         console.print(f"[debug] Failed to resolve '{repo_identifier}' as an absolute path, workspace repo, or CWD relative path.")
     return None
 
+def locate_target_path(path: str, workspace_dir: str) -> Optional[Tuple[Path, os.stat_result, str]]:
+    """Finds `path` as an absolute, workspace or CWD-relative path, stat-ing each candidate once.
+
+    Returns:
+        (resolved_path, stat_result, source) where source is "absolute", "workspace" or "cwd",
+        or None if no candidate exists.
+    """
+    path_obj = Path(path)
+    if path_obj.is_absolute():
+        # Joining an absolute path onto the workspace yields the same path, so one check suffices
+        candidates = [(path_obj, "absolute")]
+    else:
+        candidates = [(Path(workspace_dir) / path, "workspace"), (path_obj, "cwd")]
+
+    for candidate, source in candidates:
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        return candidate.resolve(), st, source
+    return None
+
+def _copy_file_range(src: str, dst: str) -> bool:
+    """Copies src to dst in-kernel with os.copy_file_range (Linux); False if that is not possible."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with open(src, "rb") as fsrc:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            if remaining == 0:
+                return False # Empty, or a pseudo-file whose size is not known up front
+            with open(dst, "wb") as fdst:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        return False # File shrank underneath us; let shutil redo it
+                    remaining -= copied
+    except OSError:
+        return False # e.g. ENOSYS/EXDEV on older kernels or unsupported filesystems
+    return True
+
+def fast_copy(src, dst) -> str:
+    """Copies a file like shutil.copy (data and permission bits) and returns the destination.
+
+    Tries os.copy_file_range first, which copies in the kernel and shares extents on
+    reflink-capable filesystems (btrfs, XFS), then the optional `reflink` package, then shutil.copy.
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if _copy_file_range(src, dst):
+        shutil.copymode(src, dst)
+        return dst
+    try:
+        import reflink
+        if os.path.exists(dst):
+            os.remove(dst)
+        reflink.reflink(src, dst)
+        shutil.copymode(src, dst)
+        return dst
+    except Exception: # Package missing, or the filesystem cannot clone
+        pass
+    return shutil.copy(src, dst)
+
+@functools.lru_cache(maxsize=4)
+def _which_q(search_path: str) -> Optional[str]:
+    return shutil.which("q", path=search_path)
+
+def which_q() -> Optional[str]:
+    """Returns the path of the `q` executable, scanning PATH only once per PATH value."""
+    return _which_q(os.environ.get("PATH", os.defpath))
+
+def invalidate_q_cache() -> None:
+    """Forgets cached `q` lookups, e.g. after installing q or in tests that fake PATH."""
+    _which_q.cache_clear()
+
 def get_q_executable(console_instance) -> Optional[str]:
     """Finds the Amazon Q CLI executable and returns its path or None."""
-    q_executable = shutil.which("q")
+    q_executable = which_q()
     if not q_executable:
         console_instance.print("[red]Error: Amazon Q CLI executable ('q') not found in PATH.[/red]")
         console_instance.print("[yellow]Hint: Please ensure Amazon Q CLI is installed and its location is in your PATH.[/yellow]")
@@ -60,8 +154,84 @@ def get_q_executable(console_instance) -> Optional[str]:
         return None
     return q_executable
 
+# Last successful `q --version` output, keyed on the q binary's path and mtime.
+Q_PROBE_CACHE_PATH = Path.home() / ".devbridge" / "q_probe.json"
+
+def q_version_output(q_executable: str, timeout: int = 10, use_cache: bool = True) -> str:
+    """Returns the stdout of `q --version`, reusing the cached result for the same binary.
+
+    Raises:
+        subprocess.CalledProcessError: If `q --version` exits non-zero.
+        subprocess.TimeoutExpired: If `q` does not answer within `timeout` seconds.
+    """
+    import subprocess
+
+    key = [q_executable, os.stat(q_executable).st_mtime_ns]
+    if use_cache:
+        try:
+            cached = json.loads(Q_PROBE_CACHE_PATH.read_text(encoding="utf-8"))
+            if cached.get("key") == key:
+                return cached["output"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    result = subprocess.run([q_executable, "--version"], capture_output=True, text=True, check=True, timeout=timeout)
+    output = result.stdout.strip()
+    try:
+        Q_PROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        Q_PROBE_CACHE_PATH.write_text(json.dumps({"key": key, "output": output}), encoding="utf-8")
+    except OSError:
+        pass
+    return output
+
+def stream_q_command(command: list, console_instance, timeout: int = 180, max_lines: Optional[int] = None) -> None:
+    """Runs a `q` command, echoing its stdout line by line as it arrives.
+
+    With `max_lines`, q is terminated once that many lines have been shown, so it does
+    not keep generating output nobody will see.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits non-zero (stderr is attached).
+        subprocess.TimeoutExpired: If the command runs longer than `timeout` seconds.
+    """
+    import subprocess
+    import threading
+
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+    # stderr is drained on its own thread so a chatty stderr cannot block stdout
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_reader.start()
+    timed_out = threading.Event()
+    def _kill():
+        timed_out.set()
+        proc.kill()
+    killer = threading.Timer(timeout, _kill)
+    killer.start()
+    stopped_early = False
+    try:
+        for line_count, line in enumerate(proc.stdout, 1):
+            # out() writes the text as-is, without markup parsing or wrapping
+            console_instance.out(line, end="", highlight=False)
+            if max_lines is not None and line_count >= max_lines:
+                stopped_early = True
+                proc.terminate()
+                break
+        returncode = proc.wait()
+    finally:
+        killer.cancel()
+        stderr_reader.join()
+        proc.stdout.close()
+        proc.stderr.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, timeout)
+    if returncode != 0 and not stopped_early:
+        raise subprocess.CalledProcessError(returncode, command, stderr="".join(stderr_chunks))
+
 def confirm_action(prompt_message: str, default_choice: bool = False) -> bool:
     """Prompts the user for confirmation and returns their choice."""
+    from rich.prompt import Confirm
     return Confirm.ask(prompt_message, default=default_choice)
 
 # Ensure console is defined if not already, or pass it as an argument if preferred for these utils
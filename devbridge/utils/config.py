@@ -1,34 +1,114 @@
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from pydantic import BaseModel
 import json, os
 
+try:
+    import orjson # Optional speedup: parses and serialises bytes directly
+except ImportError:
+    orjson = None
+
 DEFAULT_PATH = Path.home() / ".devbridge" / "config.json"
 
-class Config(BaseModel):
+# A plain dataclass: every command loads the config, and pydantic's import and
+# schema build would dominate startup for these few scalar fields.
+@dataclass
+class Config:
     storage_path: str = str(Path.home() / ".devbridge" / "db.sqlite3")
     repo_workspace_dir: str = str(Path.home() / ".devbridge" / "repos")
     default_user_agent: str = "DevBridgeBot/0.1 Crawler"
     respect_robots_txt: bool = True
     crawl_retry_limit: int = 3
     crawl_backoff_base_ms: int = 500
+    repo_cache_dir: str = str(Path.home() / ".devbridge" / "clone_cache")
+    repo_cache_max_entries: int = 5 # Bare mirrors kept for --full-history clones; 0 disables
+    chat_history_turns: int = 20 # Chat turns kept in memory per session
+    learn_cache_max_mb: int = 256 # On-disk learn page/Markdown cache budget (~/.devbridge/md_cache)
+
+_FIELD_TYPES = {f.name: f.type for f in fields(Config)}
+
+# Lax coercion of JSON values, as the earlier pydantic model did: 500.0 and "3" are valid ints,
+# ints and numeric strings valid floats, 0/1 and "yes"/"off"/... valid bools. Numbers are never strings.
+_BOOL_STRINGS = {"true": True, "t": True, "yes": True, "y": True, "on": True, "1": True,
+                 "false": False, "f": False, "no": False, "n": False, "off": False, "0": False}
+
+def _to_int(value) -> int:
+    if isinstance(value, (bool, int)) or (isinstance(value, float) and value.is_integer()):
+        return int(value)
+    if isinstance(value, str) and value.isascii():
+        try:
+            return int(value)
+        except ValueError:
+            whole, dot, fraction = value.strip().partition(".")
+            if dot and fraction and not fraction.strip("0"): # "3.0"
+                return int(whole)
+    raise ValueError(f"expected an int, got {value!r}")
+
+def _to_float(value) -> float:
+    if isinstance(value, (bool, int, float)) or (isinstance(value, str) and value.isascii()):
+        return float(value)
+    raise ValueError(f"expected a float, got {value!r}")
+
+def _to_bool(value) -> bool:
+    if isinstance(value, (bool, int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in _BOOL_STRINGS:
+        return _BOOL_STRINGS[value.lower()]
+    raise ValueError(f"expected a bool, got {value!r}")
 
-def load_config(path: str | None = None) -> Config:
+def _to_str(value) -> str:
+    if isinstance(value, str):
+        return value
+    raise ValueError(f"expected a string, got {value!r}")
+
+_COERCERS = {int: _to_int, float: _to_float, bool: _to_bool, str: _to_str}
+
+def _parse_config(raw: bytes) -> Config:
+    """Builds a Config from JSON bytes; unknown keys are ignored, values that cannot be coerced raise ValueError."""
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("config must be a JSON object")
+    values = {}
+    for name, value in data.items():
+        expected_type = _FIELD_TYPES.get(name)
+        if expected_type is None:
+            continue
+        try:
+            values[name] = _COERCERS[expected_type](value)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from None
+    return Config(**values)
+
+def _dump_config(cfg: Config) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(asdict(cfg), option=orjson.OPT_INDENT_2)
+    return json.dumps(asdict(cfg), indent=2).encode("utf-8")
+
+# Parsed configs keyed by file path -> ((st_mtime_ns, st_size), Config).
+# The file is re-parsed only when its mtime or size changes.
+_config_cache: dict = {}
+
+def load_config(path: str | None = None, use_cache: bool = True) -> Config:
     file = Path(path) if path else DEFAULT_PATH
     if file.exists():
-        # return Config.parse_file(file) # Deprecated
+        st = file.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _config_cache.get(str(file))
+        if use_cache and cached and cached[0] == stamp:
+            return cached[1]
         try:
-            file_content = file.read_text()
-            return Config.model_validate_json(file_content)
-        except Exception as e: # Handle potential read errors or JSON decode errors
-            # Fallback to default config if parsing fails, and maybe log error
-            # For now, creating a new default config if parsing existing one fails.
-            # This matches behavior if file didn't exist, but could overwrite a corrupted one.
-            # A more robust solution might warn the user or try to backup corrupted file.
+            cfg = _parse_config(file.read_bytes())
+            _config_cache[str(file)] = (stamp, cfg)
+            return cfg
+        except Exception as e: # Handle potential read errors, JSON decode errors or invalid values
+            # Use defaults for this run, but leave the user's file as it is so it can be fixed.
             print(f"Warning: Could not parse config file {file}: {e}. Using default config.") # Temporary print
-            pass # Fall through to creating default config
-            
-    # If file does not exist, or parsing failed and fell through
+            return Config()
+
+    # File does not exist yet: write the defaults
     file.parent.mkdir(parents=True, exist_ok=True)
     cfg = Config()
-    file.write_text(cfg.model_dump_json(indent=2))
+    # Written to a sibling and renamed over the target, so an interrupted write never leaves a truncated config
+    tmp_file = file.with_suffix(file.suffix + ".tmp")
+    tmp_file.write_bytes(_dump_config(cfg))
+    os.replace(tmp_file, file)
     return cfg 
\ No newline at end of file
@@ -2,13 +2,48 @@
 Helper functions for Deepwiki integration, such as URL normalization,
 validation, and potentially keyword extraction.
 """
+import functools
+import re
 from typing import Optional, Tuple
-from urllib.parse import urlparse, urlunparse
+from urllib.parse import urlsplit, urlunsplit
 
 # Placeholder for NLP libraries if keyword extraction is implemented later
 # e.g., from nltk.tokenize import word_tokenize
 # from nltk.corpus import stopwords
 
+_GIT_DOMAINS = ("github.com", "gitlab.com", "bitbucket.org")
+_GIT_HOSTS = "(?:" + "|".join(map(re.escape, _GIT_DOMAINS)) + ")"
+# "http(s)://[www.]<host>/path" (path up to any query/fragment, as urlsplit would give it)
+# or "<host>/path" without a scheme (rest of the identifier).
+_GIT_HOST_RE = re.compile(
+    r"https?://(?:www\.)?" + _GIT_HOSTS + r"(/[^?#\t\r\n]*)(?:[?#]|\Z)|" + _GIT_HOSTS + r"/(.*)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Hardcoded common single-word identifiers
+_KEYWORD_MAP = {
+    "requests": "psf/requests",
+    "django": "django/django",
+    "react": "facebook/react", # Or just "react" if to be used as a topic
+    "vue": "vuejs/vue",
+    "angular": "angular/angular",
+    "python": "python", # Generic topic
+    "boto3": "boto/boto3",
+}
+
+def _git_path_to_slug(path_str: str) -> Optional[str]:
+    """Turns a Git host path like "/user/repo.git/tree/main" into "user/repo/tree/main", or None."""
+    path_parts = path_str.strip('/').split('/')
+    if len(path_parts) < 2:
+        return None
+    slug_parts = [path_parts[0], path_parts[1].replace('.git', '')] + path_parts[2:] # Preserve case
+    # Clean parts before joining: strip spaces from each part and ensure no empty parts
+    cleaned_slug_parts = [p.strip().replace(' ', '-') for p in slug_parts if p.strip()]
+    if len(cleaned_slug_parts) >= 2:
+        return "/".join(cleaned_slug_parts)
+    return None
+
+@functools.lru_cache(maxsize=4096)
 def normalize_repo_identifier(identifier: str) -> Optional[str]:
     """
     Normalizes various forms of repository identifiers to a standard
@@ -29,63 +64,26 @@ def normalize_repo_identifier(identifier: str) -> Optional[str]:
         return None
 
     identifier = identifier.strip()
-    parsed = urlparse(identifier)
 
-    # 1. Handle full URLs (Deepwiki or common Git providers)
+    # 1. Git provider URLs and "github.com/user/repo" style paths, without parsing the URL
+    git_match = _GIT_HOST_RE.match(identifier)
+    if git_match:
+        return _git_path_to_slug(git_match.group(1) if git_match.group(1) is not None else git_match.group(2))
+
+    parsed = urlsplit(identifier)
+
+    # 2. Handle remaining full URLs (Deepwiki or other Git provider hosts)
     if parsed.scheme in ['http', 'https'] and parsed.netloc:
-        if 'deepwiki' in parsed.netloc.lower():
+        netloc_lower = parsed.netloc.lower()
+        if 'deepwiki' in netloc_lower:
             path_str = parsed.path.strip('/')
             if not path_str: # e.g. https://deepwiki.com/
                 return None # Or return a root indicator if desired
-            return urlunparse((parsed.scheme, parsed.netloc, path_str, '', '', ''))
-
-        for domain_keyword in ["github.com", "gitlab.com", "bitbucket.org"]:
-            if domain_keyword in parsed.netloc.lower():
-                path_parts = parsed.path.strip('/').split('/')
-                if len(path_parts) >= 2:
-                    user = path_parts[0] # Preserve case
-                    repo = path_parts[1].replace('.git', '') # Preserve case
-                    remaining_path_parts = [p.strip().replace(' ', '-') for p in path_parts[2:] if p.strip()] # Preserve case
-                    
-                    slug_parts = [user, repo]
-                    if remaining_path_parts:
-                        slug_parts.extend(remaining_path_parts) # Use extend for list
-                    
-                    # Clean parts before joining: strip spaces from each part and ensure no empty parts
-                    cleaned_slug_parts = [p.strip().replace(' ', '-') for p in slug_parts if p.strip()]
-                    if len(cleaned_slug_parts) >= 2:
-                         return "/".join(cleaned_slug_parts)
-                return None
-
-    # 2. Handle domain/path format like "github.com/user/repo" (no scheme)
-    if not parsed.scheme: # No http(s)
-        for domain_base in ["github.com", "gitlab.com", "bitbucket.org"]:
-            domain_keyword_with_slash = domain_base + "/"
-            if identifier.lower().startswith(domain_keyword_with_slash.lower()): # Case-insensitive start check
-                try:
-                    path_str = identifier[len(domain_keyword_with_slash):] # Get path part, preserving its case
-                    path_parts = path_str.strip('/').split('/')
-                    if len(path_parts) >= 2:
-                        user = path_parts[0].strip().replace(' ', '-') # Preserve case, clean spaces
-                        repo = path_parts[1].replace('.git', '').strip().replace(' ', '-') # Preserve case, clean spaces
-                        
-                        remaining_path_list = [
-                            p.strip().replace(' ', '-') 
-                            for p_idx, p in enumerate(path_parts) 
-                            if p_idx > 1 and p.strip()
-                        ] # Preserve case, clean spaces
-                        remaining_path = "/".join(remaining_path_list)
-                        
-                        final_parts = [user, repo]
-                        if remaining_path:
-                            final_parts.append(remaining_path)
-                        
-                        valid_final_parts = [part for part in final_parts if part] # Ensure no empty parts
-                        if len(valid_final_parts) >= 2:
-                             return "/".join(valid_final_parts)
-                    return None # Invalid path structure after domain
-                except Exception:
-                    continue # Error processing this rule, try next domain or fall through
+            return urlunsplit((parsed.scheme, parsed.netloc, path_str, '', ''))
+
+        # Any other netloc mentioning a Git host, e.g. "gist.github.com" or "github.com:443"
+        if any(domain in netloc_lower for domain in _GIT_DOMAINS):
+            return _git_path_to_slug(parsed.path)
 
     # 3. Handle "user/repo", "user / repo-part", "user/repo/sub/path" (slash-separated slugs)
     if '/' in identifier: # Assumed to be a slug if no scheme/netloc by this point
@@ -116,21 +114,13 @@ def normalize_repo_identifier(identifier: str) -> Optional[str]:
     # Ensure it's genuinely a single segment by this point (no slashes, no spaces)
     if '/' not in identifier and ' ' not in identifier:
         lower_id = identifier.lower()
-        # Hardcoded common patterns
-        if lower_id == "requests": return "psf/requests"
-        if lower_id == "django": return "django/django"
-        if lower_id == "react": return "facebook/react" # Or just "react" if to be used as a topic
-        if lower_id == "vue": return "vuejs/vue"
-        if lower_id == "angular": return "angular/angular"
-        if lower_id == "python": return "python" # Generic topic
-        if lower_id == "boto3": return "boto/boto3"
-        
         # If not a special keyword, return the single term, lowercased, as a potential topic
-        return lower_id
+        return _KEYWORD_MAP.get(lower_id, lower_id)
 
     return None # Default if no pattern matches or invalid structure
 
 
+@functools.lru_cache(maxsize=4096)
 def construct_deepwiki_url(repo_identifier: str, base_deepwiki_url: str = "https://deepwiki.com") -> Optional[str]:
     """
     Constructs a full Deepwiki URL from a normalized repo_identifier.
@@ -142,7 +132,7 @@ def construct_deepwiki_url(repo_identifier: str, base_deepwiki_url: str = "https
     if not base_deepwiki_url: # Added check for None or empty base_deepwiki_url
         return None
 
-    parsed_id = urlparse(repo_identifier)
+    parsed_id = urlsplit(repo_identifier)
     if parsed_id.scheme and parsed_id.netloc:
         # It's already a full URL
         if 'deepwiki' in parsed_id.netloc.lower():
@@ -169,9 +159,14 @@ def extract_keywords_from_query(query: str) -> Optional[str]:
     # Example: "how do I use react with typescript?" -> could extract "react", "typescript"
     # This is a very complex task. For a placeholder:
     print(f"Extracting keywords from query (mock): '{query}'")
-    if "react" in query.lower():
+    # Memoised on the lowercased, whitespace-collapsed query so trivially different spellings share an entry
+    return _keywords_for(" ".join(query.lower().split()))
+
+@functools.lru_cache(maxsize=4096)
+def _keywords_for(normalized_query: str) -> Optional[str]:
+    if "react" in normalized_query:
         return "react"
-    if "python" in query.lower():
+    if "python" in normalized_query:
         return "python"
     # A real implementation would use NLP techniques like PoS tagging, NER, etc.
     return None
@@ -1,178 +1,223 @@
 """
 Handles HTML to Markdown conversion using BeautifulSoup and Markdownify.
 """
-from typing import Any, Dict, Optional
-from bs4 import BeautifulSoup, Comment, NavigableString # Added specific imports
-from markdownify import MarkdownConverter # Added
-from urllib.parse import urljoin, urlparse
-
-class CustomMarkdownConverter(MarkdownConverter):
-    """Custom converter to handle specific tags or attributes if needed."""
-    def __init__(self, **options):
-        super().__init__(**options)
-        # Example: Convert <details> and <summary> to a Markdown-friendly format
-        # self.convert_details = self.convert_details_tag
-        # self.convert_summary = self.convert_summary_tag
-
-    def convert_pre(self, el, text, convert_as_inline):
-        """Override to handle <pre> tags, especially for code blocks."""
-        if not text.strip():
-            return ''
+import functools
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+# bs4 and markdownify are imported by the functions that use them, so importing this
+# module (e.g. on a fully cached `learn` run) does not load either import graph.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from markdownify import MarkdownConverter
+
+# hrefs/srcs starting with these are already absolute, so urljoin/urlsplit can be skipped.
+_ABSOLUTE_PREFIXES = ('http://', 'https://', 'mailto:', 'data:')
+
+# Elements removed completely by sanitize_html_content
+_UNWANTED_TAGS = frozenset({'script', 'style', 'noscript', 'link', 'meta', 'header', 'footer', 'nav'})
+# Query characters folded into '-' when a query string becomes part of an aggregate-mode anchor
+_ANCHOR_QUERY_SANITIZE = str.maketrans({'=': '-', '&': '-'})
+
+# Tags markdownify drops (keeping their text) while converting; it only tests membership
+_STRIP_TAGS = frozenset({'script', 'style'})
+
+def _code_language(el) -> Optional[str]:
+    """markdownify code_language_callback: the element's first class if it is a "language-*" class."""
+    classes = el.get('class')
+    return classes[0] if classes and classes[0].startswith('language-') else None
+
+# Options shared by every conversion; only base_url varies per page
+_CONVERTER_OPTIONS = {
+    'strip': _STRIP_TAGS,
+    'heading_style': 'atx',
+    'bullets': '-',
+    'code_language_callback': _code_language,
+}
+
+def _code_lang(tag) -> str:
+    """Language from the first "language-*" or "lang-*" class of `tag` (e.g. class="language-python"), or ''."""
+    classes = tag.get('class') or []
+    return next((cls.split('-', 1)[1] for cls in classes if cls.startswith(('language-', 'lang-'))), '')
+
+@functools.lru_cache(maxsize=None)
+def custom_markdown_converter_class():
+    """Returns CustomMarkdownConverter, defining it (and importing markdownify) on first call."""
+    from markdownify import MarkdownConverter
+
+    class CustomMarkdownConverter(MarkdownConverter):
+        """Custom converter to handle specific tags or attributes if needed."""
+        def __init__(self, **options):
+            super().__init__(**options)
+            # Example: Convert <details> and <summary> to a Markdown-friendly format
+            # self.convert_details = self.convert_details_tag
+            # self.convert_summary = self.convert_summary_tag
+
+        def convert_pre(self, el, text, convert_as_inline):
+            """Override to handle <pre> tags, especially for code blocks."""
+            if not text.strip():
+                return ''
         
-        # Check if there's a <code> tag inside <pre>
-        code_tag = el.find('code')
-        lang = ''
-        if code_tag:
-            # Try to get language from class (e.g., class="language-python")
-            classes = code_tag.get('class', [])
-            for cls in classes:
-                if cls.startswith('language-'):
-                    lang = cls.replace('language-', '', 1)
-                    break
-                elif cls.startswith('lang-'):
-                    lang = cls.replace('lang-', '', 1)
-                    break
-        else:
-            # If no <code>, check <pre> itself for language class
-            classes = el.get('class', [])
-            for cls in classes:
-                if cls.startswith('language-'):
-                    lang = cls.replace('language-', '', 1)
-                    break
-                elif cls.startswith('lang-'):
-                    lang = cls.replace('lang-', '', 1)
-                    break
+            # Language comes from a <code> inside <pre> if there is one, else from <pre> itself
+            lang = _code_lang(el.find('code') or el)
         
-        # Strip leading/trailing newlines from the code block itself
-        # text = text.strip('\n') # markdownify already handles this well generally
-        return f"```{lang}\n{text}\n```\n\n"
+            # Strip leading/trailing newlines from the code block itself
+            # text = text.strip('\n') # markdownify already handles this well generally
+            return f"```{lang}\n{text}\n```\n\n"
 
-    # def convert_details_tag(self, el, text, convert_as_inline):
-    #     return f"<details>\n<summary>{el.find('summary').get_text(strip=True) if el.find('summary') else 'Details'}</summary>\n\n{text.strip()}\n</details>\n\n"
+        # def convert_details_tag(self, el, text, convert_as_inline):
+        #     return f"<details>\n<summary>{el.find('summary').get_text(strip=True) if el.find('summary') else 'Details'}</summary>\n\n{text.strip()}\n</details>\n\n"
 
-    # def convert_summary_tag(self, el, text, convert_as_inline):
-    #     return "" # Handled by convert_details_tag
+        # def convert_summary_tag(self, el, text, convert_as_inline):
+        #     return "" # Handled by convert_details_tag
 
-    def convert_img(self, el, text, convert_as_inline):
-        """Convert <img> tags to Markdown image syntax with absolute URLs if possible."""
-        alt = el.get('alt', '')
-        src = el.get('src', '')
-        title = el.get('title', '')
+        def convert_img(self, el, text, convert_as_inline):
+            """Convert <img> tags to Markdown image syntax with absolute URLs if possible."""
+            alt = el.get('alt', '')
+            src = el.get('src', '')
+            title = el.get('title', '')
 
-        if not src: # Should not happen if src is required by your schema
-            return ""
+            if not src: # Should not happen if src is required by your schema
+                return ""
 
-        # Try to make src absolute if a base_url was passed in options
-        base_url = self.options.get('base_url')
-        if base_url:
-            src = urljoin(base_url, src)
+            # Try to make src absolute if a base_url was passed in options
+            base_url = self.options.get('base_url')
+            if base_url and not src.startswith(_ABSOLUTE_PREFIXES):
+                src = urljoin(base_url, src)
 
-        title_part = f' "{title}"' if title else ''
-        return f'![{alt}]({src}{title_part})'
+            title_part = f' "{title}"' if title else ''
+            return f'![{alt}]({src}{title_part})'
 
-    def convert_a(self, el, text, parent_tags=None, **kwargs):
-        """Override to ensure links are absolute if base_url is available."""
+        def convert_a(self, el, text, parent_tags=None, **kwargs):
+            """Override to ensure links are absolute if base_url is available."""
         
-        # convert_as_inline is not directly passed by the problematic call path.
-        # We need to decide a default or get it from kwargs if markdownify *sometimes* passes it.
-        # For now, let's assume False as a default for this path if not in kwargs.
-        convert_as_inline = kwargs.get('convert_as_inline', False)
+            # convert_as_inline is not directly passed by the problematic call path.
+            # We need to decide a default or get it from kwargs if markdownify *sometimes* passes it.
+            # For now, let's assume False as a default for this path if not in kwargs.
+            convert_as_inline = kwargs.get('convert_as_inline', False)
 
-        href = el.get('href')
-        if not href:
-            return text
+            href = el.get('href')
+            if not href:
+                return text
 
-        # If it's an anchor link, keep it as is
-        if href.startswith('#'):
-            # Call super with its expected args (el, text, convert_as_inline)
-            return super().convert_a(el, text, convert_as_inline) 
+            # If it's an anchor link, keep it as is
+            if href.startswith('#'):
+                # Call super with its expected args (el, text, convert_as_inline)
+                return super().convert_a(el, text, convert_as_inline) 
 
-        base_url = self.options.get('base_url')
-        if base_url:
-            actual_href = urljoin(base_url, href)
-            el['href'] = actual_href # Update the element for the super call
+            base_url = self.options.get('base_url')
+            if base_url and not href.startswith(_ABSOLUTE_PREFIXES):
+                actual_href = urljoin(base_url, href)
+                el['href'] = actual_href # Update the element for the super call
         
-        # Call super with its expected args (el, text, convert_as_inline)
-        return super().convert_a(el, text, convert_as_inline)
+            # Call super with its expected args (el, text, convert_as_inline)
+            return super().convert_a(el, text, convert_as_inline)
+
+    return CustomMarkdownConverter
+
+def __getattr__(name: str):
+    """Keeps `from devbridge.utils.html_to_markdown import CustomMarkdownConverter` working; built on first access."""
+    if name == "CustomMarkdownConverter":
+        return custom_markdown_converter_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def sanitize_html_content(html_content: str, base_url: Optional[str] = None) -> BeautifulSoup:
+def sanitize_html_content(html_content: Union[str, bytes], base_url: Optional[str] = None) -> "BeautifulSoup":
     """
     Parses HTML and removes unwanted elements like <script>, <style>, comments.
     Also attempts to make image and link URLs absolute if base_url is provided.
+    Raw response bytes can be passed as-is; the parser detects their encoding (e.g. from <meta charset>).
     """
+    from bs4 import BeautifulSoup, Comment, Tag
     soup = BeautifulSoup(html_content, 'lxml') # Use lxml for performance
 
-    # Elements to remove completely
-    for tag_name in ['script', 'style', 'noscript', 'link', 'meta', 'header', 'footer', 'nav']:
-        for tag in soup.find_all(tag_name):
-            tag.decompose()
-
-    # Remove comments
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
-    
-    # Attempt to make key URLs absolute (markdownify might also do this for 'a' and 'img')
-    if base_url:
-        for tag in soup.find_all('a', href=True):
-            href = tag['href']
-            if href and not urlparse(href).scheme and not href.startswith('#'):
-                tag['href'] = urljoin(base_url, href)
-        
-        for tag in soup.find_all('img', src=True):
-            src = tag['src']
-            if src and not urlparse(src).scheme:
-                tag['src'] = urljoin(base_url, src)
+    # One walk over the tree instead of a find_all per unwanted tag, comments, links and images.
+    # Removed subtrees are never descended into.
+    stack = [soup]
+    while stack:
+        for node in list(stack.pop().children):
+            if isinstance(node, Comment):
+                node.extract()
+            elif isinstance(node, Tag):
+                if node.name in _UNWANTED_TAGS:
+                    node.decompose()
+                    continue
+                # Attempt to make key URLs absolute (markdownify might also do this for 'a' and 'img')
+                if base_url and node.name == 'a':
+                    href = node.get('href')
+                    if href and not href.startswith(_ABSOLUTE_PREFIXES) and not urlsplit(href).scheme and not href.startswith('#'):
+                        node['href'] = urljoin(base_url, href)
+                elif base_url and node.name == 'img':
+                    src = node.get('src')
+                    if src and not src.startswith(_ABSOLUTE_PREFIXES) and not urlsplit(src).scheme:
+                        node['src'] = urljoin(base_url, src)
+                stack.append(node)
 
     # Further fine-grained sanitization (e.g., allowed attributes) can be added here
     # For now, this covers common unwanted elements.
     return soup
 
-def rewrite_internal_links_for_mode(soup: BeautifulSoup, mode: str, current_page_url: str) -> None:
+def _aggregate_href(path_part: str, query_part: str) -> str:
+    # Create an anchor from the path. Replace / with - and ensure uniqueness if needed.
+    # This is a simple version; deepwiki-mcp might have more robust anchor generation.
+    new_href = "#" + path_part.replace('/', '-')
+    if query_part: # Append query as part of the anchor, sanitized
+        new_href += "-" + query_part.translate(_ANCHOR_QUERY_SANITIZE)
+    return new_href
+
+def _pages_href(path_part: str, query_part: str) -> str:
+    # Convert to .md file link, keeping path structure.
+    # For ../ type links, urljoin should handle resolution correctly against current_page_url.
+    # We need the path relative to the current page's directory if possible, or just the full path.md.
+    # For simplicity, let's assume we make flat .md files from paths.
+    new_href = path_part + ".md"
+    if query_part:
+        new_href += "?" + query_part # Keep query parameters if any
+    return new_href
+
+# Same-site href rewriter per learn mode, chosen once per page rather than per link
+_LINK_REWRITERS = {"aggregate": _aggregate_href, "pages": _pages_href}
+
+def _iter_tags(root, name: str):
+    """Yields the `name` tags under `root` in document order as they are reached, without building a find_all list."""
+    for node in root.descendants:
+        if node.name == name: # Strings and comments have name None
+            yield node
+
+def rewrite_internal_links_for_mode(soup: "BeautifulSoup", mode: str, current_page_url: str) -> None:
     """
     Rewrites internal (same-domain) links based on the specified mode.
     - "aggregate": Converts links to anchors (#target-path).
     - "pages": Converts links to relative .md files (target-path.md).
     Assumes current_page_url is the URL of the document being processed.
     """
-    if not current_page_url:
+    rewrite_href = _LINK_REWRITERS.get(mode)
+    if not current_page_url or rewrite_href is None: # Other modes leave links alone
         return
 
-    parsed_current_url = urlparse(current_page_url)
+    parsed_current_url = urlsplit(current_page_url)
     current_base_netloc = parsed_current_url.netloc
 
-    for link_tag in soup.find_all('a', href=True):
+    for link_tag in _iter_tags(soup, 'a'): # Only attributes change, so streaming the tree is safe
         original_href = link_tag.get('href')
         if not original_href or original_href.startswith('#'): # Skip empty or existing fragment links
             continue
 
-        absolute_link = urljoin(current_page_url, original_href)
-        parsed_absolute_link = urlparse(absolute_link)
+        if original_href.startswith(('http://', 'https://')):
+            absolute_link = original_href # Already absolute; urljoin would only re-split it
+        else:
+            absolute_link = urljoin(current_page_url, original_href)
+        parsed_absolute_link = urlsplit(absolute_link)
 
         # Only process links on the same domain/subdomain
         if parsed_absolute_link.netloc == current_base_netloc:
             path_part = parsed_absolute_link.path.strip('/')
             query_part = parsed_absolute_link.query
 
-            if mode == "aggregate":
-                # Create an anchor from the path. Replace / with - and ensure uniqueness if needed.
-                # This is a simple version; deepwiki-mcp might have more robust anchor generation.
-                new_href = "#" + path_part.replace('/', '-')
-                if query_part: # Append query as part of the anchor, sanitized
-                    new_href += "-" + query_part.replace('=', '-').replace('&', '-')
-                link_tag['href'] = new_href
-            elif mode == "pages":
-                # Convert to .md file link, keeping path structure.
-                # For ../ type links, urljoin should handle resolution correctly against current_page_url.
-                # We need the path relative to the current page's directory if possible, or just the full path.md.
-                # For simplicity, let's assume we make flat .md files from paths.
-                new_href = path_part + ".md"
-                if query_part:
-                    new_href += "?" + query_part # Keep query parameters if any
-                link_tag['href'] = new_href
-            # else: no rewrite for other modes or if it's an external link already absolute
+            link_tag['href'] = rewrite_href(path_part, query_part)
+        # else: external link, left absolute
 
 def html_to_markdown(
-    html_content: str, 
+    html_content: Union[str, bytes], # bytes straight off the network need no decode first
     mode: str = "aggregate", 
     base_url: Optional[str] = None # URL of the page itself, for resolving its relative links
 ) -> str:
@@ -189,16 +234,10 @@ def html_to_markdown(
         rewrite_internal_links_for_mode(soup, mode, base_url)
     
     # 3. Convert the processed BeautifulSoup object to Markdown
-    converter_options = {
-        'strip': ['script', 'style'], 
-        'heading_style': 'atx',
-        'bullets': '-',
-        'code_language_callback': lambda el: el.get('class', [None])[0] if el.get('class') and el.get('class')[0].startswith('language-') else None,
-        'base_url': base_url
-    }
+    from markdownify import MarkdownConverter
     # Use stock MarkdownConverter
-    # converter = CustomMarkdownConverter(**converter_options)
-    converter = MarkdownConverter(**converter_options) # STOCK CONVERTER
+    # converter = custom_markdown_converter_class()(**_CONVERTER_OPTIONS, base_url=base_url)
+    converter = MarkdownConverter(**_CONVERTER_OPTIONS, base_url=base_url) # STOCK CONVERTER
     
     markdown_output = converter.convert_soup(soup)
     
@@ -2,17 +2,42 @@
 Handles the crawling of web pages using aiohttp and BeautifulSoup.
 """
 import asyncio
+import atexit
+import datetime
+import email.utils
+import random
 import aiohttp
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 from typing import Callable, Dict, List, Optional, Set, Tuple, Awaitable
 from urllib.parse import urlparse, urljoin, urlunparse
 
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError: # older aiohttp
+    HAS_BROTLI = False
+try:
+    # SIMD-accelerated gzip/deflate decoding (optional `isal` package, aiohttp >= 3.12)
+    from isal import isal_zlib
+    aiohttp.set_zlib_backend(isal_zlib)
+except (ImportError, AttributeError):
+    pass
+try:
+    # c-ares DNS lookups on the event loop instead of getaddrinfo in the thread pool (optional `aiodns` package)
+    import aiodns # noqa: F401 - only needed by aiohttp.AsyncResolver
+    HAS_AIODNS = True
+except ImportError:
+    HAS_AIODNS = False
+
+# aiohttp decodes these itself; br is only offered when Brotli/brotlicffi is installed.
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
 # Add new imports
 from urllib.robotparser import RobotFileParser # Standard library
-import time # For retry backoff sleep
+import time
 
-# Define a list of non-HTML file extensions to skip
-NON_HTML_EXTENSIONS = {
+# Non-HTML file extensions to skip; a tuple so one str.endswith call tests them all
+NON_HTML_EXTENSIONS = (
     # Styles & Scripts
     '.css', '.js', '.mjs', '.json', '.ts', '.jsx', '.tsx',
     # Images
@@ -34,27 +59,88 @@ NON_HTML_EXTENSIONS = {
     '.sql', '.db', '.sqlite',
     # Specific to some web frameworks / patterns
     '.php', '.asp', '.aspx', '.jsp', '.cgi',
-}
+)
+
+# Schemes of discovered links that are followed
+_ALLOWED_SCHEMES = frozenset(("http", "https"))
+
+# Keep-alive connection pool shared by every crawl on the same event loop, so
+# consecutive pages (and consecutive `learn` runs in one process) reuse sockets
+# instead of paying a TCP/TLS handshake each time.
+MAX_POOLED_CONNECTIONS = 32
+KEEPALIVE_SECONDS = 60
+DNS_CACHE_SECONDS = 300 # aiohttp's default of 10s re-resolves the crawled host every few pages
+_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+def _close_session_at_exit(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+    if not session.closed and not loop.is_closed() and not loop.is_running():
+        loop.run_until_complete(session.close())
+
+def get_session() -> aiohttp.ClientSession:
+    """Returns the shared ClientSession for the running event loop, creating it on first use."""
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_POOLED_CONNECTIONS, keepalive_timeout=KEEPALIVE_SECONDS, ttl_dns_cache=DNS_CACHE_SECONDS,
+                resolver=aiohttp.AsyncResolver() if HAS_AIODNS else None
+            ),
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+        )
+        _SESSION_LOOP = loop
+        atexit.register(_close_session_at_exit, _SESSION, loop)
+    return _SESSION
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds from now, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None: # HTTP-dates are GMT
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
 
 async def fetch_url_content(
     session: aiohttp.ClientSession, 
     url: str, 
     user_agent: str,
     retry_limit: int = 3, 
-    backoff_base_ms: int = 300
+    backoff_base_ms: int = 300,
+    extra_headers: Optional[Dict[str, str]] = None,
+    backoff_cap_ms: int = 15000,
+    html_only: bool = False
 ) -> Tuple[int, str, Dict[str, str]]:
     """
     Fetches a URL using an aiohttp session with retries and backoff.
     Returns status code, text content, and headers.
+    `extra_headers` (e.g. If-None-Match) are sent as-is; a 304 comes back with empty content.
+    Retries wait a random time up to min(backoff_cap_ms, backoff_base_ms * 2**attempt) ("full jitter"),
+    so concurrent tasks hitting the same rate limit do not retry in lockstep; a server's
+    Retry-After is honoured instead, up to backoff_cap_ms.
+    With `html_only`, a successful non-HTML response is returned with empty content and its body is never read.
     """
     request_headers = {"User-Agent": user_agent, "Accept": "text/html,*/*;q=0.8"}
+    if extra_headers:
+        request_headers.update(extra_headers)
     last_exception = None
     status_code_for_error = 500 # Default error status
     error_message = "Unknown fetch error" # Default error message
+    retry_after_s = None # Server-requested delay before the next attempt, if any
     
     for attempt in range(retry_limit + 1):
         try:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=20), headers=request_headers, allow_redirects=True) as response:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=20, connect=5), headers=request_headers, allow_redirects=True) as response:
+                if html_only and response.status < 300 and "text/html" not in response.headers.get("Content-Type", "").lower():
+                    response.release() # Skip the download; the caller drops non-HTML pages anyway
+                    return response.status, "", dict(response.headers)
                 # It's important to read the content before checking status for some error types
                 # that might not raise an exception but return an error status.
                 content = await response.text(errors='ignore') 
@@ -68,6 +154,7 @@ async def fetch_url_content(
         except aiohttp.ClientResponseError as e: # Handles HTTP errors like 4xx, 5xx
             last_exception = e
             status_code_for_error = e.status
+            retry_after_s = _retry_after_seconds(e.headers.get("Retry-After") if e.headers else None)
             error_message = f"HTTP Error: {e.status} {e.message}"
             # For 4xx errors, typically don't retry unless specific (e.g. 429 Too Many Requests)
             # For this generic handler, we will retry on 5xx, but for 4xx we might break earlier.
@@ -88,7 +175,11 @@ async def fetch_url_content(
             error_message = f"Generic Fetch Error: {type(e).__name__}"
 
         if attempt < retry_limit:
-            sleep_duration = (backoff_base_ms / 1000) * (2 ** attempt)
+            if retry_after_s is not None:
+                sleep_duration = min(retry_after_s, backoff_cap_ms / 1000)
+                retry_after_s = None
+            else:
+                sleep_duration = random.random() * min(backoff_cap_ms, backoff_base_ms * (2 ** attempt)) / 1000
             # print(f"Attempt {attempt + 1} failed for {url}: {error_message}. Retrying in {sleep_duration:.2f}s...") # Debug
             await asyncio.sleep(sleep_duration)
         else:
@@ -99,10 +190,24 @@ async def fetch_url_content(
     # This part is reached if the loop was broken (e.g., by a non-retryable 4xx error)
     return status_code_for_error, f"{error_message} (for {url})", {}
 
+def extract_hrefs(html_content: str) -> List[str]:
+    """
+    Returns the href of every <a> in the page, in document order.
+    Link discovery needs no soup tree, so lxml's C parser and XPath do it directly;
+    BeautifulSoup is only used for pages lxml.html refuses (e.g. str input with an XML encoding declaration).
+    """
+    try:
+        return [str(href) for href in lxml.html.fromstring(html_content).xpath('//a/@href')]
+    except (ValueError, lxml.etree.ParserError):
+        from bs4 import BeautifulSoup
+        return [tag['href'] for tag in BeautifulSoup(html_content, 'lxml').find_all('a', href=True)]
+
 class CrawlResult:
     def __init__(self):
         self.html_contents: Dict[str, str] = {}  # URL -> HTML string
         self.errors: Dict[str, str] = {}       # URL -> Error message
+        self.validators: Dict[str, Dict[str, str]] = {} # URL -> {"ETag": ..., "Last-Modified": ...}
+        self.not_modified: Set[str] = set()    # URLs answered with 304 and served from the page cache
         self.total_bytes: int = 0
         self.start_time: float = 0.0
         self.end_time: float = 0.0
@@ -113,6 +218,79 @@ class CrawlResult:
             return (self.end_time - self.start_time) * 1000
         return 0.0
 
+class CachedRobotFileParser(RobotFileParser):
+    """RobotFileParser that remembers can_fetch verdicts; links repeated on every page (nav, footer) are checked once."""
+    def __init__(self, url: str = ''):
+        super().__init__(url)
+        self._verdicts: Dict[Tuple[str, str], bool] = {}
+
+    def parse(self, lines) -> None:
+        self._verdicts.clear()
+        super().parse(lines)
+
+    def can_fetch(self, useragent: str, url: str) -> bool:
+        key = (useragent, url)
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = self._verdicts[key] = super().can_fetch(useragent, url)
+        return verdict
+
+class CrawlDelayLimiter:
+    """Spaces out request starts to each host by at least `delay` seconds (robots.txt Crawl-delay)."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {} # netloc -> loop time the next request may start
+
+    async def wait(self, netloc: str) -> None:
+        async with self._locks.setdefault(netloc, asyncio.Lock()):
+            loop = asyncio.get_running_loop()
+            wait_s = self._next_start.get(netloc, 0.0) - loop.time()
+            if wait_s > 0:
+                await asyncio.sleep(wait_s)
+            self._next_start[netloc] = loop.time() + self.delay
+
+# Progress events reach the consumer as {"type": "batch", "events": [...]} at most this often
+PROGRESS_BATCH_INTERVAL_S = 0.05
+# Undelivered events kept while the consumer is slow; beyond this, "info" events are dropped
+PROGRESS_QUEUE_LIMIT = 10000
+
+class ProgressBatcher:
+    """
+    Collects crawl progress events and delivers them to `emit_progress` in batches from one task,
+    so workers append to a list instead of awaiting the consumer for every event.
+    """
+    def __init__(self, emit_progress: Callable[[Dict], Awaitable[None]]):
+        self._emit_progress = emit_progress
+        self._events: List[Dict] = []
+        self._ready = asyncio.Event()
+        self._closing = False
+        self.task = asyncio.create_task(self._run())
+
+    async def put(self, event: Dict) -> None:
+        """Drop-in for emit_progress; never waits on the consumer."""
+        if len(self._events) >= PROGRESS_QUEUE_LIMIT and event.get("type") == "info":
+            return # Consumer is behind; keep progress and errors, drop chatter
+        self._events.append(event)
+        self._ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            events, self._events = self._events, []
+            if events:
+                await self._emit_progress({"type": "batch", "events": events})
+            if self._closing:
+                return
+            await asyncio.sleep(PROGRESS_BATCH_INTERVAL_S)
+
+    async def close(self) -> None:
+        """Delivers whatever is still queued, then stops; re-raises an error from emit_progress."""
+        self._closing = True
+        self._ready.set()
+        await self.task
+
 async def crawl(
     root_url: str,
     max_depth: int = 1,
@@ -121,14 +299,23 @@ async def crawl(
     respect_robots_txt: bool = True, 
     max_concurrent_tasks: int = 10, # Increased default to 10
     retry_limit: int = 2, 
-    backoff_base_ms: int = 500
+    backoff_base_ms: int = 500,
+    cached_page: Optional[Callable[[str], Optional[Tuple[Dict[str, str], str]]]] = None,
+    verbose: bool = False
 ) -> CrawlResult:
     """
     Crawls web pages starting from root_url up to max_depth.
     Includes robots.txt handling, file extension skipping, and retries for fetches.
+    If `cached_page(url)` returns (validators, html) from an earlier run, the fetch is made
+    conditional and a 304 reuses that html instead of downloading the page again.
+    `emit_progress` receives events batched as {"type": "batch", "events": [...]}; see ProgressBatcher.
+    Per-link "skipped" info events (file extension, robots.txt) are only emitted when `verbose` is set.
     """
     result = CrawlResult()
-    result.start_time = asyncio.get_event_loop().time()
+    result.start_time = time.monotonic()
+    batcher = ProgressBatcher(emit_progress) if emit_progress else None
+    if batcher:
+        emit_progress = batcher.put
 
     queue: asyncio.Queue[Tuple[str, int]] = asyncio.Queue()
     crawled_urls: Set[str] = set()
@@ -137,90 +324,95 @@ async def crawl(
     if not parsed_root_url.scheme or not parsed_root_url.netloc:
         if emit_progress: await emit_progress({"type": "error", "message": f"Invalid root_url: {root_url}. Must be absolute."})
         result.errors[root_url] = "Invalid root_url: Must be absolute."
-        result.end_time = asyncio.get_event_loop().time()
+        result.end_time = time.monotonic()
+        if batcher:
+            await batcher.close()
         return result
         
-    base_netloc = parsed_root_url.netloc
+    base_netloc = parsed_root_url.netloc.lower() # Hostnames are case-insensitive
     robots_parser: Optional[RobotFileParser] = None
+    crawl_delay: Optional[CrawlDelayLimiter] = None
 
     if respect_robots_txt:
         robots_url_parts = parsed_root_url._replace(path="/robots.txt", query="", fragment="")
         robots_url = urlunparse(robots_url_parts)
         try:
-            async with aiohttp.ClientSession() as robots_session:
-                r_status, r_content, _ = await fetch_url_content(robots_session, robots_url, user_agent, retry_limit=0)
+            r_status, r_content, _ = await fetch_url_content(get_session(), robots_url, user_agent, retry_limit=0)
             if r_status == 200 and r_content:
-                robots_parser = RobotFileParser()
+                robots_parser = CachedRobotFileParser()
                 robots_parser.set_url(robots_url) # Important for context
                 robots_parser.parse(r_content.splitlines())
                 if emit_progress: await emit_progress({"type": "info", "message": f"Successfully parsed robots.txt from {robots_url}"})
+                delay = robots_parser.crawl_delay(user_agent) or 0
+                if delay > 0:
+                    crawl_delay = CrawlDelayLimiter(delay)
+                    if emit_progress: await emit_progress({"type": "info", "message": f"Honouring robots.txt Crawl-delay of {delay}s"})
             elif emit_progress:
                 await emit_progress({"type": "info", "message": f"Could not fetch robots.txt (status {r_status}) from {robots_url}"})
         except Exception as e:
             if emit_progress: await emit_progress({"type": "info", "message": f"Error fetching/parsing robots.txt from {robots_url}: {str(e)}"})
 
+    if robots_parser and not robots_parser.can_fetch(user_agent, root_url):
+        # Discovered links are checked before they are queued; the root is the only URL that isn't
+        if emit_progress: await emit_progress({"type": "info", "url": root_url, "message": "Skipped by robots.txt"})
+        result.errors[root_url] = "Skipped by robots.txt"
+        result.end_time = time.monotonic()
+        if batcher:
+            await batcher.close()
+        return result
+
     await queue.put((root_url, 0))
     # Add to crawled_urls *when adding to queue* to prevent re-queueing the same URL
     # if discovered by multiple pages before it's processed.
     crawled_urls.add(root_url) 
 
-    # Use a semaphore to control concurrency more explicitly
-    semaphore = asyncio.Semaphore(max_concurrent_tasks)
-
-    async with aiohttp.ClientSession() as session:
-        active_processing_tasks: Set[asyncio.Task] = set()
+    session = get_session()
 
+    async def worker():
+        # Long-lived: takes URLs off the queue until crawl() cancels it once the queue is drained
         while True:
-            # Try to fetch from queue if semaphore allows and queue has items
-            # This loop ensures we fill up to max_concurrent_tasks
-            while not queue.empty() and len(active_processing_tasks) < max_concurrent_tasks :
-                try:
-                    # Non-blocking get to check if we should break and wait for tasks to complete
-                    current_url, current_depth = queue.get_nowait() 
-                except asyncio.QueueEmpty:
-                    break # Queue is empty, break inner loop and wait for tasks or exit
-
-                # Robots.txt check (should be done before acquiring semaphore for this URL)
-                if robots_parser and not robots_parser.can_fetch(user_agent, current_url):
-                    if emit_progress: await emit_progress({"type": "info", "url": current_url, "message": "Skipped by robots.txt (at queue processing)"})
-                    result.errors[current_url] = "Skipped by robots.txt"
-                    queue.task_done() # Important if queue.join() is used elsewhere or for tracking
+            current_url, current_depth = await queue.get()
+            try:
+                # Robots.txt was already checked when the URL was queued
+                # File extension check (primary check before fetching it)
+                current_url_path = urlparse(current_url).path
+                if current_url_path.lower().endswith(NON_HTML_EXTENSIONS):
+                    if emit_progress: await emit_progress({"type": "info", "url": current_url, "message": f"Skipped due to file extension (at queue processing): {current_url_path}"})
+                    result.errors[current_url] = f"Skipped due to file extension: {current_url_path}"
                     continue
 
-                # File extension check (primary check before starting a task for it)
-                current_url_path_lower = urlparse(current_url).path.lower()
-                if any(current_url_path_lower.endswith(ext) for ext in NON_HTML_EXTENSIONS):
-                    if emit_progress: await emit_progress({"type": "info", "url": current_url, "message": f"Skipped due to file extension (at queue processing): {urlparse(current_url).path}"})
-                    result.errors[current_url] = f"Skipped due to file extension: {urlparse(current_url).path}"
-                    queue.task_done()
-                    continue
-                
-                # Acquire semaphore before creating task
-                await semaphore.acquire()
-                task = asyncio.create_task(process_single_url(
-                    session, current_url, current_depth, max_depth, base_netloc, 
+                await process_single_url(
+                    session, current_url, current_depth, max_depth, base_netloc,
                     result, queue, crawled_urls, emit_progress, user_agent,
                     robots_parser, # Pass robots_parser
                     retry_limit, backoff_base_ms, # Pass retry params
-                    semaphore # Pass semaphore to be released in task
-                ))
-                active_processing_tasks.add(task)
-                # Ensure task removes itself from set upon completion
-                task.add_done_callback(active_processing_tasks.discard)
-            
-            if not active_processing_tasks and queue.empty():
-                break # All tasks are done and queue is empty
-
-            if active_processing_tasks: # Only wait if there are tasks
-                 # Wait for at least one task to complete
-                _, pending = await asyncio.wait(active_processing_tasks, return_when=asyncio.FIRST_COMPLETED)
-                # active_processing_tasks is already updated by the callback
-            else: # No active tasks but queue might not be empty (e.g. if max_concurrent_tasks was 0 or very small)
-                 # Or, if all tasks just finished and queue is now empty, this allows loop to break
-                 await asyncio.sleep(0.01) # Small sleep to yield control
+                    cached_page,
+                    crawl_delay,
+                    emit_progress if verbose else None
+                )
+            finally:
+                queue.task_done() # Links found by process_single_url were queued before this
 
+    # max_concurrent_tasks workers instead of a task per URL; the queue's unfinished-task
+    # count reaching zero means every discovered URL has been processed.
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, max_concurrent_tasks))]
+    queue_drained = asyncio.ensure_future(queue.join())
+    try:
+        # A worker (or the progress batcher) only finishes early if it raised; surface that error
+        background = workers + [batcher.task] if batcher else workers
+        await asyncio.wait([queue_drained, *background], return_when=asyncio.FIRST_COMPLETED)
+        for task in background:
+            if task.done():
+                task.result()
+    finally:
+        queue_drained.cancel()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(queue_drained, *workers, return_exceptions=True)
+        if batcher:
+            await batcher.close()
 
-    result.end_time = asyncio.get_event_loop().time()
+    result.end_time = time.monotonic()
     return result
 
 async def process_single_url(
@@ -237,18 +429,37 @@ async def process_single_url(
     robots_parser_ref: Optional[RobotFileParser],
     fetch_retry_limit: int,
     fetch_backoff_base_ms: int,
-    semaphore: asyncio.Semaphore # Added semaphore
+    cached_page_ref: Optional[Callable[[str], Optional[Tuple[Dict[str, str], str]]]] = None,
+    crawl_delay_ref: Optional[CrawlDelayLimiter] = None,
+    emit_verbose_ref: Optional[Callable[[Dict], Awaitable[None]]] = None
 ):
     """Helper function to process a single URL fetch and its links."""
     try:
         if emit_progress_ref:
             await emit_progress_ref({"type": "info", "url": url_to_process, "message": f"Fetching at depth {depth_of_url}"})
         
+        cached = cached_page_ref(url_to_process) if cached_page_ref else None
+        conditional_headers = {}
+        if cached:
+            if cached[0].get("ETag"):
+                conditional_headers["If-None-Match"] = cached[0]["ETag"]
+            if cached[0].get("Last-Modified"):
+                conditional_headers["If-Modified-Since"] = cached[0]["Last-Modified"]
+
+        if crawl_delay_ref:
+            await crawl_delay_ref.wait(base_netloc)
         status, html_content, response_headers = await fetch_url_content(
             session, url_to_process, user_agent,
             retry_limit=fetch_retry_limit,
-            backoff_base_ms=fetch_backoff_base_ms
+            backoff_base_ms=fetch_backoff_base_ms,
+            extra_headers=conditional_headers,
+            html_only=True
         )
+        if status == 304 and cached:
+            # Unchanged since the cached copy; carry on with the stored HTML
+            status, html_content = 200, cached[1]
+            response_headers = {"Content-Type": "text/html", **cached[0], **response_headers}
+            crawl_result_obj.not_modified.add(url_to_process)
         content_type = response_headers.get("Content-Type", "").lower()
 
         if "text/html" not in content_type:
@@ -258,33 +469,40 @@ async def process_single_url(
 
         if status == 200:
             crawl_result_obj.html_contents[url_to_process] = html_content
-            crawl_result_obj.total_bytes += len(html_content.encode('utf-8')) # Approximate
+            validators = {name: response_headers[name] for name in ("ETag", "Last-Modified") if response_headers.get(name)}
+            if validators:
+                crawl_result_obj.validators[url_to_process] = validators
+            # UTF-8 size of the page; ASCII pages (most docs) are measured without encoding a copy
+            page_bytes = len(html_content) if html_content.isascii() else len(html_content.encode('utf-8'))
+            crawl_result_obj.total_bytes += page_bytes # Approximate
             if emit_progress_ref:
                 await emit_progress_ref({
-                    "type": "progress", "url": url_to_process, "bytes": len(html_content.encode('utf-8')),
+                    "type": "progress", "url": url_to_process, "bytes": page_bytes,
                     "status": status, "fetched_count": len(crawl_result_obj.html_contents), "queue_size": queue_ref.qsize()
                 })
 
             if depth_of_url < max_depth:
-                soup = BeautifulSoup(html_content, 'lxml') 
-                for link_tag in soup.find_all('a', href=True):
-                    href = link_tag['href']
+                for href in extract_hrefs(html_content):
                     if not href or href.startswith('mailto:') or href.startswith('tel:') or href.startswith('javascript:'):
                         continue
                         
-                    absolute_link = urljoin(url_to_process, href)
+                    absolute_link = urljoin(url_to_process, href).partition('#')[0] # Fragments never name another page
                     parsed_link = urlparse(absolute_link)
                     
-                    link_path_lower = parsed_link.path.lower()
-                    if any(link_path_lower.endswith(ext) for ext in NON_HTML_EXTENSIONS):
-                        if emit_progress_ref: await emit_progress_ref({"type": "info", "url": absolute_link, "message": f"Skipped due to file extension: {parsed_link.path}"})
+                    if parsed_link.path.lower().endswith(NON_HTML_EXTENSIONS):
+                        if emit_verbose_ref: await emit_verbose_ref({"type": "info", "url": absolute_link, "message": f"Skipped due to file extension: {parsed_link.path}"})
                         continue
 
-                    if parsed_link.netloc == base_netloc and parsed_link.scheme in ['http', 'https']:
-                        normalized_link = urlunparse(parsed_link._replace(fragment=''))
+                    if parsed_link.scheme in _ALLOWED_SCHEMES and parsed_link.netloc.lower() == base_netloc:
+                        normalized_link = absolute_link
+                        if not (absolute_link.startswith(('http://', 'https://')) and absolute_link.isprintable()
+                                and ';' not in absolute_link and not absolute_link.endswith('?')):
+                            # urlparse lowercases the scheme and drops tabs/newlines and empty ;params or ?query;
+                            # rebuild only those links so they dedupe the same way
+                            normalized_link = urlunparse(parsed_link)
                         
                         if robots_parser_ref and not robots_parser_ref.can_fetch(user_agent, normalized_link):
-                            if emit_progress_ref: await emit_progress_ref({"type": "info", "url": normalized_link, "message": "Skipped by robots.txt (discovered link)"})
+                            if emit_verbose_ref: await emit_verbose_ref({"type": "info", "url": normalized_link, "message": "Skipped by robots.txt (discovered link)"})
                             crawl_result_obj.errors[normalized_link] = "Skipped by robots.txt (discovered link)"
                             continue
 
@@ -297,15 +515,16 @@ async def process_single_url(
     except Exception as e:
         crawl_result_obj.errors[url_to_process] = f"Processing Error: {type(e).__name__} - {str(e)}"
         if emit_progress_ref: await emit_progress_ref({"type": "error", "url": url_to_process, "message": f"Processing Error: {type(e).__name__} - {str(e)}"})
-    finally:
-        semaphore.release() # Release semaphore when task is done
-        # queue_ref.task_done() # only if using queue.join()
 
 
 # Example usage (for testing this module directly)
 async def main():
     async def _progress(data: Dict):
         progress_type = data.get("type")
+        if progress_type == "batch":
+            for event in data["events"]:
+                await _progress(event)
+            return
         url = data.get('url', '')
         message = data.get('message', '')
         if progress_type == "progress":
@@ -321,7 +540,7 @@ async def main():
     # target = "https://docs.python.org/3/library/asyncio.html"
 
     print(f"Starting crawl for {target}")
-    results = await crawl(target, max_depth=1, emit_progress=_progress, max_concurrent_tasks=5)
+    results = await crawl(target, max_depth=1, emit_progress=_progress, max_concurrent_tasks=5, verbose=True)
     
     print("\n--- Crawl Finished ---")
     print(f"Elapsed time: {results.elapsed_ms:.2f} ms")
@@ -340,6 +559,7 @@ async def main():
             print(f"  - {url}: {error}")
     else:
         print("\nNo errors encountered during crawl.")
+    await get_session().close() # asyncio.run closes the loop before atexit could
 
 if __name__ == "__main__":
     # To run this example:
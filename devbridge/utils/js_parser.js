@@ -3,76 +3,110 @@ const fs = require('fs');
 const parser = require('@babel/parser');
 
 if (process.argv.length < 3) {
-  console.error('Usage: node js_parser.js <file.js>');
+  console.error('Usage: node js_parser.js <file.js> | --serve');
   process.exit(1);
 }
 
-const filePath = process.argv[2];
-const code = fs.readFileSync(filePath, 'utf8');
-const lines = code.split(/\r?\n/);
+function extractElements(code) {
+  const lines = code.split(/\r?\n/);
 
-let elements = [];
+  let elements = [];
 
-function getSnippet(start, end) {
-  return lines.slice(start - 1, end).join('\n');
-}
-
-function walk(node, parent) {
-  if (!node || typeof node !== 'object') return;
-  // Function Declarations
-  if (node.type === 'FunctionDeclaration') {
-    elements.push({
-      type: 'function_js_ts',
-      name: node.id ? node.id.name : '',
-      start_line: node.loc.start.line,
-      end_line: node.loc.end.line,
-      snippet: getSnippet(node.loc.start.line, node.loc.end.line)
-    });
+  function getSnippet(start, end) {
+    return lines.slice(start - 1, end).join('\n');
   }
-  // Class Declarations
-  if (node.type === 'ClassDeclaration') {
-    elements.push({
-      type: 'class_js_ts',
-      name: node.id ? node.id.name : '',
-      start_line: node.loc.start.line,
-      end_line: node.loc.end.line,
-      snippet: getSnippet(node.loc.start.line, node.loc.end.line)
-    });
-  }
-  // Variable Declarations (arrow functions, function expressions)
-  if (node.type === 'VariableDeclaration') {
-    node.declarations.forEach(decl => {
-      if (decl.init && (decl.init.type === 'ArrowFunctionExpression' || decl.init.type === 'FunctionExpression')) {
-        elements.push({
-          type: 'function_js_ts',
-          name: decl.id.name,
-          start_line: decl.init.loc.start.line,
-          end_line: decl.init.loc.end.line,
-          snippet: getSnippet(decl.init.loc.start.line, decl.init.loc.end.line)
-        });
+
+  function walk(node, parent) {
+    if (!node || typeof node !== 'object') return;
+    // Function Declarations
+    if (node.type === 'FunctionDeclaration') {
+      elements.push({
+        type: 'function_js_ts',
+        name: node.id ? node.id.name : '',
+        start_line: node.loc.start.line,
+        end_line: node.loc.end.line,
+        snippet: getSnippet(node.loc.start.line, node.loc.end.line)
+      });
+    }
+    // Class Declarations
+    if (node.type === 'ClassDeclaration') {
+      elements.push({
+        type: 'class_js_ts',
+        name: node.id ? node.id.name : '',
+        start_line: node.loc.start.line,
+        end_line: node.loc.end.line,
+        snippet: getSnippet(node.loc.start.line, node.loc.end.line)
+      });
+    }
+    // Variable Declarations (arrow functions, function expressions)
+    if (node.type === 'VariableDeclaration') {
+      node.declarations.forEach(decl => {
+        if (decl.init && (decl.init.type === 'ArrowFunctionExpression' || decl.init.type === 'FunctionExpression')) {
+          elements.push({
+            type: 'function_js_ts',
+            name: decl.id.name,
+            start_line: decl.init.loc.start.line,
+            end_line: decl.init.loc.end.line,
+            snippet: getSnippet(decl.init.loc.start.line, decl.init.loc.end.line)
+          });
+        }
+      });
+    }
+    // Recurse
+    for (let key in node) {
+      if (key === 'loc' || key === 'start' || key === 'end') continue;
+      const child = node[key];
+      if (Array.isArray(child)) {
+        child.forEach(c => walk(c, node));
+      } else {
+        walk(child, node);
       }
-    });
-  }
-  // Recurse
-  for (let key in node) {
-    if (key === 'loc' || key === 'start' || key === 'end') continue;
-    const child = node[key];
-    if (Array.isArray(child)) {
-      child.forEach(c => walk(c, node));
-    } else {
-      walk(child, node);
     }
   }
-}
 
-const ast = parser.parse(code, {
-  sourceType: 'module',
-  plugins: ['jsx', 'typescript'],
-  errorRecovery: true,
-  allowReturnOutsideFunction: true,
-  allowSuperOutsideMethod: true
-});
+  const ast = parser.parse(code, {
+    sourceType: 'module',
+    plugins: ['jsx', 'typescript'],
+    errorRecovery: true,
+    allowReturnOutsideFunction: true,
+    allowSuperOutsideMethod: true
+  });
+
+  walk(ast, null);
+  return elements;
+}
 
-walk(ast, null);
+// --serve: stay alive and answer length-prefixed requests on stdin, one per
+// source file, so the Python indexer pays Node startup once per run.
+// Request:  "<byte length>\n<source>"   Response: "<byte length>\n<JSON>"
+// A source that fails to parse is answered with {"error": "..."}.
+function serve() {
+  let buffered = Buffer.alloc(0);
+  process.stdin.on('data', chunk => {
+    buffered = Buffer.concat([buffered, chunk]);
+    for (;;) {
+      const newline = buffered.indexOf(10);
+      if (newline === -1) return;
+      const length = parseInt(buffered.subarray(0, newline).toString('ascii'), 10);
+      if (buffered.length < newline + 1 + length) return;
+      const code = buffered.subarray(newline + 1, newline + 1 + length).toString('utf8');
+      buffered = buffered.subarray(newline + 1 + length);
+      let reply;
+      try {
+        reply = JSON.stringify(extractElements(code));
+      } catch (e) {
+        reply = JSON.stringify({ error: String(e && e.message || e) });
+      }
+      const payload = Buffer.from(reply, 'utf8');
+      process.stdout.write(payload.length + '\n');
+      process.stdout.write(payload);
+    }
+  });
+}
 
-console.log(JSON.stringify(elements, null, 2)); 
\ No newline at end of file
+if (process.argv[2] === '--serve') {
+  serve();
+} else {
+  const code = fs.readFileSync(process.argv[2], 'utf8');
+  console.log(JSON.stringify(extractElements(code), null, 2));
+} 
\ No newline at end of file
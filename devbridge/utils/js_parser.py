@@ -1,34 +1,128 @@
+import atexit
 import subprocess
 import json
+import threading
 from pathlib import Path
+from typing import List
+
+SCRIPT_PATH = str(Path(__file__).parent / 'js_parser.js')
+
+# Long-lived `node js_parser.js --serve` process shared by all extract_js_elements calls.
+_worker = None
+# The worker answers requests in order over one pipe pair, so only one caller may talk to it at a time.
+_worker_lock = threading.Lock()
+
+def _close_worker():
+    global _worker
+    if _worker is not None:
+        try:
+            _worker.stdin.close()
+            _worker.wait(timeout=5)
+        except Exception:
+            _worker.kill()
+        _worker = None
+
+atexit.register(_close_worker)
+
+def _start_worker():
+    global _worker
+    if _worker is None or _worker.poll() is not None:
+        _worker = subprocess.Popen(['node', SCRIPT_PATH, '--serve'],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return _worker
+
+def _write_request(worker, source_code: str) -> None:
+    payload = source_code.encode('utf-8')
+    worker.stdin.write(b"%d\n" % len(payload) + payload)
+
+def _read_reply(worker):
+    header = worker.stdout.readline()
+    if not header:
+        raise EOFError("no reply")
+    return json.loads(worker.stdout.read(int(header)))
+
+def _worker_error(e: Exception) -> Exception:
+    """Closes a worker that failed mid-request and returns the error to report."""
+    try:
+        returncode = _worker.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        returncode = None
+    if returncode is not None:
+        # Node died (e.g. @babel/parser missing); report its error line.
+        stderr_lines = _worker.stderr.read().decode('utf-8', 'replace').splitlines()
+        reason = next((line.strip() for line in stderr_lines if 'Error' in line), str(e))
+        e = RuntimeError(f"JS parser exited with code {returncode}: {reason}")
+    _close_worker() # Out of sync or dead; the next call starts a fresh worker
+    return e
+
+def _parse_with_worker(source_code: str):
+    """Sends one length-prefixed source to the Node worker, starting it on first use."""
+    with _worker_lock:
+        worker = _start_worker()
+        try:
+            _write_request(worker, source_code)
+            worker.stdin.flush()
+            reply = _read_reply(worker)
+        except Exception as e:
+            raise _worker_error(e)
+    if isinstance(reply, dict) and 'error' in reply:
+        raise ValueError(reply['error'])
+    return reply
+
+def extract_js_elements_batch(sources: List[str]) -> List[list]:
+    """
+    Like extract_js_elements for many sources at once: all requests are pipelined to the
+    Node worker while replies are read back, instead of one round trip per file.
+    Returns one element list per source, in order; a source that fails to parse gets [].
+    """
+    replies = []
+    with _worker_lock:
+        try:
+            worker = _start_worker()
+
+            def feed():
+                # Written from a thread so a full stdout pipe on the Node side cannot deadlock us.
+                try:
+                    for source_code in sources:
+                        _write_request(worker, source_code)
+                    worker.stdin.flush()
+                except (OSError, ValueError):
+                    pass # The worker died or was closed; the reader reports why
+
+            feeder = threading.Thread(target=feed, daemon=True)
+            feeder.start()
+            for _ in sources:
+                replies.append(_read_reply(worker))
+            feeder.join()
+        except Exception as e:
+            print(f"[extract_js_elements_batch] Error: {_worker_error(e)}")
+
+    results = []
+    for reply in replies:
+        if isinstance(reply, dict) and 'error' in reply:
+            print(f"[extract_js_elements_batch] Error: {reply['error']}")
+            reply = []
+        results.append(reply)
+    return results + [[] for _ in range(len(sources) - len(results))]
 
 def extract_js_elements(source_code: str, file_path: str = None):
     """
     Extract all function and class definitions from JS/TS source code using the Node.js js_parser.js script.
-    If file_path is provided, it will be used; otherwise, a temp file will be created.
+    If file_path is provided, a one-off Node process parses that file; otherwise the source is sent
+    to a persistent Node worker, so a whole indexing run pays Node startup once.
     Returns a list of dicts: {type, name, start_line, end_line, snippet}
     """
-    import tempfile
-    import os
-    if file_path is None:
-        with tempfile.NamedTemporaryFile('w', suffix='.js', delete=False, encoding='utf-8') as tmp:
-            tmp.write(source_code)
-            tmp_path = tmp.name
-    else:
-        tmp_path = file_path
     try:
-        script_path = str(Path(__file__).parent / 'js_parser.js')
-        result = subprocess.run(['node', script_path, tmp_path], capture_output=True, text=True, check=True)
+        if file_path is None:
+            return _parse_with_worker(source_code)
+        result = subprocess.run(['node', SCRIPT_PATH, file_path], capture_output=True, text=True, check=True)
         elements = json.loads(result.stdout)
         return elements
     except Exception as e:
         print(f"[extract_js_elements] Error: {e}")
         return []
-    finally:
-        if file_path is None and os.path.exists(tmp_path):
-            os.remove(tmp_path)
 
 # Example usage:
 # with open('somefile.js', 'r') as f:
 #     code = f.read()
-#     print(extract_js_elements(code)) 
\ No newline at end of file
+#     print(extract_js_elements(code))
@@ -0,0 +1,106 @@
+"""
+Disk cache for the `learn` command.
+
+Markdown conversions are keyed by a BLAKE2b hash of the page HTML, mode and base URL,
+so re-learning unchanged pages skips `html_to_markdown`. Fetched pages are kept with
+their ETag/Last-Modified validators so the crawler can send conditional requests and
+reuse the stored HTML on a 304. Reads refresh an entry's mtime, and `prune` drops the
+least recently used entries once the cache outgrows its byte budget.
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CACHE_DIR = Path.home() / ".devbridge" / "md_cache"
+
+def key(html: str, mode: str, base_url: Optional[str]) -> str:
+    """Cache key for one conversion; compute it once per page and pass it to contains/get/put."""
+    return hashlib.blake2b(
+        html.encode("utf-8") + b"|" + mode.encode("utf-8") + b"|" + (base_url or "").encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def _read_touch(path: Path) -> str:
+    text = path.read_text(encoding="utf-8")
+    try:
+        os.utime(path) # Recently used: kept over older entries by prune()
+    except OSError:
+        pass
+    return text
+
+def _md_path(md_key: str) -> Path:
+    return CACHE_DIR / md_key[:2] / f"{md_key[2:]}.md"
+
+def contains(md_key: str) -> bool:
+    """True if Markdown for this key is cached, without reading it."""
+    return _md_path(md_key).is_file()
+
+def get(md_key: str) -> Optional[str]:
+    """Returns the cached Markdown for this key, or None on a miss."""
+    try:
+        return _read_touch(_md_path(md_key))
+    except OSError:
+        return None
+
+def put(md_key: str, markdown: str) -> str:
+    """Stores `markdown` under this key and returns it, so callers can write `get(...) or put(...)`."""
+    try:
+        _write_atomic(_md_path(md_key), markdown)
+    except OSError:
+        pass # A read-only or full disk just means no caching
+    return markdown
+
+def _page_path(url: str) -> Path:
+    return CACHE_DIR / "pages" / f"{hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()}.json"
+
+def get_page(url: str) -> Optional[Tuple[Dict[str, str], str]]:
+    """Returns (validators, html) stored for `url` by `put_page`, or None."""
+    try:
+        entry = json.loads(_read_touch(_page_path(url)))
+        return entry["validators"], entry["html"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def put_page(url: str, validators: Dict[str, str], html: str) -> None:
+    """Remembers `html` for `url` together with its ETag/Last-Modified validators."""
+    try:
+        _write_atomic(_page_path(url), json.dumps({"validators": validators, "html": html}))
+    except OSError:
+        pass
+
+def prune(max_bytes: int) -> None:
+    """Deletes the least recently used entries until the cache holds at most `max_bytes`."""
+    entries = []
+    for dirpath, _, filenames in os.walk(CACHE_DIR):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+    entries.sort() # Oldest first
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+def clear() -> None:
+    """Removes every cached page and Markdown conversion."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
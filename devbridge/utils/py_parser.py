@@ -0,0 +1,63 @@
+import ast
+import re
+
+# Whole-line comments; the indexer only records comments that start a line.
+_COMMENT_RE = re.compile(r"(?m)^[ \t]*(#[^\r\n]*?)[ \t]*\r?$")
+
+def line_offsets(source_code: str):
+    """Start offset of every line in `source_code`, plus its length; line N spans [offsets[N-1], offsets[N])."""
+    return [0] + [m.end() for m in re.finditer("\n", source_code)] + [len(source_code) + 1]
+
+def source_lines(source_code: str, offsets, start_line: int, end_line: int) -> str:
+    """Lines start_line..end_line as one slice of the original source, indentation kept, ends stripped."""
+    return source_code[offsets[start_line - 1]:offsets[end_line]].strip()
+
+def extract_py_elements(source_code: str, file_path: str = None):
+    """
+    Extract functions, classes, docstrings, TODOs and comments from Python source with a single ast.parse.
+    Returns a list of dicts: {type, name, start_line, end_line, snippet}, ordered by start_line.
+    Raises SyntaxError (or ValueError for null bytes) if the source cannot be parsed.
+    """
+    tree = ast.parse(source_code, filename=file_path or "<unknown>")
+    # Offsets split on "\n" only, matching ast's line numbers (str.splitlines also breaks on \f etc.).
+    offsets = line_offsets(source_code)
+    elements = []
+    string_lines = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            elements.append({
+                "type": "class_py" if isinstance(node, ast.ClassDef) else "function_py",
+                "name": node.name,
+                "start_line": node.lineno,
+                "end_line": node.end_lineno,
+                "snippet": source_lines(source_code, offsets, node.lineno, node.lineno),
+            })
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            string_lines.update(range(node.lineno, node.end_lineno + 1))
+            elements.append({
+                "type": "docstring",
+                "name": None,
+                "start_line": node.lineno,
+                "end_line": node.end_lineno,
+                "snippet": source_lines(source_code, offsets, node.lineno, node.end_lineno),
+            })
+
+    # One regex sweep for comments; '#' lines inside bare string literals are text, not comments.
+    line_num, pos = 1, 0
+    for match in _COMMENT_RE.finditer(source_code):
+        line_num += source_code.count("\n", pos, match.start())
+        pos = match.start()
+        if line_num in string_lines:
+            continue
+        comment = match.group(1)
+        elements.append({
+            "type": "todo" if comment.startswith("# TODO") else "comment",
+            "name": None,
+            "start_line": line_num,
+            "end_line": line_num,
+            "snippet": comment,
+        })
+
+    elements.sort(key=lambda e: e["start_line"])
+    return elements
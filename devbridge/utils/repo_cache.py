@@ -0,0 +1,73 @@
+"""
+On-disk LRU cache of bare mirrors for remote repositories.
+
+`repo add --full-history` clones with `--reference <mirror> --dissociate`, so a
+URL that has been added before is cloned mostly from local objects instead of
+the network.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict
+
+import git
+
+INDEX_FILE_NAME = "index.json"
+
+def _normalize_url(url: str) -> str:
+    """Normalises a clone URL so trivially different spellings share a mirror."""
+    url = url.strip().rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    return url.lower()
+
+class LRUClone:
+    """Keeps at most `max_entries` bare mirrors in `cache_dir`, evicting the least recently used."""
+
+    def __init__(self, cache_dir: str, max_entries: int = 5):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.index_path = self.cache_dir / INDEX_FILE_NAME
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, dict]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
+    def get_or_fetch(self, url: str) -> str:
+        """Returns the path of a bare mirror of `url`, cloning it on first use.
+
+        Raises:
+            git.exc.GitCommandError: If the mirror cannot be cloned.
+        """
+        key = hashlib.sha1(_normalize_url(url).encode("utf-8")).hexdigest()
+        mirror_path = self.cache_dir / f"{key}.git"
+        index = self._load_index()
+
+        if not mirror_path.exists():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            git.Repo.clone_from(url, mirror_path, multi_options=["--mirror"])
+
+        index[key] = {"url": url, "path": str(mirror_path), "last_used": time.time()}
+        self._evict(index, keep=key)
+        self._save_index(index)
+        return str(mirror_path)
+
+    def _evict(self, index: Dict[str, dict], keep: str) -> None:
+        """Drops the least recently used mirrors until at most `max_entries` remain."""
+        by_age = sorted(index, key=lambda k: index[k].get("last_used", 0))
+        while len(index) > self.max_entries and by_age:
+            victim = by_age.pop(0)
+            if victim == keep:
+                continue
+            shutil.rmtree(index.pop(victim)["path"], ignore_errors=True)
@@ -2,7 +2,26 @@ import sqlite3, pathlib, datetime, json
 
 def _conn(db_path): 
     pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(db_path)
+    # Parallel index workers wait for each other's short write transactions.
+    conn = sqlite3.connect(db_path, timeout=60)
+    # WAL with synchronous=NORMAL syncs at checkpoints rather than on every commit.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456") # Reads of a large index come from the page cache, not read() calls
+    return conn
+
+INSERT_ELEMENT_SQL = """
+    INSERT INTO code_elements (file_id, element_type, name, snippet, start_line, end_line)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+def bulk_insert_elements(c, rows):
+    """Inserts (file_id, element_type, name, snippet, start_line, end_line) rows with one executemany.
+
+    Runs inside the caller's transaction on connection `c`, so a whole batch costs a single commit.
+    """
+    c.executemany(INSERT_ELEMENT_SQL, rows)
 
 def init_db(db_path):
     with _conn(db_path) as c:
@@ -30,6 +49,8 @@ def init_db(db_path):
             relative_path TEXT NOT NULL, -- Path relative to repository root
             language TEXT,
             file_hash TEXT, -- To detect changes for re-indexing
+            mtime_ns INTEGER, -- stat() at last hash; unchanged mtime+size skips re-hashing
+            size INTEGER,
             last_scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (repository_id) REFERENCES repositories (id) ON DELETE CASCADE,
@@ -50,12 +71,76 @@ def init_db(db_path):
             FOREIGN KEY (file_id) REFERENCES indexed_files (id) ON DELETE CASCADE
         );
 
+        -- find joins on file_id and orders by start_line; the filters hit element_type and language.
+        -- indexed_files(repository_id, relative_path) is already covered by its UNIQUE constraint.
+        CREATE INDEX IF NOT EXISTS idx_ce_file_start ON code_elements (file_id, start_line, element_type, name);
+        CREATE INDEX IF NOT EXISTS idx_ce_type ON code_elements (element_type);
+        CREATE INDEX IF NOT EXISTS idx_files_lang ON indexed_files (language);
+
         -- Old table for reference, to be removed after migration/verification
         -- CREATE TABLE IF NOT EXISTS file_index(
         --   id INTEGER PRIMARY KEY,
         --   repo TEXT, path TEXT, lang TEXT,
         --   indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
         """) 
+        _migrate_indexed_files(c)
+        _init_fts(c)
+
+def _migrate_indexed_files(c):
+    """Adds columns introduced after the first schema to existing indexed_files tables."""
+    columns = {row[1] for row in c.execute("PRAGMA table_info(indexed_files)")}
+    for column in ("mtime_ns", "size"):
+        if column not in columns:
+            c.execute(f"ALTER TABLE indexed_files ADD COLUMN {column} INTEGER")
+
+def _init_fts(c):
+    """Creates the FTS5 trigram index over code_elements(name, snippet), kept in sync by triggers.
+
+    A trigram index can serve `LIKE '%text%'` directly, so `find` keeps its substring semantics.
+    Silently skipped when SQLite lacks FTS5 or the trigram tokenizer (before 3.34); `find` then
+    uses the plain LIKE scan.
+    """
+    existing = c.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='code_elements_fts'"
+    ).fetchone()
+    if existing and "trigram" in existing[0]:
+        return
+    if existing:
+        # Word-tokenized index from an earlier version; it cannot serve substring LIKE.
+        c.executescript("""
+        DROP TRIGGER IF EXISTS code_elements_ai;
+        DROP TRIGGER IF EXISTS code_elements_ad;
+        DROP TRIGGER IF EXISTS code_elements_au;
+        DROP TABLE code_elements_fts;
+        """)
+    try:
+        c.executescript("""
+        CREATE VIRTUAL TABLE code_elements_fts USING fts5(
+            name, snippet, content='code_elements', content_rowid='id', tokenize='trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS code_elements_ai AFTER INSERT ON code_elements BEGIN
+            INSERT INTO code_elements_fts(rowid, name, snippet) VALUES (new.id, new.name, new.snippet);
+        END;
+        CREATE TRIGGER IF NOT EXISTS code_elements_ad AFTER DELETE ON code_elements BEGIN
+            INSERT INTO code_elements_fts(code_elements_fts, rowid, name, snippet) VALUES ('delete', old.id, old.name, old.snippet);
+        END;
+        CREATE TRIGGER IF NOT EXISTS code_elements_au AFTER UPDATE ON code_elements BEGIN
+            INSERT INTO code_elements_fts(code_elements_fts, rowid, name, snippet) VALUES ('delete', old.id, old.name, old.snippet);
+            INSERT INTO code_elements_fts(rowid, name, snippet) VALUES (new.id, new.name, new.snippet);
+        END;
+
+        -- Backfill rows indexed before the FTS table existed.
+        INSERT INTO code_elements_fts(code_elements_fts) VALUES ('rebuild');
+        """)
+    except sqlite3.OperationalError:
+        pass
+
+def has_fts(c) -> bool:
+    """Returns True if the code_elements_fts index exists in this database."""
+    return c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='code_elements_fts'"
+    ).fetchone() is not None
 
 def save_json(data, path):
     with open(path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,22 @@
+import os
+
+from devbridge.utils import md_cache
+
+def test_prune_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(md_cache, "CACHE_DIR", tmp_path / "md_cache")
+    keys = [md_cache.key(f"<p>{i}</p>", "aggregate", None) for i in range(3)]
+    for age, md_key in zip((300, 200, 100), keys):
+        md_cache.put(md_key, "x" * 100)
+        os.utime(md_cache._md_path(md_key), (0, 1_000_000 - age))
+    assert md_cache.get(keys[0]) == "x" * 100 # Reading marks the oldest entry as recently used
+
+    md_cache.prune(250)
+    assert [md_cache.contains(k) for k in keys] == [True, False, True]
+
+def test_clear_removes_everything(tmp_path, monkeypatch):
+    monkeypatch.setattr(md_cache, "CACHE_DIR", tmp_path / "md_cache")
+    md_cache.put(md_cache.key("<p/>", "pages", None), "x")
+    md_cache.put_page("https://example.com/", {"ETag": '"1"'}, "<p/>")
+    md_cache.clear()
+    assert not md_cache.CACHE_DIR.exists()
+    assert md_cache.get_page("https://example.com/") is None
@@ -0,0 +1,85 @@
+"""
+Optional tree-sitter element extraction.
+
+When `tree_sitter_languages` is installed, JS/TS files are parsed in-process instead of
+through the Node.js worker, and Go, Rust, Java, C and C++ files get function/class
+elements too. Without it, `extract_ts_elements` returns None and callers fall back.
+"""
+import functools
+import warnings
+
+try:
+    from tree_sitter_languages import get_language, get_parser
+except ImportError:
+    get_language = get_parser = None
+
+_JS_FUNCTIONS = """
+(function_declaration name: (identifier) @name) @function
+(variable_declarator name: (identifier) @name value: [(arrow_function) (function)]) @function
+"""
+
+# Per language: (tree-sitter query, element type for @function, element type for @class)
+_QUERIES = {
+    "javascript": (_JS_FUNCTIONS + "(class_declaration name: (identifier) @name) @class",
+                   "function_js_ts", "class_js_ts"),
+    "typescript": (_JS_FUNCTIONS + "(class_declaration name: (type_identifier) @name) @class",
+                   "function_js_ts", "class_js_ts"),
+    "go": ("""
+        (function_declaration name: (identifier) @name) @function
+        (method_declaration name: (field_identifier) @name) @function
+        (type_spec name: (type_identifier) @name type: (struct_type)) @class
+        """, "function_go", "class_go"),
+    "rust": ("""
+        (function_item name: (identifier) @name) @function
+        (struct_item name: (type_identifier) @name) @class
+        """, "function_rust", "class_rust"),
+    "java": ("""
+        (method_declaration name: (identifier) @name) @function
+        (class_declaration name: (identifier) @name) @class
+        """, "function_java", "class_java"),
+    "c": ("""
+        (function_definition declarator: (function_declarator declarator: (identifier) @name)) @function
+        """, "function_c", "class_c"),
+    "cpp": ("""
+        (function_definition declarator: (function_declarator declarator: (identifier) @name)) @function
+        (class_specifier name: (type_identifier) @name) @class
+        """, "function_cpp", "class_cpp"),
+}
+
+TREE_SITTER_LANGUAGES = frozenset(_QUERIES)
+
+@functools.lru_cache(maxsize=None)
+def _parser_and_query(lang: str):
+    with warnings.catch_warnings():
+        # tree_sitter_languages still uses the deprecated Language(path, name) constructor.
+        warnings.simplefilter("ignore", FutureWarning)
+        return get_parser(lang), get_language(lang).query(_QUERIES[lang][0])
+
+def extract_ts_elements(source_code: str, lang: str):
+    """
+    Extract function and class definitions for `lang` with tree-sitter; the parse and query run in C.
+    Returns a list of dicts: {type, name, start_line, end_line, snippet}, or None when
+    tree_sitter_languages is not installed or `lang` is not in TREE_SITTER_LANGUAGES.
+    """
+    if get_parser is None or lang not in _QUERIES:
+        return None
+    parser, query = _parser_and_query(lang)
+    source_bytes = source_code.encode("utf-8")
+    tree = parser.parse(source_bytes)
+    _, function_type, class_type = _QUERIES[lang]
+    lines = source_code.splitlines()
+
+    elements = []
+    for _, captures in query.matches(tree.root_node):
+        kind = "class" if "class" in captures else "function"
+        node = captures[kind]
+        start_line = node.start_point[0] + 1
+        end_line = node.end_point[0] + 1
+        elements.append({
+            "type": class_type if kind == "class" else function_type,
+            "name": source_bytes[captures["name"].start_byte:captures["name"].end_byte].decode("utf-8", "replace"),
+            "start_line": start_line,
+            "end_line": end_line,
+            "snippet": "\n".join(lines[start_line - 1:end_line]),
+        })
+    return elements
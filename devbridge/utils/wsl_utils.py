@@ -1,7 +1,11 @@
+import functools
 import os
 from pathlib import Path
 import re
 
+_DRIVE_PATH_RE = re.compile(r'([a-zA-Z]):/(.*)')
+
+@functools.lru_cache(maxsize=4096)
 def windows_to_wsl_path(path: str) -> str:
     """
     Convert a Windows path to a WSL path, handling spaces, quotes, and mixed slashes robustly.
@@ -9,7 +13,7 @@ def windows_to_wsl_path(path: str) -> str:
     """
     path = path.strip().strip('"').strip("'")
     path = path.replace('\\', '/')
-    match = re.match(r'([a-zA-Z]):/(.*)', path)
+    match = _DRIVE_PATH_RE.match(path)
     if match:
         drive = match.group(1).lower()
         rest = match.group(2)
@@ -54,5 +54,13 @@ setup(
             "build", # For building the package
             "twine", # For uploading the package
         ],
+        "speedups": [
+            "orjson>=3.6", # Faster --json output
+            "uvloop>=0.18; sys_platform != 'win32'", # Faster event loop for learn
+            "tree_sitter_languages>=1.10", # In-process JS/TS/Go/Rust/Java/C/C++ parsing for index (needs tree-sitter<0.22)
+            "Brotli>=1.0", # Lets learn request br-compressed pages
+            "isal>=1.6", # Faster gzip decoding for learn (aiohttp >= 3.12)
+            "aiodns>=3.0", # Non-blocking DNS for learn's crawler
+        ],
     },
 )
\ No newline at end of file